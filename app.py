@@ -1,45 +1,292 @@
-from flask import Flask, render_template, request, jsonify
-from modules.port_scanner import PortScanner
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
+from modules.scan_jobs import ScanJob, ScanJobManager, ScanQueueFull, ClientQuotaExceeded
 from modules.password_checker import PasswordChecker
-import time
+from modules.result_store import IncomparableScans, ResultStore
+from modules.metrics import REGISTRY
+from modules.resolver import RESOLVER
+from modules.services import get_service_table, parse_port_spec
+from modules.checkpoint import CHECKPOINT_DIR
+import atexit
+import json
+import queue
+import threading
 
 app = Flask(__name__)
 
 # Initialisation des outils
-scanner_class = PortScanner
 checker_tool = PasswordChecker()
+# Historique des scans (SQLite, $CYBERSEC_RESULTS_DB)
+result_store = ResultStore()
+# Pool de scans partagé : 4 workers, 512 sockets ouverts au maximum pour tout le processus
+# Points de reprise dans checkpoints/ ($CYBERSEC_CHECKPOINT_DIR) : "resume": true reprend un scan interrompu
+scan_jobs = ScanJobManager(workers=4, max_open_sockets=512, queue_size=100, per_client_jobs=5,
+                           result_store=result_store, checkpoint_dir=CHECKPOINT_DIR)
+atexit.register(scan_jobs.shutdown, cancel_running=True, timeout=5)
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+def submit_scan(data):
+    """Met en file un scan décrit par le corps JSON de la requête"""
+    max_retries = data.get('max_retries')
+    packet_rate = data.get('packet_rate')
+    max_probes = data.get('max_probes')
+    return scan_jobs.submit(
+        data.get('target'), int(data.get('start_port', 1)), int(data.get('end_port', 1000)),
+        client=request.remote_addr,
+        # "ports": "22,80,443", "1-1024", "top:1000"... (prioritaire sur start_port/end_port)
+        port_spec=data.get('ports'), max_probes=int(max_probes) if max_probes is not None else None,
+        engine=data.get('engine', 'thread'), timing=data.get('timing', 'normal'),
+        max_retries=int(max_retries) if max_retries is not None else None,
+        incremental=bool(data.get('incremental', False)), rotation=int(data.get('rotation', 10)),
+        resume=bool(data.get('resume', False)),
+        detect_services=bool(data.get('detect_services', False)),
+        packet_rate=int(packet_rate) if packet_rate is not None else None,
+        protocol=data.get('protocol', 'tcp')
+    )
+
+@app.errorhandler(ClientQuotaExceeded)
+def quota_exceeded(e):
+    return jsonify({'success': False, 'error': str(e)}), 429
+
+@app.errorhandler(ScanQueueFull)
+def queue_full(e):
+    return jsonify({'success': False, 'error': str(e)}), 503
+
 @app.route('/scan_ports', methods=['POST'])
 def scan_ports():
     try:
         data = request.json
         target = data.get('target')
-        start_port = int(data.get('start_port', 1))
-        end_port = int(data.get('end_port', 1000))
         
         if not target:
             return jsonify({'success': False, 'error': 'La cible est requise'})
         
-        # Lancement du scan
-        start_time = time.time()
-        scanner = scanner_class(target, start_port, end_port)
-        open_ports = scanner.run_scan()
-        duration = time.time() - start_time
+        # Le scan passe par le pool de workers : la requête attend simplement sa fin
+        job = submit_scan(data)
+        job.wait()
+        summary = job.summary()
+        if summary['status'] == 'error':
+            return jsonify({'success': False, 'error': summary['error']})
         
         return jsonify({
             'success': True,
             'target': target,
-            'open_ports': open_ports,
-            'count': len(open_ports),
-            'duration': f"{duration:.2f}"
+            'protocol': summary['protocol'],
+            'open_ports': summary['open_ports'],
+            'open_filtered': summary['open_filtered'],
+            'count': summary['count'],
+            'duration': summary['duration'],
+            'metrics': summary['metrics'],
+            'timing': summary['timing'],
+            'scan_id': summary['scan_id'],
+            'incremental': summary['incremental'],
+            'resumed': summary['resumed'],
+            'services': summary['services']
         })
+    except (ClientQuotaExceeded, ScanQueueFull):
+        raise
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/scan_jobs', methods=['POST'])
+def create_scan_job():
+    try:
+        data = request.json
+        target = data.get('target')
+        
+        if not target:
+            return jsonify({'success': False, 'error': 'La cible est requise'})
+        
+        job = submit_scan(data)
+        return jsonify({'success': True, 'job_id': job.id})
+    except (ClientQuotaExceeded, ScanQueueFull):
+        raise
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/scan_jobs/<job_id>/cancel', methods=['POST'])
+def cancel_scan_job(job_id):
+    job = scan_jobs.cancel(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job introuvable'}), 404
+    return jsonify({'success': True, 'job_id': job.id, 'status': job.status})
+
+@app.route('/scan_jobs', methods=['GET'])
+def scan_jobs_stats():
+    return jsonify({'success': True, **scan_jobs.stats(), 'resolver': RESOLVER.stats()})
+
+@app.route('/scan_jobs/<job_id>', methods=['GET'])
+def scan_job_status(job_id):
+    job = scan_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job introuvable'}), 404
+    return jsonify({'success': True, **job.summary()})
+
+@app.route('/scan_jobs/<job_id>/events', methods=['GET'])
+def scan_job_events(job_id):
+    job = scan_jobs.get(job_id)
+    # Les balayages multi-cibles n'ont pas de flux SSE (réponse NDJSON de /scan_sweep)
+    if not isinstance(job, ScanJob):
+        return jsonify({'success': False, 'error': 'Job introuvable'}), 404
+    return Response(stream_with_context(job.events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/scan_sweep', methods=['POST'])
+def scan_sweep():
+    try:
+        data = request.json
+        targets = data.get('targets')
+        start_port = int(data.get('start_port', 1))
+        end_port = int(data.get('end_port', 1000))
+        ports = get_service_table().order(parse_port_spec(data.get('ports') or f"{start_port}-{end_port}"))
+        per_host_limit = int(data.get('per_host_limit', 32))
+        timing = data.get('timing', 'normal')
+        
+        if not targets:
+            return jsonify({'success': False, 'error': 'Au moins une cible (IP, domaine ou CIDR) est requise'})
+        
+        if data.get('stream'):
+            # Grands balayages : une ligne NDJSON par hôte dès qu'il est terminé, rien n'est accumulé
+            return Response(stream_with_context(stream_sweep(targets, ports, per_host_limit, timing)),
+                            mimetype='application/x-ndjson', headers={'X-Accel-Buffering': 'no'})
+        
+        # Seuls les hôtes avec des ports ouverts sont conservés dans la réponse
+        hosts = {}
+        def on_host_complete(host, open_ports):
+            if open_ports:
+                hosts[host] = open_ports
+        
+        # Le balayage passe par le pool de workers : plafond de sockets et quota du client compris
+        job = scan_jobs.submit_sweep(targets, ports, client=request.remote_addr,
+                                     per_host_limit=per_host_limit, timing=timing,
+                                     on_host_complete=on_host_complete)
+        job.wait()
+        summary = job.summary()
+        if summary['status'] == 'error':
+            return jsonify({'success': False, 'error': summary['error']})
+        
+        return jsonify({
+            'success': True,
+            'hosts': hosts,
+            'stats': summary['stats'],
+            'duration': summary['duration']
+        })
+    except (ClientQuotaExceeded, ScanQueueFull):
+        raise
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+def stream_sweep(targets, ports, per_host_limit, timing):
+    """Met le balayage en file ; retourne le générateur NDJSON : une ligne par hôte ayant des ports
+    ouverts, puis une ligne de statistiques"""
+    lines = queue.Queue(1000)
+    disconnected = threading.Event()
+    
+    def emit(line):
+        # File bornée : un client lent ralentit le balayage ; un client parti l'arrête d'écrire
+        while not disconnected.is_set():
+            try:
+                lines.put(line, timeout=0.5)
+                return
+            except queue.Full:
+                pass
+    
+    def on_host_states(host, states):
+        if states.open:
+            emit(json.dumps({'host': host, 'open_ports': list(states.open), **states.counts()}) + "\n")
+    
+    # Soumis avant le début de la réponse : quota et file pleine donnent encore un 429 ou un 503
+    job = scan_jobs.submit_sweep(targets, ports, client=request.remote_addr, per_host_limit=per_host_limit,
+                                 timing=timing, on_host_states=on_host_states)
+    
+    def generate():
+        try:
+            # Job terminé : plus aucune ligne ne sera ajoutée, la file est vidée avant le bilan
+            while not (job.finished and lines.empty()):
+                try:
+                    yield lines.get(timeout=0.5)
+                except queue.Empty:
+                    pass
+            summary = job.summary()
+            if summary['status'] == 'error':
+                yield json.dumps({'done': True, 'error': summary['error']}) + "\n"
+            else:
+                yield json.dumps({'done': True, 'stats': summary['stats'], 'duration': summary['duration']}) + "\n"
+        finally:
+            # Client parti (ou flux terminé) : plus aucune sonde n'est lancée pour lui
+            disconnected.set()
+            job.cancel()
+    
+    return generate()
+
+@app.route('/results', methods=['GET'])
+def results_hosts():
+    """Dernier état connu de chaque hôte"""
+    try:
+        limit = int(request.args.get('limit', 100))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Paramètres limit et offset entiers attendus'}), 400
+    return jsonify({'success': True, 'hosts': result_store.latest_per_host(limit, offset),
+                    'stats': result_store.stats()})
+
+@app.route('/results/diff', methods=['GET'])
+def results_diff():
+    """Ports ouverts / fermés entre deux scans (?old=<scan_id>&new=<scan_id>)"""
+    try:
+        diff = result_store.diff(int(request.args['old']), int(request.args['new']))
+    except IncomparableScans as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except (KeyError, ValueError):
+        return jsonify({'success': False, 'error': 'Paramètres old et new (identifiants de scan) requis'}), 400
+    if diff is None:
+        return jsonify({'success': False, 'error': 'Scan introuvable'}), 404
+    return jsonify({'success': True, **diff})
+
+@app.route('/results/scans/<int:scan_id>', methods=['GET'])
+def results_scan(scan_id):
+    scan = result_store.get_scan(scan_id)
+    if scan is None:
+        return jsonify({'success': False, 'error': 'Scan introuvable'}), 404
+    return jsonify({'success': True, **scan})
+
+@app.route('/results/<target>', methods=['GET'])
+def results_latest(target):
+    """Dernier scan d'un hôte et changements depuis le précédent (?protocol=tcp|udp)"""
+    protocol = request.args.get('protocol', 'tcp')
+    latest = result_store.latest(target, protocol)
+    if latest is None:
+        return jsonify({'success': False, 'error': 'Aucun scan enregistré pour cette cible'}), 404
+    return jsonify({'success': True, 'latest': latest, 'changes': result_store.diff_latest(target, protocol)})
+
+@app.route('/results/<target>/history', methods=['GET'])
+def results_history(target):
+    """Historique des scans d'un hôte (?port=, ?since=<epoch>, ?limit=, ?protocol=)"""
+    port = request.args.get('port')
+    since = request.args.get('since')
+    try:
+        port = int(port) if port else None
+        since = float(since) if since else None
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Paramètres port et limit entiers, since en epoch attendus'}), 400
+    history = result_store.history(target, port=port, since=since, limit=limit,
+                                   protocol=request.args.get('protocol', 'tcp'))
+    return jsonify({'success': True, 'target': target, 'history': history})
+
+def password_result(password, breached):
+    """Réponse de /check_password (partagée avec le mode ASGI, voir asgi.py)"""
+    score, rating, feedback = checker_tool.check_strength(password)
+    return {
+        'success': True,
+        'score': score,
+        'rating': rating,
+        'feedback': feedback,
+        'breached': breached
+    }
+
 @app.route('/check_password', methods=['POST'])
 def check_password():
     try:
@@ -49,19 +296,15 @@ def check_password():
         if not password:
             return jsonify({'success': False, 'error': 'Mot de passe requis'})
         
-        score, rating, feedback = checker_tool.check_strength(password)
-        breached = checker_tool.check_breach(password)
-        
-        return jsonify({
-            'success': True,
-            'score': score,
-            'rating': rating,
-            'feedback': feedback,
-            'breached': breached
-        })
+        return jsonify(password_result(password, checker_tool.check_breach(password)))
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Métriques du processus au format texte Prometheus"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     print("🚀 Serveur CyberSec démarré sur http://127.0.0.1:5000")
     app.run(debug=True, port=5000)
@@ -0,0 +1,132 @@
+"""Mode ASGI du dashboard : python -m uvicorn asgi:application (ou tout autre serveur ASGI)
+
+/check_password y est servi nativement par asyncio : une requête qui attend
+l'API HIBP n'occupe aucun thread, et les recherches d'un même préfixe SHA-1
+partagent une seule requête en vol. Les autres routes passent par
+l'application Flask, exécutée dans un pool de threads (pont WSGI).
+"""
+import asyncio
+import io
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from app import app as flask_app, checker_tool, password_result
+
+# Threads du pont WSGI (routes Flask, flux SSE compris)
+WSGI_THREADS = 32
+_wsgi_pool = ThreadPoolExecutor(WSGI_THREADS, thread_name_prefix="wsgi")
+
+
+async def read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+async def send_json(send, data, status=200):
+    body = json.dumps(data).encode()
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def check_password(receive, send):
+    """Même contrat que la route Flask /check_password"""
+    try:
+        data = json.loads(await read_body(receive) or b"null")
+        password = data.get('password')
+        
+        if not password:
+            return await send_json(send, {'success': False, 'error': 'Mot de passe requis'})
+        
+        await send_json(send, password_result(password, await checker_tool.check_breach_async(password)))
+    except Exception as e:
+        await send_json(send, {'success': False, 'error': str(e)})
+
+
+def wsgi_environ(scope, body):
+    """Environnement WSGI (PEP 3333) d'une requête ASGI"""
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode().decode("latin1"),
+        "PATH_INFO": scope["path"].encode().decode("latin1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", []):
+        name, value = name.decode("latin1"), value.decode("latin1")
+        if name == "content-type":
+            environ["CONTENT_TYPE"] = value
+        elif name == "content-length":
+            environ["CONTENT_LENGTH"] = value
+        else:
+            key = "HTTP_" + name.upper().replace("-", "_")
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def wsgi(scope, receive, send):
+    """Exécute l'application Flask dans le pool ; les morceaux de réponse (SSE) sont relayés au fil de l'eau"""
+    environ = wsgi_environ(scope, await read_body(receive))
+    loop = asyncio.get_running_loop()
+    
+    def run():
+        start = {}
+        
+        def start_response(status, headers, exc_info=None):
+            start.update(type="http.response.start", status=int(status.split(" ", 1)[0]),
+                         headers=[(name.lower().encode("latin1"), value.encode("latin1")) for name, value in headers])
+        
+        def emit(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+        
+        result = flask_app(environ, start_response)
+        started = False
+        try:
+            for chunk in result:
+                if not chunk:
+                    continue
+                if not started:
+                    emit(start)
+                    started = True
+                emit({"type": "http.response.body", "body": chunk, "more_body": True})
+            if not started:
+                emit(start)
+            emit({"type": "http.response.body", "body": b""})
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+    
+    await loop.run_in_executor(_wsgi_pool, run)
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+    if scope["path"] == "/check_password" and scope["method"] == "POST":
+        await check_password(receive, send)
+    else:
+        await wsgi(scope, receive, send)
@@ -0,0 +1,75 @@
+"""Benchmark check_breach : requête par appel vs session + cache vs index hors ligne
+
+Chaque variante doit donner le résultat attendu pour chaque mot de passe : code de sortie 1 sinon.
+
+Usage : python -m benchmarks.bench_breach [--lookups 2000] [--latency 0.002]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import requests
+
+from benchmarks.fixtures import StubHibpServer, write_hibp_dump
+from modules.breach_backends import HibpRangeBackend, OfflineHibpBackend
+from modules.password_checker import PasswordChecker
+
+
+class UncachedBackend:
+    """Comportement d'origine : un requests.get (nouvelle connexion) par vérification"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def lookup(self, digest):
+        response = requests.get(f"{self.base_url}{digest[:5]}")
+        for line in response.text.splitlines():
+            suffix, _, count = line.partition(":")
+            if suffix == digest[5:]:
+                return int(count)
+        return 0
+
+
+def bench(label, checker, passwords, expected):
+    started = time.perf_counter()
+    results = [checker.check_breach(p) for p in passwords]
+    elapsed = time.perf_counter() - started
+    wrong = sum(1 for result, want in zip(results, expected) if result != want)
+    print(f"{label:>16} | {len(passwords) / elapsed:8,.0f} vérifs/s | {1000 * elapsed / len(passwords):.3f} ms/vérif"
+          f" | {'✅' if not wrong else f'❌ {wrong} résultats divergents'}")
+    return wrong == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--breached", type=int, default=50000, help="taille de la base simulée")
+    parser.add_argument("--latency", type=float, default=0.002, help="latence simulée de l'API (s)")
+    args = parser.parse_args()
+
+    leaked = [f"leaked-{i}" for i in range(args.breached)]
+    rng = random.Random(0)
+    # Moitié de mots de passe compromis, pris dans un petit ensemble pour simuler des répétitions
+    passwords = [rng.choice(leaked[:200]) if i % 2 else f"fresh-{rng.randrange(300)}" for i in range(args.lookups)]
+    leaked_set = set(leaked)
+    expected = [p in leaked_set for p in passwords]
+
+    with StubHibpServer(leaked, latency=args.latency) as stub, tempfile.TemporaryDirectory() as tmp:
+        ok = bench("requête/appel", PasswordChecker(UncachedBackend(stub.url)), passwords, expected)
+        backend = HibpRangeBackend(stub.url)
+        ok &= bench("session+cache", PasswordChecker(backend), passwords, expected)
+        print(f"{'':>16}   {backend.upstream_requests} appels API pour {args.lookups} vérifications")
+
+        dump = os.path.join(tmp, "hibp.txt")
+        index = os.path.join(tmp, "hibp.idx")
+        write_hibp_dump(leaked, dump)
+        OfflineHibpBackend.build_index(dump, index)
+        ok &= bench("index hors ligne", PasswordChecker(OfflineHibpBackend(index)), passwords, expected)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
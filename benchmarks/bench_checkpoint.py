@@ -0,0 +1,93 @@
+"""Points de reprise : surcoût du journal pendant le scan, puis reprise après un crash (SIGKILL)
+
+1. Scan complet de la boucle locale avec et sans point de reprise (médiane de --runs passages).
+2. Un scan lancé dans un processus séparé est tué en cours de route ; la reprise ne
+   sonde que les ports restants, retrouve tous les ports ouverts et l'état de chaque
+   port (ouvert, fermé ou filtré). Code de sortie 1 sinon.
+
+Usage : python -m benchmarks.bench_checkpoint [--ports 1-65535] [--runs 3] [--engine async]
+"""
+import argparse
+import contextlib
+import io
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fixtures import LocalListenerFarm
+from modules.port_scanner import PortScanner
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOST = "127.0.0.2"
+
+CRASHING_SCAN = """
+import sys
+from modules.port_scanner import PortScanner
+PortScanner(sys.argv[1], port_spec=sys.argv[2], engine=sys.argv[3], timing="aggressive",
+            checkpoint_dir=sys.argv[4], on_open_port=lambda port: None).run_scan()
+"""
+
+
+def scan(spec, engine, **options):
+    scanner = PortScanner(HOST, port_spec=spec, engine=engine, timing="aggressive",
+                          on_open_port=lambda port: None, **options)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        open_ports = scanner.run_scan()
+    return time.perf_counter() - started, open_ports, scanner
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ports", default="1-65535")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--engine", default="async", choices=("thread", "async"))
+    args = parser.parse_args()
+
+    with LocalListenerFarm(count=50, host=HOST) as farm, tempfile.TemporaryDirectory() as tmp:
+        # 1. Surcoût : passages alternés pour lisser le bruit de la machine
+        plain, checkpointed, stats = [], [], None
+        for _ in range(args.runs):
+            plain.append(scan(args.ports, args.engine)[0])
+            elapsed, _, scanner = scan(args.ports, args.engine, checkpoint_dir=tmp)
+            checkpointed.append(elapsed)
+            stats = scanner.checkpoint.stats()
+        base, with_log = statistics.median(plain), statistics.median(checkpointed)
+        print(f"📦 Sans point de reprise : {base:.2f}s | avec : {with_log:.2f}s "
+              f"({100 * (with_log - base) / base:+.1f}%) | {stats['records']} enregistrements, {stats['syncs']} fsync")
+
+        # 2. Crash : le processus est tué une fois la moitié des ports journalisés
+        process = subprocess.Popen([sys.executable, "-c", CRASHING_SCAN, HOST, args.ports, args.engine, tmp],
+                                   cwd=ROOT, stdout=subprocess.DEVNULL)
+        total = len(PortScanner(HOST, port_spec=args.ports).port_list())
+        path = None
+        while process.poll() is None:
+            files = [name for name in os.listdir(tmp) if name.endswith(".ckpt")]
+            if files:
+                path = os.path.join(tmp, files[0])
+                # Port fermé : enregistrements CLOSED + DONE (6 octets), soit la moitié des ports à 3 octets par port
+                if os.path.getsize(path) > 3 * total:
+                    break
+            time.sleep(0.05)
+        process.send_signal(signal.SIGKILL)
+        process.wait()
+        elapsed, open_ports, scanner = scan(args.ports, args.engine, checkpoint_dir=tmp, resume=True)
+        expected = set(farm.ports) & set(scanner.port_list())
+        complete = expected <= set(open_ports)
+        counts = scanner.states.counts()
+        all_states = sum(counts.values()) == total and counts["open"] == len(open_ports)
+        removed = not os.path.exists(path)
+        print(f"💥 Crash après {scanner.resumed}/{total} ports | reprise : {scanner.scanned} sondes, {elapsed:.2f}s | "
+              f"ports ouverts retrouvés: {len(expected & set(open_ports))}/{len(expected)} "
+              f"{'✅' if complete else '❌'} | point de reprise supprimé: {'✅' if removed else '❌'}")
+        print(f"📋 États après reprise : {counts['open']} ouverts, {counts['closed']} fermés, "
+              f"{counts['filtered']} filtrés / {total} {'✅' if all_states else '❌'}")
+    sys.exit(0 if complete and all_states and removed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Balayage distribué : débit selon le nombre d'agents, et reprise après la perte d'agents
+
+Les agents sont des processus distincts (python main.py agent) sur la boucle locale.
+Chacun représente une machine au budget de sockets limité (--sockets). La cible est
+un hôte filtré : chaque sonde attend son délai d'expiration, le débit d'un agent est
+donc borné par son budget de sockets et non par le CPU. Il doit croître
+linéairement avec le nombre d'agents, tant qu'il y a assez de tranches : avec les
+réglages par défaut, 8 agents (16 emplacements) traitent 24 tranches en deux vagues.
+Code de sortie 1 si un balayage rapporte des ports ouverts faux ou incomplets.
+
+Usage : python -m benchmarks.bench_distributed [--agents 1,2,4,8] [--ports 480] [--shard-size 20] [--sockets 20]
+"""
+import argparse
+import contextlib
+import io
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.fixtures import LocalListenerFarm
+from modules.distributed import ScanCoordinator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def spawn_agents(count, sockets):
+    """Lance count agents sur des ports libres ; retourne [(processus, "hôte:port")]"""
+    agents = []
+    for _ in range(count):
+        process = subprocess.Popen([sys.executable, "main.py", "agent", "--port", "0", "--max-sockets", str(sockets)],
+                                   cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        # Première ligne : "🛰️  Agent de scan à l'écoute sur hôte:port"
+        address = process.stdout.readline().split()[-1]
+        # Le reste de la sortie est ignoré (sans lecteur, le tube finirait par bloquer l'agent)
+        threading.Thread(target=process.stdout.read, daemon=True).start()
+        agents.append((process, address))
+    return agents
+
+
+def stop_agents(agents):
+    for process, _ in agents:
+        process.send_signal(signal.SIGCONT)
+        process.kill()
+        process.wait()
+
+
+def sweep(agents, target, ports, shard_size, **options):
+    coordinator = ScanCoordinator([address for _, address in agents], target, ports, shard_size=shard_size,
+                                  timing="insane", **options)
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = coordinator.run()
+    return results[target], coordinator.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", default="1,2,4,8", help="nombres d'agents à comparer")
+    parser.add_argument("--ports", type=int, default=480, help="ports filtrés sondés")
+    parser.add_argument("--shard-size", type=int, default=20)
+    parser.add_argument("--sockets", type=int, default=20, help="sockets simultanés par agent")
+    args = parser.parse_args()
+
+    counts = [int(count) for count in args.agents.split(",")]
+    failures = 0
+    # 1. Passage à l'échelle : hôte filtré (file d'attente saturée, chaque SYN est ignoré)
+    with LocalListenerFarm(count=0, host="127.0.0.2", blackholed=args.ports) as farm:
+        agents = spawn_agents(max(counts), args.sockets)
+        try:
+            baseline = None
+            for count in counts:
+                open_ports, summary = sweep(agents[:count], "127.0.0.2", farm.blackholed_ports, args.shard_size)
+                rate = args.ports / summary["duration"]
+                baseline = baseline or rate / count
+                # Hôte entièrement filtré : aucun port ouvert, aucune tranche perdue
+                ok = not open_ports and not summary["failed"]
+                failures += not ok
+                print(f"{'✅' if ok else '❌'} {count} agent(s) | {summary['duration']:6.2f}s | {rate:7.0f} ports/s | "
+                      f"x{rate / baseline:4.1f} (idéal x{count})")
+        finally:
+            stop_agents(agents)
+
+    # 2. Reprise : un agent tué et un agent figé (SIGSTOP) en cours de balayage
+    with LocalListenerFarm(count=20, host="127.0.0.3", blackholed=args.ports) as farm:
+        agents = spawn_agents(4, args.sockets)
+        try:
+            outcome = {}
+
+            def run():
+                outcome["result"] = sweep(agents, "127.0.0.3", farm.ports + farm.blackholed_ports,
+                                          args.shard_size, stall_timeout=1.5)
+
+            coordinator = threading.Thread(target=run)
+            coordinator.start()
+            time.sleep(0.5)
+            agents[0][0].kill()
+            agents[1][0].send_signal(signal.SIGSTOP)
+            coordinator.join()
+            open_ports, summary = outcome["result"]
+            complete = open_ports == farm.ports and not summary["failed"]
+            failures += not complete
+            print(f"💥 1 agent tué, 1 agent figé | {summary['duration']:.2f}s | "
+                  f"{summary['requeued']} tranches réattribuées, {summary['failed']} perdues | "
+                  f"agents écartés: {len(summary['retired'])} | "
+                  f"ports ouverts: {len(open_ports)}/{len(farm.ports)} {'✅' if complete else '❌'}")
+        finally:
+            stop_agents(agents)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark du re-scan incrémental : surveillance continue d'un hôte local avec dérives simulées
+
+Des ports sont ouverts sur 127.0.0.1 dans la plage scannée ; au fil des passages
+un port est ajouté puis un autre fermé. Chaque passage affiche le mode retenu
+(full / incremental / widened), les sondes envoyées et celles économisées.
+
+Usage : python -m benchmarks.bench_incremental [--runs 25] [--rotation 10] [--range 20000-29999]
+"""
+import argparse
+import os
+import random
+import socket
+import tempfile
+import time
+
+from modules.port_scanner import PortScanner
+from modules.result_store import ResultStore
+
+
+def listen(port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", port))
+    sock.listen(1024)
+    return sock
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=25)
+    parser.add_argument("--rotation", type=int, default=10)
+    parser.add_argument("--range", default="20000-29999")
+    parser.add_argument("--listeners", type=int, default=20)
+    args = parser.parse_args()
+    start, end = map(int, args.range.split("-"))
+
+    rng = random.Random(0)
+    ports = rng.sample(range(start, end + 1), args.listeners + 1)
+    extra_port = ports.pop()
+    listeners = {port: listen(port) for port in ports}
+    open_at, close_at = args.runs // 3, 2 * args.runs // 3
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultStore(os.path.join(tmp, "results.db"))
+        total_probes = 0
+        try:
+            for run in range(args.runs):
+                if run == open_at:
+                    listeners[extra_port] = listen(extra_port)
+                    print(f"  ➕ port {extra_port} ouvert")
+                if run == close_at:
+                    port = ports[0]
+                    listeners.pop(port).close()
+                    print(f"  ➖ port {port} fermé")
+                scanner = PortScanner("127.0.0.1", start, end, engine="async", result_store=store,
+                                      incremental=True, rotation=args.rotation,
+                                      on_open_port=lambda port: None)
+                started = time.perf_counter()
+                open_ports = scanner.run_scan()
+                duration = time.perf_counter() - started
+                info = scanner.incremental_summary()
+                total_probes += info["probes"]
+                drift = info["drift"] or {}
+                changes = " ".join([f"+{p}" for p in drift.get("opened", [])] + [f"-{p}" for p in drift.get("closed", [])])
+                print(f"#{run + 1:>3} {info['mode']:<11} | {info['probes']:>6} sondes | "
+                      f"{info['saved_percent']:5.1f}% économisées | {len(open_ports):>3} ouverts | "
+                      f"{duration * 1000:7.1f} ms {changes}")
+        finally:
+            for sock in listeners.values():
+                sock.close()
+            store.close()
+
+    full = args.runs * (end - start + 1)
+    print(f"📊 {total_probes} sondes au total contre {full} en scans complets "
+          f"({100 * (full - total_probes) / full:.1f}% économisées)")
+
+
+if __name__ == "__main__":
+    main()
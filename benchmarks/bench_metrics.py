@@ -0,0 +1,71 @@
+"""Coût de l'instrumentation : débit de scan avec les métriques réelles vs des métriques inertes
+
+Alterne les deux variantes sur plusieurs passes (la boucle locale est bruitée) et
+compare les meilleurs débits. Mesure aussi le coût unitaire de ScanMetrics.record().
+
+Usage : python -m benchmarks.bench_metrics [--end 20000] [--rounds 3] [--engines async,thread]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from benchmarks.fixtures import LocalListenerFarm
+from modules.metrics import MetricsRegistry, ScanMetrics
+from modules.port_scanner import PortScanner
+
+
+class NullMetrics(ScanMetrics):
+    """Mêmes appels, aucun travail : référence sans instrumentation"""
+
+    def begin(self):
+        pass
+
+    def record(self, outcome, latency=None, attempts=1, in_flight=True):
+        pass
+
+    def add_probes(self, count):
+        pass
+
+
+def scan(engine, end, instrumented):
+    scanner = PortScanner("127.0.0.1", 1, end, engine=engine, metrics_registry=MetricsRegistry(),
+                          on_open_port=lambda port: None)
+    if not instrumented:
+        scanner.metrics = NullMetrics("127.0.0.1")
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        scanner.run_scan()
+    return end / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--end", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--engines", default="async,thread")
+    args = parser.parse_args()
+
+    metrics = ScanMetrics("127.0.0.1")
+    calls = 200000
+    started = time.perf_counter()
+    for _ in range(calls):
+        metrics.begin()
+        metrics.record("closed", 0.0001)
+    per_probe = (time.perf_counter() - started) / calls
+    print(f"⏱️  begin() + record() : {per_probe * 1e6:.2f} µs par sonde")
+
+    with LocalListenerFarm(count=20):
+        for engine in args.engines.split(","):
+            rates = {True: [], False: []}
+            for _ in range(args.rounds):
+                for instrumented in (False, True):
+                    rates[instrumented].append(scan(engine, args.end, instrumented))
+            bare, measured = max(rates[False]), max(rates[True])
+            print(f"{engine:>7} | sans métriques {bare:8.0f} ports/s | avec {measured:8.0f} ports/s | "
+                  f"surcoût {100 * (bare - measured) / bare:+.1f}% "
+                  f"(coût unitaire : {100 * per_probe * bare:.1f}% du temps par sonde)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark de l'audit en masse : mots de passe/s et mémoire sur un fichier synthétique
+
+Usage : python -m benchmarks.bench_password_audit [--lines 1000000] [--processes N]
+"""
+import argparse
+import functools
+import os
+import resource
+import tempfile
+import time
+
+from benchmarks.fixtures import synthetic_passwords, write_hibp_dump
+from modules.breach_backends import OfflineHibpBackend
+from modules.password_audit import PasswordAuditor, format_audit_report
+
+
+def write_corpus(path, lines, leaked, seed=0):
+    """Fichier user:password à partir du corpus synthétique des fixtures"""
+    with open(path, "w", encoding="utf-8") as f:
+        for i, password in enumerate(synthetic_passwords(lines, leaked, seed)):
+            f.write(f"user{i}:{password}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    leaked = [f"leaked{i}" for i in range(100_000)]
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = os.path.join(tmp, "dump.txt")
+        dump = os.path.join(tmp, "hibp.txt")
+        index = os.path.join(tmp, "hibp.idx")
+        started = time.perf_counter()
+        write_corpus(corpus, args.lines, leaked)
+        write_hibp_dump(leaked, dump)
+        OfflineHibpBackend.build_index(dump, index)
+        print(f"🧪 Corpus de {args.lines} lignes généré en {time.perf_counter() - started:.1f}s")
+
+        auditor = PasswordAuditor(processes=args.processes, separator=":",
+                                  breach_backend_factory=functools.partial(OfflineHibpBackend, index))
+        report = auditor.audit(corpus)
+        print(format_audit_report(report))
+
+    # ru_maxrss est en Ko sous Linux
+    parent = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    print(f"\n💾 RSS max: parent {parent:.0f} Mo, plus gros worker {children:.0f} Mo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Benchmark ports/s : moteur threadé vs moteur asyncio
+
+Usage : python -m benchmarks.bench_port_scanner [--start 1] [--end 65535] [--skip-thread]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from benchmarks.fixtures import LocalListenerFarm
+from modules.port_scanner import PortScanner
+
+
+def bench(engine, host, start, end, expected, **kwargs):
+    scanner = PortScanner(host, start, end, engine=engine, **kwargs)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        open_ports = scanner.run_scan()
+    elapsed = time.perf_counter() - started
+    total = end - start + 1
+    missing = sorted(set(expected) - set(open_ports))
+    print(f"{engine:>7} | {total} ports en {elapsed:.2f}s | {total / elapsed:,.0f} ports/s"
+          f" | {len(open_ports)} ouverts | manquants: {missing or 'aucun'}")
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--start", type=int, default=1)
+    parser.add_argument("--end", type=int, default=65535)
+    parser.add_argument("--listeners", type=int, default=20)
+    parser.add_argument("--blackholed", type=int, default=0, help="ports filtrés (expiration sans réponse)")
+    parser.add_argument("--timing", default="normal", help="modèle de temporisation")
+    parser.add_argument("--max-inflight", type=int, default=2000)
+    parser.add_argument("--skip-thread", action="store_true", help="ne pas lancer le moteur threadé")
+    args = parser.parse_args()
+
+    with LocalListenerFarm(args.listeners, blackholed=args.blackholed) as farm:
+        expected = [p for p in farm.ports if args.start <= p <= args.end]
+        print(f"🎯 {len(expected)} ports en écoute dans la plage {args.start}-{args.end}")
+        async_rate = bench("async", farm.host, args.start, args.end, expected,
+                           max_inflight=args.max_inflight, timing=args.timing)
+        if not args.skip_thread:
+            thread_rate = bench("thread", farm.host, args.start, args.end, expected, timing=args.timing)
+            print(f"⚡ Accélération asyncio: x{async_rate / thread_rate:.1f}")
+
+
+if __name__ == "__main__":
+    main()
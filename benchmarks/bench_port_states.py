@@ -0,0 +1,172 @@
+"""État des ports de nombreux hôtes : mémoire par représentation, rapports en flux, opérations ensemblistes
+
+1. Mémoire (tracemalloc) de l'état de --sample hôtes synthétiques, extrapolée à
+   --hosts hôtes : liste des ports ouverts + dict de rapport (ancien modèle, sans
+   les ports fermés/filtrés), dict {port: état} (état complet), PortStates.
+2. Rapport de --hosts hôtes : un rapport par hôte (ReportGenerator), un seul
+   rapport JSON construit en mémoire, SweepReport (NDJSON + CSV en flux).
+3. Différence entre deux passages (ports ouverts / fermés par hôte) : set vs PortSet.
+
+Profils d'hôtes : la plupart refusent les connexions (fermés), une partie est
+derrière un pare-feu qui ignore tout (filtrés), le reste filtre par plages.
+
+Usage : python -m benchmarks.bench_port_states [--hosts 10000] [--sample 50] [--ports top:1000 --ports 1-65535]
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+
+from modules.port_states import PortSet, PortStates
+from modules.report_generator import ReportGenerator
+from modules.services import get_service_table, parse_port_spec
+
+COMMON = [21, 22, 25, 53, 80, 110, 143, 443, 445, 3306, 3389, 5432, 8080]
+
+
+def host_profile(rng, ports):
+    """[(port, état)] d'un hôte synthétique, dans l'ordre du scan"""
+    open_ports = set(rng.sample(COMMON, rng.randint(0, 5))) | {rng.choice(ports) for _ in range(rng.randint(0, 3))}
+    kind = rng.random()
+    if kind < 0.6:
+        default, filtered = "closed", set()
+    elif kind < 0.9:
+        default, filtered = "filtered", set()
+    else:
+        # Pare-feu par plages : quelques blocs filtrés, le reste fermé
+        default, filtered = "closed", set()
+        for _ in range(rng.randint(1, 4)):
+            start = rng.randrange(len(ports))
+            filtered.update(ports[start:start + rng.randint(10, len(ports) // 4)])
+    return [(port, "open" if port in open_ports else "filtered" if port in filtered else default) for port in ports]
+
+
+def measure(build):
+    """Mémoire retenue par build() (octets) et durée de construction (hors tracemalloc, qui la fausse)"""
+    started = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    kept = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size, elapsed
+
+
+def memory(profiles, reporter):
+    def lists_and_reports():
+        # Ancien modèle : liste des ports ouverts, puis le dict complet du rapport de chaque hôte
+        kept = []
+        for i, profile in enumerate(profiles):
+            open_ports = [port for port, state in profile if state == "open"]
+            assessment = reporter.assess_port_security(open_ports)
+            kept.append((open_ports, {"scan_info": {"target": f"10.0.0.{i}", "open_ports_count": len(open_ports)},
+                                      "open_ports": list(open_ports), "security_assessment": assessment}))
+        return kept
+
+    def state_dicts():
+        return [{port: state for port, state in profile} for profile in profiles]
+
+    def port_states():
+        kept = []
+        for profile in profiles:
+            states = PortStates()
+            for port, state in profile:
+                states.record(port, state)
+            kept.append(states)
+        return kept
+
+    return {"liste + rapport (ouverts seuls)": measure(lists_and_reports),
+            "dict {port: état}": measure(state_dicts),
+            "PortStates": measure(port_states)}
+
+
+def reports(hosts, rng):
+    results = [(f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}", sorted(rng.sample(COMMON, rng.randint(1, 5))))
+               for i in range(hosts)]
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        reporter = ReportGenerator(output_dir=tmp, formats=("json", "csv"), asynchronous=False)
+
+        def per_host():
+            for host, open_ports in results:
+                reporter.generate_port_scan_report(host, open_ports, "balayage", ports_scanned=1000)
+
+        def in_memory():
+            data = [{"host": host, "open_ports": open_ports, **reporter.assess_port_security(open_ports)}
+                    for host, open_ports in results]
+            with open(f"{tmp}/sweep.json", "w", encoding="utf-8") as f:
+                f.write(json.dumps(data, indent=2, ensure_ascii=False))
+
+        def streaming():
+            with reporter.open_sweep_report("bench") as report:
+                for host, open_ports in results:
+                    report.add_host(host, open_ports, ports_scanned=1000)
+
+        for name, run in (("un rapport par hôte", per_host), ("JSON unique en mémoire", in_memory),
+                          ("SweepReport (flux)", streaming)):
+            tracemalloc.start()
+            started = time.perf_counter()
+            run()
+            timings[name] = (time.perf_counter() - started, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    return timings
+
+
+def set_ops(profiles):
+    opened = [[port for port, state in profile if state == "open"] for profile in profiles]
+    # Second passage : un port ouvert de plus, un de moins
+    later = [ports[1:] + [9999] for ports in opened]
+    before, after = [PortSet(ports) for ports in opened], [PortSet(sorted(ports)) for ports in later]
+    started = time.perf_counter()
+    for old, new in zip(opened, later):
+        old, new = set(old), set(new)
+        sorted(new - old), sorted(old - new)
+    sets = time.perf_counter() - started
+    started = time.perf_counter()
+    for old, new in zip(before, after):
+        list(new - old), list(old - new)
+    portsets = time.perf_counter() - started
+    closed = [PortSet(port for port, state in profile if state == "closed") for profile in profiles]
+    started = time.perf_counter()
+    for scanned in closed:
+        scanned & closed[0]
+    dense = time.perf_counter() - started
+    return sets / len(profiles), portsets / len(profiles), dense / len(profiles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=10000)
+    parser.add_argument("--sample", type=int, default=50, help="hôtes mesurés (extrapolés à --hosts)")
+    parser.add_argument("--ports", action="append", help="spécification des ports scannés (répétable)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    reporter = ReportGenerator(asynchronous=False)
+    scale = args.hosts / args.sample
+
+    for spec in args.ports or ["top:1000", "1-65535"]:
+        # Entiers partagés entre les hôtes, comme la liste de ports d'un vrai balayage
+        ports = get_service_table().order(parse_port_spec(spec))
+        profiles = [host_profile(rng, ports) for _ in range(args.sample)]
+        print(f"💾 {len(ports)} ports par hôte, mémoire pour {args.hosts} hôtes (mesurée sur {args.sample}):")
+        results = memory(profiles, reporter)
+        baseline = results["dict {port: état}"][0]
+        for name, (size, elapsed) in results.items():
+            print(f"   {name:<32} {size * scale / 2 ** 20:9.1f} Mo | {size / args.sample / 1024:8.1f} Ko/hôte "
+                  f"| construction {elapsed / args.sample * 1e3:6.2f} ms/hôte | {baseline / size:6.1f}x")
+        sets, portsets, dense = set_ops(profiles)
+        print(f"   ⚙️  Différence entre passages : set {sets * 1e6:.1f} µs/hôte | PortSet {portsets * 1e6:.1f} µs/hôte"
+              f" | intersection des ports fermés : {dense * 1e6:.1f} µs/hôte")
+
+    print(f"📝 Rapport de {args.hosts} hôtes:")
+    for name, (elapsed, peak) in reports(args.hosts, rng).items():
+        print(f"   {name:<24} {elapsed:6.2f}s | pic mémoire {peak / 2 ** 20:7.1f} Mo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Benchmark de l'écriture des rapports : synchrone vs thread d'écriture par lots
+
+Simule un balayage produisant un rapport par hôte et mesure le temps passé
+dans l'appelant (ce que voit le scan) puis le temps total jusqu'au flush.
+
+Usage : python -m benchmarks.bench_reports [--hosts 2000] [--formats json,csv,txt]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from modules.report_generator import ReportGenerator
+
+
+def run(hosts, formats, asynchronous):
+    with tempfile.TemporaryDirectory() as tmp:
+        reporter = ReportGenerator(output_dir=tmp, formats=formats, asynchronous=asynchronous)
+        started = time.perf_counter()
+        for i in range(hosts):
+            reporter.generate_port_scan_report(f"10.0.{i // 256}.{i % 256}", [22, 80, 443, 3306], "balayage")
+        caller = time.perf_counter() - started
+        reporter.close()
+        total = time.perf_counter() - started
+        stats = reporter.stats()
+        assert stats["written"] == len(os.listdir(tmp)), "rapports manquants"
+        return caller, total, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=2000)
+    parser.add_argument("--formats", default="json,csv,txt")
+    args = parser.parse_args()
+    formats = tuple(args.formats.split(","))
+
+    for label, asynchronous in (("synchrone", False), ("arrière-plan", True)):
+        caller, total, stats = run(args.hosts, formats, asynchronous)
+        print(f"{label:>12} | appelant {caller * 1000:8.1f} ms ({caller / args.hosts * 1e6:6.1f} µs/rapport) | "
+              f"total {total * 1000:8.1f} ms | {stats['written']} fichiers en {stats['batches']} lot(s)")
+
+
+if __name__ == "__main__":
+    main()
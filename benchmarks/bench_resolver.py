@@ -0,0 +1,82 @@
+"""Benchmark de la résolution des cibles face à un serveur DNS factice local (latence simulée)
+
+Compare les requêtes envoyées et le temps passé selon la stratégie : une résolution
+par sonde (connect_ex avec un nom d'hôte), une par scan, ou le cache TTL partagé.
+Mesure aussi la résolution en masse (séquentielle vs parallèle) et un balayage multi-hôtes.
+
+Usage : python -m benchmarks.bench_resolver [--hosts 500] [--ports 1000] [--scans 5] [--latency 0.005]
+"""
+import argparse
+import contextlib
+import io
+import asyncio
+import time
+
+from benchmarks.fixtures import StubDnsServer
+from modules.port_scanner import PortScanner
+from modules.resolver import Resolver
+from modules.sweep_scheduler import SweepScheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=500, help="noms d'hôtes du balayage et de la résolution en masse")
+    parser.add_argument("--ports", type=int, default=1000, help="ports par scan")
+    parser.add_argument("--scans", type=int, default=5, help="scans successifs du même hôte")
+    parser.add_argument("--latency", type=float, default=0.005, help="latence du serveur DNS (s)")
+    args = parser.parse_args()
+
+    names = [f"host{i}.scan.test" for i in range(args.hosts)]
+    # Un hôte sur dix n'a qu'une adresse IPv6
+    records = {name: ({"AAAA": "::1"} if i % 10 == 9 else {"A": "127.0.0.1", "AAAA": "::1"})
+               for i, name in enumerate(names)}
+
+    with StubDnsServer(records, latency=args.latency) as dns:
+        # 1. Scans répétés d'un même hôte
+        uncached = Resolver(nameserver=dns.address, maxsize=0)
+        started = time.perf_counter()
+        for _ in range(args.ports):
+            uncached.resolve(names[0])
+        per_probe = time.perf_counter() - started
+        print(f"🐢 Résolution par sonde : {args.ports} requêtes pour un scan, {per_probe:.2f}s de résolution "
+              f"({args.ports * args.scans} requêtes pour {args.scans} scans)")
+
+        resolver = Resolver(nameserver=dns.address)
+        before = dns.queries
+        durations = []
+        for _ in range(args.scans):
+            scanner = PortScanner(names[0], 1, args.ports, engine="async", resolver=resolver,
+                                  on_open_port=lambda port: None)
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                scanner.run_scan()
+            durations.append(time.perf_counter() - started)
+        print(f"⚡ Cache TTL partagé : {dns.queries - before} requête(s) DNS pour {args.scans} scans | "
+              f"1er scan {durations[0] * 1000:.0f} ms, suivants {min(durations[1:] or durations) * 1000:.0f} ms")
+
+        # 2. Résolution en masse
+        sequential = Resolver(nameserver=dns.address)
+        started = time.perf_counter()
+        for name in names:
+            sequential.resolve(name)
+        sequential_time = time.perf_counter() - started
+        bulk = Resolver(nameserver=dns.address)
+        started = time.perf_counter()
+        resolved = asyncio.run(bulk.resolve_many(names))
+        bulk_time = time.perf_counter() - started
+        ipv6 = sum(1 for result in resolved.values() if result and result[1] == "::1")
+        print(f"📚 {args.hosts} noms : séquentiel {sequential_time:.2f}s | parallèle ({bulk.concurrency}) "
+              f"{bulk_time:.2f}s (x{sequential_time / bulk_time:.0f}) | {ipv6} en IPv6 seul")
+
+        # 3. Balayage multi-hôtes (10 ports par hôte), résolution par lots
+        for label, concurrency in (("une par une", 1), ("par lots", 64)):
+            sweep_resolver = Resolver(nameserver=dns.address, concurrency=concurrency)
+            sweep = SweepScheduler(names, range(1, 11), resolver=sweep_resolver, timing="aggressive")
+            started = time.perf_counter()
+            stats = sweep.run()
+            print(f"🌐 Balayage de {stats['hosts_scanned']} hôtes, résolution {label} : "
+                  f"{time.perf_counter() - started:.2f}s ({stats['hosts_unresolved']} non résolus)")
+
+
+if __name__ == "__main__":
+    main()
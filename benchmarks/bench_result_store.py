@@ -0,0 +1,67 @@
+"""Benchmark de l'historique SQLite : requêtes sur un historique d'un million de ports ouverts
+
+Usage : python -m benchmarks.bench_result_store [--hosts 2000] [--scans 100] [--open 5]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from modules.result_store import ResultStore
+
+
+def timed(fn, runs=200):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return statistics.mean(samples) * 1000, samples[int(len(samples) * 0.99)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=2000)
+    parser.add_argument("--scans", type=int, default=100, help="scans par hôte")
+    parser.add_argument("--open", type=int, default=5, help="ports ouverts par scan")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    hosts = [f"10.{i // 65536}.{i // 256 % 256}.{i % 256}" for i in range(args.hosts)]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultStore(os.path.join(tmp, "results.db"))
+        base = time.time() - args.scans * 3600
+        started = time.perf_counter()
+        for n in range(args.scans):
+            for host in hosts:
+                ports = rng.sample(range(1, 1001), args.open)
+                store.record_scan(host, ports, 1, 1000, timestamp=base + n * 3600, duration=1.0)
+        duration = time.perf_counter() - started
+        total = args.hosts * args.scans
+        print(f"📥 {total} scans / {total * args.open} ports ouverts enregistrés en {duration:.1f}s "
+              f"({total / duration:.0f} scans/s) - base de {os.path.getsize(store.path) / 2 ** 20:.0f} Mo")
+
+        def pick():
+            return rng.choice(hosts)
+
+        scan_ids = [s["scan_id"] for s in store.history(hosts[0], limit=2)]
+        queries = {
+            "history(host)": lambda: store.history(pick(), limit=50),
+            "history(host, port)": lambda: store.history(pick(), port=rng.randrange(1, 1001), limit=50),
+            "latest(host)": lambda: store.latest(pick()),
+            "latest_per_host(100)": lambda: store.latest_per_host(100, rng.randrange(args.hosts)),
+            "diff(a, b)": lambda: store.diff(*scan_ids),
+            "diff_latest(host)": lambda: store.diff_latest(pick()),
+            "port_last_seen_open": lambda: store.port_last_seen_open(pick(), rng.randrange(1, 1001)),
+        }
+        for label, query in queries.items():
+            mean, p99 = timed(query)
+            print(f"{label:>22} | moyenne {mean:6.2f} ms | p99 {p99:6.2f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark de la détection de service : latence ajoutée par port ouvert, sur des services factices locaux
+
+Vérifie aussi que chaque service factice est vu ouvert et correctement identifié :
+code de sortie 1 sinon.
+
+Usage : python -m benchmarks.bench_service_detection [--replicas 10] [--closed 5000] [--engine async]
+"""
+import argparse
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.fixtures import StandInServiceFarm
+from modules.port_scanner import PortScanner
+from modules.report_generator import ReportGenerator
+
+# Service attendu pour chaque serveur factice (None : rien d'identifiable)
+EXPECTED = {"ssh": "ssh", "ftp": "ftp", "smtp": "smtp", "http": "http", "tls": "tls", "silent": None}
+
+
+def run(ports, engine, detect):
+    opened, detected = {}, {}
+    scanner = PortScanner("127.0.0.1", ports=ports, engine=engine, detect_services=detect,
+                          on_open_port=lambda port: opened.setdefault(port, time.perf_counter()),
+                          on_service=lambda port, info: detected.setdefault(port, time.perf_counter()))
+    started = time.perf_counter()
+    scanner.run_scan()
+    return time.perf_counter() - started, scanner, opened, detected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--replicas", type=int, default=10, help="instances de chaque service factice")
+    parser.add_argument("--closed", type=int, default=5000, help="ports fermés ajoutés au scan")
+    parser.add_argument("--engine", choices=PortScanner.ENGINES, default="async")
+    args = parser.parse_args()
+
+    with StandInServiceFarm(replicas=args.replicas) as farm:
+        ports = sorted(set(farm.ports) | set(range(1, args.closed + 1)))
+        baseline, _, _, _ = run(ports, args.engine, detect=False)
+        duration, scanner, opened, detected = run(ports, args.engine, detect=True)
+
+        latencies = defaultdict(list)
+        errors = 0
+        missed = sorted(set(farm.ports) - set(scanner.open_ports))
+        if missed:
+            errors += len(missed)
+            print(f"❌ Ports ouverts manqués: {missed}")
+        for port, name in farm.ports.items():
+            info = scanner.services.get(port)
+            if (info["service"] if info else None) != EXPECTED[name]:
+                errors += 1
+                print(f"❌ {name} sur {port}: {info}")
+            if port in detected:
+                latencies[name].append((detected[port] - opened[port]) * 1000)
+
+    open_count = len(farm.ports)
+    print(f"🔓 {open_count} ports ouverts factices + {args.closed} fermés (moteur {args.engine})")
+    print(f"⏱️  Sans détection {baseline * 1000:.0f} ms | avec détection {duration * 1000:.0f} ms | "
+          f"+{(duration - baseline) * 1000 / open_count:.1f} ms par port ouvert (temps total)")
+    for name, values in sorted(latencies.items()):
+        print(f"  {name:>6} | identification en {statistics.mean(values):6.1f} ms en moyenne "
+              f"(max {max(values):6.1f} ms) après l'ouverture")
+    print(f"{'✅' if not errors else '❌'} {open_count - errors}/{open_count} services correctement identifiés")
+
+    assessment = ReportGenerator(asynchronous=False).assess_port_security(sorted(farm.ports), scanner.services)
+    print(f"⚠️  Évaluation: risque {assessment['overall_risk']} ({assessment['risk_ports_count']} ports à risque, "
+          f"dont {sum(r['detected'] for r in assessment['risky_ports'])} identifiés par leur service)")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
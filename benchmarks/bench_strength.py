@@ -0,0 +1,98 @@
+"""Benchmark des moteurs d'évaluation : latence et concordance legacy vs entropy
+
+Usage : python -m benchmarks.bench_strength [--rounds 200] [--details]
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from modules.password_checker import PasswordChecker
+
+# Corpus fixe : mots de passe faibles, motifs clavier, dates, l33t, phrases et aléatoires
+CORPUS = [
+    "123456", "password", "qwerty", "azerty", "Azerty123$", "Azerty123", "azertyuiop", "qwertyuiop",
+    "1qaz2wsx", "zxcvbnm", "asdfghjkl", "P@ssw0rd", "P@ssword1!", "J3t41m3!", "M0td3p4ss3",
+    "Soleil2023!", "Marseille13", "bonjour1", "Nicolas1987", "camille01", "19/03/1987", "01011990",
+    "20031999", "1987", "aaaaaaaa", "abcabcabc", "zzzzzz99", "abcdef123", "987654321", "13579",
+    "letmein!", "Welcome1", "Dragon2024", "iloveyou", "trustno1", "Summer2020!", "Password123!",
+    "correcthorsebatterystaple", "Tr0ub4dor&3", "kX9#mQ2$vL7!pZ", "w7$Kp!2zQe", "h8Jm2Lq0",
+    "MySecurePass123!", "ChevalCorrectAgrafe", "la vie est belle", "Rm3!xQ", "ZaQ!2wsX",
+    "!QAZxsw2", "monkey123", "football10", "Chocolat!", "admin2024", "root", "Passw0rd!",
+    "Vx8#nT4@rQ1s", "ilovechocolate", "sunshine2", "Pr1nc3ss", "1234qwer", "qazwsxedc",
+]
+
+# Mots de passe longs : l'estimation est tronquée à 100 caractères, la latence doit rester bornée
+LONG_PASSWORDS = ["aZ9!qwerty" * 10, "aZ9!qwerty" * 20, "aZ9!qwerty" * 50, "x" * 1000]
+LONG_BUDGET_MS = 250
+
+
+def time_engine(checker, rounds):
+    latencies = []
+    for _ in range(rounds):
+        for password in CORPUS:
+            started = time.perf_counter()
+            checker.check_strength(password)
+            latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        "mean_us": statistics.mean(latencies) * 1e6,
+        "p50_us": latencies[len(latencies) // 2] * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99)] * 1e6,
+        "max_us": latencies[-1] * 1e6,
+    }
+
+
+def check_long_passwords(checker):
+    """Évalue les mots de passe longs ; renvoie le nombre d'échecs (exception ou budget dépassé)"""
+    failures = 0
+    for password in LONG_PASSWORDS:
+        started = time.perf_counter()
+        try:
+            checker.check_strength(password)
+        except Exception as e:
+            print(f"❌ {len(password)} caractères : {type(e).__name__}: {e}")
+            failures += 1
+            continue
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        ok = elapsed_ms <= LONG_BUDGET_MS
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {len(password)} caractères : {elapsed_ms:.1f} ms (budget {LONG_BUDGET_MS} ms)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--details", action="store_true", help="affiche les évaluations divergentes")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    engines = {"legacy": PasswordChecker(mode="legacy"), "entropy": PasswordChecker(mode="entropy")}
+    print(f"⚙️  Initialisation des deux moteurs: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    for name, checker in engines.items():
+        stats = time_engine(checker, args.rounds)
+        print(f"{name:>8} | moyenne {stats['mean_us']:7.1f} µs | p50 {stats['p50_us']:7.1f} µs | "
+              f"p99 {stats['p99_us']:7.1f} µs | max {stats['max_us']:7.1f} µs")
+
+    agree = 0
+    rows = []
+    for password in CORPUS:
+        legacy = engines["legacy"].check_strength(password)
+        entropy = engines["entropy"].check_strength(password)
+        agree += legacy[1] == entropy[1]
+        if legacy[1] != entropy[1]:
+            rows.append((password, legacy, entropy))
+    print(f"🤝 Concordance des évaluations: {agree}/{len(CORPUS)} ({agree * 100 / len(CORPUS):.0f}%)")
+    if args.details:
+        for password, legacy, entropy in rows:
+            print(f"  {password:<28} legacy {legacy[1]:<12} ({legacy[0]:>3}) | entropy {entropy[1]:<12} ({entropy[0]:>3})")
+
+    print("📏 Mots de passe longs (moteur entropy)")
+    failures = check_long_passwords(engines["entropy"])
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
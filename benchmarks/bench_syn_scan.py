@@ -0,0 +1,83 @@
+"""Benchmark du scan SYN (socket brut) face au scan par connexion, sur la boucle locale
+
+Nécessite Linux et CAP_NET_RAW (root) pour le moteur SYN. --check-fallback relance
+un scan sans privilèges (utilisateur nobody) pour vérifier le repli sur le scan connect.
+Code de sortie 1 si un port ouvert est manqué, si un port filtré est vu ouvert ou si le
+repli ne se fait pas.
+
+Usage : python -m benchmarks.bench_syn_scan [--end 65535] [--rates 10000,50000,100000] [--check-fallback]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+from benchmarks.fixtures import LocalListenerFarm
+from modules.port_scanner import PortScanner
+from modules.syn_scan import syn_scan_available
+
+
+def open_fds():
+    return len(os.listdir("/proc/self/fd"))
+
+
+def scan(engine, end, farm, **options):
+    peak = [open_fds()]
+    scanner = PortScanner("127.0.0.1", 1, end, engine=engine, timing="aggressive",
+                          on_open_port=lambda port: peak.append(open_fds()), **options)
+    started = time.perf_counter()
+    open_ports = scanner.run_scan()
+    duration = time.perf_counter() - started
+    missing = sorted(port for port in set(farm.ports) - set(open_ports) if port <= end)
+    filtered_reported = [p for p in farm.blackholed_ports if p in open_ports]
+    return scanner, duration, open_ports, missing, filtered_reported, max(peak)
+
+
+def fallback_check(results):
+    os.setgid(65534)
+    os.setuid(65534)
+    import modules.syn_scan as syn_scan
+    syn_scan._available = None
+    scanner = PortScanner("127.0.0.1", 1, 100, engine="syn", on_open_port=lambda port: None)
+    scanner.run_scan()
+    results.put(scanner.engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--end", type=int, default=65535)
+    parser.add_argument("--rates", default="10000,50000,100000", help="débits SYN testés (paquets/s)")
+    parser.add_argument("--listeners", type=int, default=20)
+    parser.add_argument("--check-fallback", action="store_true")
+    args = parser.parse_args()
+
+    if not syn_scan_available():
+        print("⚠️  Scan SYN indisponible ici (Linux + CAP_NET_RAW requis)")
+
+    failures = 0
+    with LocalListenerFarm(count=args.listeners, blackholed=2) as farm:
+        runs = [("connect async", "async", {})]
+        runs += [(f"syn {int(rate)} p/s", "syn", {"packet_rate": int(rate)}) for rate in args.rates.split(",")]
+        for label, engine, options in runs:
+            scanner, duration, open_ports, missing, filtered, peak = scan(engine, args.end, farm, **options)
+            ok = not missing and not filtered
+            failures += not ok
+            print(f"{'✅' if ok else '❌'} {label:>16} | {duration:6.2f}s | {args.end / duration:8.0f} ports/s | "
+                  f"{len(open_ports)} ouverts, {len(missing)} manqués, {len(filtered)} filtrés vus ouverts | "
+                  f"fd max {peak} | moteur effectif {scanner.engine}")
+
+    if args.check_fallback:
+        ctx = multiprocessing.get_context("fork")
+        results = ctx.Queue()
+        process = ctx.Process(target=fallback_check, args=(results,))
+        process.start()
+        engine = results.get(timeout=60)
+        process.join()
+        failures += engine == "syn"
+        print(f"{'✅' if engine != 'syn' else '❌'} Sans privilèges, engine='syn' s'exécute avec le moteur: {engine}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
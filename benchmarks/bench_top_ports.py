@@ -0,0 +1,77 @@
+"""Rendement des scans « top N » : part des services ouverts trouvés selon le nombre de sondes
+
+Simule une population d'hôtes sur 127.0.0.2, 127.0.0.3... : chaque port de la
+table des services y est ouvert avec sa fréquence (mise à l'échelle), plus quelques
+ports rares hors table. Chaque hôte est ensuite scanné avec différents budgets.
+
+Usage : python -m benchmarks.bench_top_ports [--hosts 30] [--scale 1.0] [--budgets 10,100,1000]  (ajouter 65535 pour le scan complet, ~150 s)
+"""
+import argparse
+import random
+import socket
+import time
+
+from modules.port_scanner import PortScanner
+from modules.services import get_service_table
+
+
+def open_population(hosts, scale, rare, seed):
+    rng = random.Random(seed)
+    table = get_service_table()
+    ranked = list(table.ranked["tcp"])
+    population, sockets = {}, []
+    for index in range(hosts):
+        address = f"127.0.0.{index + 2}"
+        ports = {port for port in ranked if rng.random() < min(1.0, scale * _frequency(table, port))}
+        ports.update(rng.sample(range(20000, 65000), rare))
+        opened = set()
+        for port in ports:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            try:
+                sock.bind((address, port))
+                sock.listen(64)
+            except OSError:
+                sock.close()
+                continue
+            sockets.append(sock)
+            opened.add(port)
+        population[address] = opened
+    return population, sockets
+
+
+def _frequency(table, port):
+    # Décroissance par rang : la table ne conserve que l'ordre, pas les fréquences
+    return 0.5 / (1 + table.rank(port, "tcp")) ** 0.8
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=30)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplie la probabilité d'ouverture de chaque port")
+    parser.add_argument("--rare", type=int, default=1, help="ports hors table ouverts par hôte")
+    parser.add_argument("--budgets", default="10,100,1000")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    population, sockets = open_population(args.hosts, args.scale, args.rare, args.seed)
+    total_open = sum(len(ports) for ports in population.values())
+    print(f"🖥️  {args.hosts} hôtes, {total_open} ports ouverts ({total_open / args.hosts:.1f} par hôte)")
+    try:
+        for budget in map(int, args.budgets.split(",")):
+            found, probes = 0, 0
+            started = time.perf_counter()
+            for address, expected in population.items():
+                scanner = PortScanner(address, port_spec=f"top:{budget}", engine="async", timing="aggressive",
+                                      on_open_port=lambda port: None)
+                found += len(expected & set(scanner.run_scan()))
+                probes += scanner.scanned
+            elapsed = time.perf_counter() - started
+            print(f"top:{budget:<6} | {probes / args.hosts:8.0f} sondes/hôte | "
+                  f"{100 * found / total_open:5.1f}% des ports ouverts trouvés | {elapsed:6.2f}s")
+    finally:
+        for sock in sockets:
+            sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Benchmark du scan UDP : débit et justesse de classification selon le débit de paquets, sur la boucle locale
+
+Répondeurs (ouverts), ports muets (open|filtered) et tout le reste de la plage (fermés,
+ICMP port injoignable). Hors boucle locale, Linux limite les ICMP (net.ipv4.icmp_ratelimit,
+icmp_msgs_per_sec) : au-delà, des ports fermés apparaissent muets, d'où le seau à jetons.
+
+Usage : python -m benchmarks.bench_udp_scan [--end 5000] [--rates 1000,5000,20000]
+"""
+import argparse
+import time
+
+from benchmarks.fixtures import UdpStandInFarm
+from modules.port_scanner import PortScanner
+from modules.udp_scan import UDP_PAYLOADS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--end", type=int, default=5000, help="dernier port de la plage scannée")
+    parser.add_argument("--rates", default="1000,5000,20000", help="débits testés (paquets/s)")
+    parser.add_argument("--responders", type=int, default=5)
+    parser.add_argument("--silent", type=int, default=5)
+    parser.add_argument("--timing", default="aggressive")
+    args = parser.parse_args()
+
+    # Ports de charge utile connue (DNS, SNMP...) : répondeurs qui ignorent un datagramme vide
+    with UdpStandInFarm(args.responders, args.silent, protocol_ports=[p for p in UDP_PAYLOADS if p <= 1024]) as farm:
+        expected_open = {p for p, kind in farm.ports.items() if kind in ("responder", "protocol")}
+        expected_silent = {p for p, kind in farm.ports.items() if kind == "silent"}
+        ports = sorted(set(range(1, args.end + 1)) | set(farm.ports))
+        print(f"📶 {len(ports)} ports UDP : {len(expected_open)} répondeurs "
+              f"(dont {sum(k == 'protocol' for k in farm.ports.values())} protocolaires), {len(expected_silent)} muets")
+        for rate in args.rates.split(","):
+            scanner = PortScanner("127.0.0.1", ports=ports, protocol="udp", timing=args.timing,
+                                  packet_rate=int(rate), on_open_port=lambda port: None)
+            started = time.perf_counter()
+            open_ports = set(scanner.run_scan())
+            duration = time.perf_counter() - started
+            muted = set(scanner.open_filtered)
+            # Fermés vus muets : ICMP perdus ou limités
+            false_silent = len(muted - expected_silent)
+            print(f"{rate:>6} p/s | {duration:6.2f}s | {len(ports) / duration:7.0f} ports/s | "
+                  f"ouverts {len(open_ports & expected_open)}/{len(expected_open)} | "
+                  f"muets {len(muted & expected_silent)}/{len(expected_silent)} | "
+                  f"fermés vus muets {false_silent} | retransmissions {scanner.timing.summary()['retries']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark du dictionnaire de mots de passe : set Python vs index Bloom + empreintes triées
+
+Chaque variante est mesurée dans un processus séparé (RSS isolé).
+
+Usage : python -m benchmarks.bench_wordlist_index [--entries 2000000] [--lookups 100000]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from modules.wordlist_index import WordlistIndex
+
+
+def rss_mb():
+    # /proc/self/statm : pages résidentes en 2e position (Linux)
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def load_set(path):
+    with open(path, "r", encoding="utf-8", errors="surrogateescape") as f:
+        return {line.rstrip("\r\n").lower() for line in f}
+
+
+def load_index(path):
+    return WordlistIndex(os.path.dirname(path)).load()
+
+
+def measure(loader, path, hits, misses, results):
+    baseline = rss_mb()
+    started = time.perf_counter()
+    words = loader(path)
+    load_time = time.perf_counter() - started
+
+    timings = {}
+    for label, sample in (("hit", hits), ("miss", misses)):
+        started = time.perf_counter()
+        found = sum(1 for word in sample if word in words)
+        timings[label] = (time.perf_counter() - started) / len(sample) * 1e6
+        timings[f"{label}_found"] = found
+    results.put((load_time, rss_mb() - baseline, timings))
+
+
+def run(loader, path, hits, misses):
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    process = ctx.Process(target=measure, args=(loader, path, hits, misses, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=2_000_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dictionary.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            for i in range(args.entries):
+                f.write(f"pass{i:x}{rng.randrange(1000)}\n")
+        with open(path, encoding="utf-8") as f:
+            words = [line.rstrip("\n") for line in f]
+        hits = rng.sample(words, min(args.lookups, len(words)))
+        misses = [f"absent-{i}" for i in range(args.lookups)]
+        del words
+
+        started = time.perf_counter()
+        WordlistIndex(tmp).load()
+        print(f"📦 Index de {args.entries} mots construit en {time.perf_counter() - started:.1f}s "
+              f"({sum(os.path.getsize(os.path.join(tmp, '.cache', n)) for n in ('bloom.bin', 'fingerprints.bin')) / 2 ** 20:.1f} Mo sur disque)")
+
+        for label, loader in (("set Python", load_set), ("index", load_index)):
+            load_time, rss, timings = run(loader, path, hits, misses)
+            print(f"{label:>10} | chargement {load_time * 1000:8.1f} ms | RSS +{rss:7.1f} Mo | "
+                  f"présent {timings['hit']:5.2f} µs ({timings['hit_found']}/{len(hits)}) | "
+                  f"absent {timings['miss']:5.2f} µs ({timings['miss_found']} faux positifs)")
+
+
+if __name__ == "__main__":
+    main()
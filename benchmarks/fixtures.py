@@ -0,0 +1,414 @@
+"""Fixtures locales pour les benchmarks (aucun accès réseau externe)"""
+import asyncio
+import hashlib
+import heapq
+import random
+import socket
+import socketserver
+import string
+import struct
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LocalListenerFarm:
+    """Ouvre des ports en écoute sur la boucle locale, fermés à la sortie du bloc with
+
+    Les ports "blackholed" ont une file d'attente saturée : Linux ignore alors
+    les SYN suivants, ce qui reproduit un port filtré (expiration sans réponse).
+    """
+
+    def __init__(self, count=10, host="127.0.0.1", blackholed=0):
+        self.count = count
+        self.host = host
+        self.blackholed = blackholed
+        self.sockets = []
+        self.ports = []
+        self.blackholed_ports = []
+
+    def __enter__(self):
+        for _ in range(self.count):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.host, 0))
+            # Le backlog absorbe les connexions des scans sans accept()
+            sock.listen(1024)
+            self.sockets.append(sock)
+            self.ports.append(sock.getsockname()[1])
+        for _ in range(self.blackholed):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.bind((self.host, 0))
+            sock.listen(0)
+            port = sock.getsockname()[1]
+            self.sockets.append(sock)
+            # Remplit la file d'attente du listener sans jamais appeler accept()
+            for _ in range(3):
+                filler = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                filler.setblocking(False)
+                filler.connect_ex((self.host, port))
+                self.sockets.append(filler)
+            self.blackholed_ports.append(port)
+        if self.blackholed:
+            time.sleep(0.1)
+        self.ports.sort()
+        self.blackholed_ports.sort()
+        return self
+
+    def __exit__(self, *exc):
+        for sock in self.sockets:
+            sock.close()
+        self.sockets = []
+
+
+# Serveurs de substitution : (bannière envoyée à la connexion, réponse à une requête HTTP, à un ClientHello)
+STAND_IN_SERVICES = {
+    "ssh": (b"SSH-2.0-OpenSSH_9.6p1 Debian-4\r\n", None, None),
+    "ftp": (b"220 (vsFTPd 3.0.5)\r\n", None, None),
+    "smtp": (b"220 mail.local ESMTP Postfix (Debian)\r\n", None, None),
+    "http": (None, b"HTTP/1.1 200 OK\r\nServer: nginx/1.24.0\r\nContent-Length: 0\r\n\r\n", None),
+    # ServerHello TLS 1.2 minimal (seul l'en-tête d'enregistrement est analysé)
+    "tls": (None, b"\x15\x03\x03\x00\x02\x02\x46", b"\x16\x03\x03\x00\x31\x02\x00\x00\x2d\x03\x03" + bytes(41)),
+    "silent": (None, None, None),
+}
+
+
+class StandInServiceFarm:
+    """Services TCP factices sur la boucle locale (bannières SSH/FTP/SMTP, HTTP, TLS, port muet)"""
+
+    def __init__(self, services=tuple(STAND_IN_SERVICES), host="127.0.0.1", replicas=1):
+        self.services = list(services)
+        self.host = host
+        self.replicas = replicas
+        self.servers = []
+        # port -> nom du service attendu
+        self.ports = {}
+
+    def __enter__(self):
+        for name in self.services * self.replicas:
+            greeting, http_reply, tls_reply = STAND_IN_SERVICES[name]
+
+            class Handler(socketserver.BaseRequestHandler):
+                def handle(self, greeting=greeting, http_reply=http_reply, tls_reply=tls_reply):
+                    self.request.settimeout(2)
+                    try:
+                        if greeting:
+                            self.request.sendall(greeting)
+                        data = self.request.recv(4096)
+                        if data.startswith(b"\x16\x03") and tls_reply:
+                            self.request.sendall(tls_reply)
+                        elif data and http_reply:
+                            self.request.sendall(http_reply)
+                        elif data and greeting:
+                            self.request.sendall(b"500 Command not recognized\r\n")
+                    except OSError:
+                        pass
+
+            server = socketserver.ThreadingTCPServer((self.host, 0), Handler)
+            server.daemon_threads = True
+            server.request_queue_size = 128
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self.servers.append(server)
+            self.ports[server.server_address[1]] = name
+        return self
+
+    def __exit__(self, *exc):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        self.servers = []
+
+
+class UdpStandInFarm:
+    """Ports UDP factices sur la boucle locale : répondeurs et ports muets (ouverts mais silencieux)
+
+    Un répondeur « protocolaire » ignore les datagrammes vides, comme un vrai
+    serveur DNS ou SNMP : seule la charge utile adaptée obtient une réponse.
+    """
+
+    def __init__(self, responders=5, silent=5, host="127.0.0.1", protocol_ports=()):
+        self.host = host
+        self.counts = {"responder": responders, "silent": silent}
+        self.protocol_ports = list(protocol_ports)
+        self.sockets = []
+        # port -> "responder" | "silent" | "protocol"
+        self.ports = {}
+        self.stop = threading.Event()
+
+    def _bind(self, port=0):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind((self.host, port))
+        self.sockets.append(sock)
+        return sock
+
+    def _serve(self, sock, ignore_empty):
+        sock.settimeout(0.1)
+        while not self.stop.is_set():
+            try:
+                data, peer = sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            if data or not ignore_empty:
+                sock.sendto(b"ok:" + data[:32], peer)
+
+    def __enter__(self):
+        for kind, count in self.counts.items():
+            for _ in range(count):
+                sock = self._bind()
+                self.ports[sock.getsockname()[1]] = kind
+                if kind == "responder":
+                    threading.Thread(target=self._serve, args=(sock, False), daemon=True).start()
+        for port in self.protocol_ports:
+            try:
+                sock = self._bind(port)
+            except OSError:
+                # Port privilégié ou déjà pris : on s'en passe
+                continue
+            self.ports[port] = "protocol"
+            threading.Thread(target=self._serve, args=(sock, True), daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        for sock in self.sockets:
+            sock.close()
+        self.sockets = []
+
+
+class StubDnsServer:
+    """Serveur DNS factice (UDP, boucle locale) : noms connus -> adresse, latence simulée, requêtes comptées
+
+    Les réponses sont différées par un thread d'émission (file de priorité) :
+    la latence ne sérialise pas les requêtes, comme un vrai résolveur.
+    """
+
+    def __init__(self, records, ttl=300, latency=0.005, host="127.0.0.1"):
+        # nom -> {"A": "127.0.0.1", "AAAA": "::1"}
+        self.records = {name.lower().rstrip("."): addresses for name, addresses in records.items()}
+        self.ttl = ttl
+        self.latency = latency
+        self.host = host
+        self.queries = 0
+        self.stop = threading.Event()
+
+    def __enter__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((self.host, 0))
+        self.sock.settimeout(0.1)
+        self.address = self.sock.getsockname()
+        self.outgoing = []
+        self.ready = threading.Condition()
+        threading.Thread(target=self._receive, daemon=True).start()
+        threading.Thread(target=self._send, daemon=True).start()
+        return self
+
+    def _answer(self, query):
+        ident, = struct.unpack_from("!H", query)
+        offset, labels = 12, []
+        while query[offset]:
+            labels.append(query[offset + 1:offset + 1 + query[offset]].decode())
+            offset += query[offset] + 1
+        qtype, = struct.unpack_from("!H", query, offset + 1)
+        question = query[12:offset + 5]
+        addresses = self.records.get(".".join(labels).lower())
+        if addresses is None:
+            return struct.pack("!HHHHHH", ident, 0x8183, 1, 0, 0, 0) + question
+        kind = {1: "A", 28: "AAAA"}.get(qtype)
+        address = addresses.get(kind)
+        if address is None:
+            return struct.pack("!HHHHHH", ident, 0x8180, 1, 0, 0, 0) + question
+        rdata = socket.inet_pton(socket.AF_INET if kind == "A" else socket.AF_INET6, address)
+        answer = b"\xc0\x0c" + struct.pack("!HHIH", qtype, 1, self.ttl, len(rdata)) + rdata
+        return struct.pack("!HHHHHH", ident, 0x8180, 1, 1, 0, 0) + question + answer
+
+    def _receive(self):
+        while not self.stop.is_set():
+            try:
+                query, peer = self.sock.recvfrom(512)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            self.queries += 1
+            with self.ready:
+                heapq.heappush(self.outgoing, (time.monotonic() + self.latency, self.queries, self._answer(query), peer))
+                self.ready.notify()
+
+    def _send(self):
+        while not self.stop.is_set():
+            with self.ready:
+                if not self.outgoing:
+                    self.ready.wait(0.1)
+                    continue
+                due, _, reply, peer = self.outgoing[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self.ready.wait(delay)
+                    continue
+                heapq.heappop(self.outgoing)
+            try:
+                self.sock.sendto(reply, peer)
+            except OSError:
+                return
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.sock.close()
+
+
+def synthetic_passwords(count, leaked=(), seed=0):
+    """Corpus synthétique : mots de passe aléatoires, variantes faibles et 10 % de mots de passe fuités"""
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + "!@#$%"
+    leaked = list(leaked)
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.1 and leaked:
+            yield rng.choice(leaked)
+        elif roll < 0.4:
+            yield f"{rng.choice(['azerty', 'soleil', 'Marseille', 'dragon'])}{rng.randrange(100)}"
+        else:
+            yield "".join(rng.choice(alphabet) for _ in range(rng.randint(6, 16)))
+
+
+def hibp_entries(passwords, count=42):
+    """Empreintes SHA-1 triées au format HIBP (HASH, nombre d'occurrences)"""
+    return sorted((hashlib.sha1(p.encode()).hexdigest().upper(), count) for p in passwords)
+
+
+def write_hibp_dump(passwords, path):
+    """Écrit un extrait HIBP « ordered by hash » (lignes HASH:COUNT)"""
+    with open(path, "w", encoding="ascii") as f:
+        for digest, count in hibp_entries(passwords):
+            f.write(f"{digest}:{count}\n")
+
+
+class StubHibpServer:
+    """Doublure locale de l'API range HIBP : GET /range/<prefix>, avec latence simulée et compteur d'appels"""
+
+    def __init__(self, passwords=(), latency=0.0):
+        self.latency = latency
+        self.request_count = 0
+        self.lock = threading.Lock()
+        self.ranges = defaultdict(list)
+        for digest, count in hibp_entries(passwords):
+            self.ranges[digest[:5]].append(f"{digest[5:]}:{count}")
+        self.server = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_port}/range/"
+
+    def __enter__(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # En-têtes et corps partent dans des écritures séparées : sans TCP_NODELAY, ACK retardé de 40 ms
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                prefix = self.path.rsplit("/", 1)[-1].upper()
+                with stub.lock:
+                    stub.request_count += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                body = "\r\n".join(stub.ranges.get(prefix, [])).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class AsgiTestServer:
+    """Serveur HTTP/1.1 minimal pour une application ASGI (une requête par connexion)
+
+    Doublure d'uvicorn pour les benchmarks : la boucle asyncio tourne dans
+    un thread, comme serve_forever() pour les serveurs WSGI.
+    """
+
+    def __init__(self, application, host="127.0.0.1", backlog=1024):
+        self.application = application
+        self.host = host
+        self.backlog = backlog
+        self.loop = None
+        self.server = None
+        self.port = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin1").split()
+            headers = []
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin1").partition(":")
+                headers.append((name.strip().lower().encode("latin1"), value.strip().encode("latin1")))
+            length = int(dict(headers).get(b"content-length", b"0"))
+            body = await reader.readexactly(length) if length else b""
+            method, target = request_line[0], request_line[1]
+            path, _, query = target.partition("?")
+            scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+                     "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+                     "root_path": "", "headers": headers, "client": writer.get_extra_info("peername")[:2],
+                     "server": (self.host, self.port)}
+            delivered = False
+
+            async def receive():
+                nonlocal delivered
+                if not delivered:
+                    delivered = True
+                    return {"type": "http.request", "body": body, "more_body": False}
+                await asyncio.Event().wait()
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    lines = [f"HTTP/1.1 {message['status']} OK", "Connection: close"]
+                    lines += [f"{name.decode('latin1')}: {value.decode('latin1')}" for name, value in message["headers"]]
+                    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin1"))
+                else:
+                    writer.write(message.get("body", b""))
+                    await writer.drain()
+
+            await self.application(scope, receive, send)
+        finally:
+            writer.close()
+
+    def __enter__(self):
+        started = threading.Event()
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, 0, backlog=self.backlog))
+            self.port = self.server.sockets[0].getsockname()[1]
+            started.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        started.wait()
+        return self
+
+    def __exit__(self, *exc):
+        self.loop.call_soon_threadsafe(self.loop.stop)
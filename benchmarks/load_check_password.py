@@ -0,0 +1,121 @@
+"""Test de charge : N requêtes /check_password simultanées face à une doublure locale de l'API HIBP
+
+Compare trois configurations, chacune avec un cache froid :
+  flask                 serveur WSGI threadé, une requête HIBP par recherche non cachée, sans plafond
+                        (comportement historique)
+  flask + single-flight serveur WSGI threadé, recherches d'un même préfixe regroupées
+  asgi + single-flight  asgi.application, /check_password servi par asyncio
+
+Usage : python -m benchmarks.load_check_password [--requests 500] [--distinct 50] [--latency 0.05] [--max-upstream 32]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import Future
+
+from werkzeug.serving import make_server
+
+import app as dashboard
+import asgi
+from benchmarks.fixtures import AsgiTestServer, StubHibpServer
+from modules.breach_backends import HibpRangeBackend
+
+
+class UncoalescedBackend(HibpRangeBackend):
+    """Comportement d'avant le single-flight : chaque recherche non cachée part vers l'API"""
+
+    def _join_flight(self, prefix):
+        return Future(), True
+
+    def _fetch_upstream(self, prefix, future):
+        try:
+            text = self.cache.get(prefix)
+            if text is None:
+                # Ni regroupement ni plafond : autant de requêtes HIBP que de recherches simultanées
+                text = self._request(prefix)
+                self.cache.set(prefix, text)
+            future.set_result(text)
+        except Exception as e:
+            future.set_exception(e)
+
+
+async def post_password(host, port, password, latencies, results):
+    body = json.dumps({"password": password}).encode()
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b"POST /check_password HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\n"
+                 b"Content-Length: %d\r\nConnection: close\r\n\r\n%s" % (host.encode(), len(body), body))
+    # Les deux serveurs ferment la connexion après la réponse
+    response = await reader.read()
+    writer.close()
+    latencies.append(time.perf_counter() - started)
+    results.append(json.loads(response.partition(b"\r\n\r\n")[2]))
+
+
+def load(url, passwords, output):
+    """Processus client : toutes les requêtes partent ensemble depuis une boucle asyncio"""
+    host, port = url.split("//")[1].split(":")
+
+    async def run():
+        latencies, results = [], []
+        started = time.perf_counter()
+        await asyncio.gather(*(post_password(host, int(port), password, latencies, results)
+                               for password in passwords))
+        return time.perf_counter() - started, sorted(latencies), results
+
+    output.put(asyncio.run(run()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--distinct", type=int, default=50, help="mots de passe distincts dans la charge")
+    parser.add_argument("--latency", type=float, default=0.05, help="latence de la doublure HIBP (s)")
+    parser.add_argument("--max-upstream", type=int, default=32, help="requêtes HIBP simultanées au plus")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    pool = [f"motdepasse{i}" for i in range(args.distinct)]
+    leaked = pool[::2]
+    passwords = [rng.choice(pool) for _ in range(args.requests)]
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    wsgi_server = make_server("127.0.0.1", 0, dashboard.app, threaded=True)
+    # File d'attente élargie : sans cela, les SYN au-delà de 128 connexions en attente sont perdus (1 s de retransmission)
+    wsgi_server.socket.listen(1024)
+    threading.Thread(target=wsgi_server.serve_forever, daemon=True).start()
+    servers = [("flask", UncoalescedBackend, f"http://127.0.0.1:{wsgi_server.server_port}"),
+               ("flask + single-flight", HibpRangeBackend, f"http://127.0.0.1:{wsgi_server.server_port}")]
+
+    with StubHibpServer(leaked, latency=args.latency) as stub, AsgiTestServer(asgi.application) as asgi_server:
+        servers.append(("asgi + single-flight", HibpRangeBackend, asgi_server.url))
+        print(f"📨 {args.requests} requêtes simultanées, {args.distinct} mots de passe distincts, "
+              f"HIBP à {args.latency * 1000:.0f} ms, {args.max_upstream} requêtes HIBP simultanées au plus")
+        for name, backend_class, base_url in servers:
+            backend = backend_class(stub.url, pool_size=args.max_upstream, max_upstream=args.max_upstream)
+            dashboard.checker_tool.breach_backend = backend
+            calls_before = stub.request_count
+            # Clients dans un processus séparé : leur coût n'est pas compté dans celui du serveur
+            output = multiprocessing.Queue()
+            client = multiprocessing.Process(target=load, args=(base_url, passwords, output))
+            client.start()
+            elapsed, latencies, results = output.get()
+            client.join()
+            breached = sum(1 for result in results if result["breached"])
+            expected = sum(1 for password in passwords if password in leaked)
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            print(f"{name:<22} | {stub.request_count - calls_before:4} appels HIBP "
+                  f"({backend.coalesced} regroupés) | p50 {statistics.median(latencies) * 1000:6.0f} ms | "
+                  f"p99 {p99 * 1000:6.0f} ms | {args.requests / elapsed:5.0f} req/s | "
+                  f"compromis {breached}/{expected} {'✅' if breached == expected else '❌'}")
+    wsgi_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Test de charge : N requêtes /scan_ports simultanées, descripteurs ouverts et latence
+
+Le serveur Flask tourne dans le même processus que les clients, ce qui
+permet d'échantillonner /proc/self/fd (Linux) pendant toute la charge.
+
+Usage : python -m benchmarks.load_scan_jobs [--requests 50] [--end 5000]
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from werkzeug.serving import make_server
+
+import app as dashboard
+from benchmarks.fixtures import LocalListenerFarm
+from modules.scan_jobs import ScanJobManager
+
+
+def open_fds():
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except FileNotFoundError:  # hors Linux
+        return -1
+
+
+class FdSampler(threading.Thread):
+    def __init__(self, interval=0.01):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = open_fds()
+        self.running = True
+
+    def run(self):
+        while self.running:
+            self.peak = max(self.peak, open_fds())
+            time.sleep(self.interval)
+
+
+def post_scan(url, body, latencies, statuses):
+    request = urllib.request.Request(url, data=json.dumps(body).encode(),
+                                     headers={"Content-Type": "application/json"})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=600) as response:
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    latencies.append(time.perf_counter() - started)
+    statuses.append(status)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--end", type=int, default=5000, help="dernier port scanné par requête")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-open-sockets", type=int, default=512)
+    parser.add_argument("--per-client-jobs", type=int, default=None,
+                        help="quota par client (défaut: illimité pour la mesure)")
+    args = parser.parse_args()
+
+    dashboard.scan_jobs = ScanJobManager(workers=args.workers, max_open_sockets=args.max_open_sockets,
+                                         queue_size=max(100, args.requests),
+                                         per_client_jobs=args.per_client_jobs or args.requests)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, dashboard.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/scan_ports"
+
+    with LocalListenerFarm(10) as farm, contextlib.redirect_stdout(io.StringIO()):
+        baseline = open_fds()
+        sampler = FdSampler()
+        sampler.start()
+        latencies, statuses = [], []
+        body = {"target": farm.host, "start_port": 1, "end_port": args.end, "engine": "async"}
+        clients = [threading.Thread(target=post_scan, args=(url, body, latencies, statuses))
+                   for _ in range(args.requests)]
+        started = time.perf_counter()
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        elapsed = time.perf_counter() - started
+        sampler.running = False
+        sampler.join()
+
+    server.shutdown()
+    dashboard.scan_jobs.shutdown()
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"📨 {args.requests} requêtes x {args.end} ports en {elapsed:.2f}s "
+          f"({args.requests * args.end / elapsed:,.0f} ports/s)")
+    print(f"✅ Statuts HTTP: { {code: statuses.count(code) for code in sorted(set(statuses))} }")
+    print(f"⏱️  Latence p50: {statistics.median(latencies):.2f}s | p99: {p99:.2f}s | max: {latencies[-1]:.2f}s")
+    print(f"📂 Descripteurs: {baseline} au repos, pic {sampler.peak} "
+          f"(plafond sockets de scan: {args.max_open_sockets} + 2 par requête HTTP)")
+
+
+if __name__ == "__main__":
+    main()
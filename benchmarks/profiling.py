@@ -0,0 +1,109 @@
+"""Capture des chemins chauds pendant un benchmark : cProfile ou échantillonnage de tous les threads"""
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+
+MODES = ("cprofile", "sample")
+# Thread en attente (verrou, select, file) : ignoré, comme le mode par défaut de py-spy
+IDLE_MODULES = ("threading.py", "selectors.py", "queue.py", "socketserver.py")
+
+
+def _short(path):
+    """Chemin relatif au dépôt ; bibliothèque standard et paquets réduits à leurs deux derniers éléments"""
+    if path.startswith(("<", "~")):
+        return path
+    relative = os.path.relpath(path)
+    return relative if not relative.startswith("..") else "/".join(path.split(os.sep)[-2:])
+
+
+def _label(code):
+    return f"{_short(code.co_filename)}:{code.co_firstlineno}({code.co_name})"
+
+
+class SamplingProfiler:
+    """Échantillonneur à la py-spy : relève la pile de chaque thread toutes les interval secondes
+
+    cProfile ne voit que le thread qui l'a démarré ; ici, les threads de scan
+    et du serveur Flask sont échantillonnés eux aussi. Le surcoût ne dépend
+    que de la fréquence d'échantillonnage, pas du nombre d'appels.
+    """
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.samples = 0
+        # Fonction en cours d'exécution (temps propre) et fonctions présentes sur la pile (temps inclus)
+        self.own = Counter()
+        self.inclusive = Counter()
+        # Piles repliées « a;b;c » (format d'entrée de flamegraph.pl et speedscope)
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def _sample(self):
+        me = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me or frame.f_code.co_filename.endswith(IDLE_MODULES):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_label(frame.f_code))
+                    frame = frame.f_back
+                if not stack:
+                    continue
+                self.samples += 1
+                self.own[stack[0]] += 1
+                self.inclusive.update(set(stack))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self.thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def hot_paths(self, top=15):
+        total = self.samples or 1
+        return [{"function": name, "own_percent": round(100 * count / total, 1),
+                 "inclusive_percent": round(100 * self.inclusive[name] / total, 1)}
+                for name, count in self.own.most_common(top)]
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def profile_call(function, mode, output_dir=None, name="profile", top=15):
+    """Exécute function() sous le profileur choisi ; retourne (résultat, résumé des chemins chauds)
+
+    Avec output_dir, le profil complet est aussi écrit : <name>.prof (pstats,
+    snakeviz) en mode cprofile, <name>.folded (piles repliées) en mode sample.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Profileur inconnu: {mode}")
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        result = profiler.runcall(function)
+        stats = pstats.Stats(profiler)
+        if output_dir:
+            stats.dump_stats(os.path.join(output_dir, f"{name}.prof"))
+        entries = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+        hot = [{"function": f"{_short(path)}:{line}({func})",
+                "calls": calls, "tottime": round(tottime, 6), "cumtime": round(cumtime, 6)}
+               for (path, line, func), (_, calls, tottime, cumtime, _) in entries]
+        return result, {"mode": mode, "hot_paths": hot}
+    profiler = SamplingProfiler()
+    profiler.start()
+    try:
+        result = function()
+    finally:
+        profiler.stop()
+    if output_dir:
+        profiler.dump(os.path.join(output_dir, f"{name}.folded"))
+    return result, {"mode": mode, "samples": profiler.samples, "hot_paths": profiler.hot_paths(top)}
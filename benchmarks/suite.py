@@ -0,0 +1,304 @@
+"""Suite de benchmarks de bout en bout : scan, mots de passe, rapports et endpoints Flask, résultats en JSON
+
+Tout tourne en local : ports ouverts, fermés et filtrés sur la boucle locale,
+doublure de l'API HIBP, corpus de mots de passe synthétique. Chaque cas est
+exécuté --repeat fois (médiane de chaque mesure). --compare confronte le
+résultat à un JSON précédent et sort avec le code 1 si une mesure se dégrade
+au-delà de --threshold. --profile relance chaque cas sous cProfile ou sous
+l'échantillonneur de tous les threads (voir benchmarks/profiling.py) ; les
+mesures restent celles des passages non profilés.
+
+Usage : python -m benchmarks.suite [--only scan,strength,breach,reports,flask] [--quick] [--repeat 3]
+        [--output bench_results.json] [--compare ancien.json] [--threshold 0.1]
+        [--profile cprofile|sample] [--profile-dir profiles]
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from benchmarks.fixtures import LocalListenerFarm, StubHibpServer, synthetic_passwords
+from benchmarks.profiling import MODES, profile_call
+from modules.breach_backends import HibpRangeBackend
+from modules.password_checker import PasswordChecker
+from modules.port_scanner import PortScanner
+from modules.report_generator import ReportGenerator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SIZES = {
+    "full": {"scan_ports": 20000, "passwords": 5000, "lookups": 2000, "reports": 2000, "requests": 400, "scans": 20},
+    "quick": {"scan_ports": 2000, "passwords": 500, "lookups": 200, "reports": 200, "requests": 50, "scans": 4},
+}
+
+# Sens de chaque mesure, d'après son suffixe (les autres ne sont que des compteurs)
+HIGHER_IS_BETTER = ("_per_sec",)
+LOWER_IS_BETTER = ("_ms", "_us", "_s")
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def timed(function, items):
+    """Durée de function(item) pour chaque item (secondes), et durée totale"""
+    latencies = []
+    started = time.perf_counter()
+    for item in items:
+        begin = time.perf_counter()
+        function(item)
+        latencies.append(time.perf_counter() - begin)
+    return latencies, time.perf_counter() - started
+
+
+def bench_scan(size):
+    """PortScanner.run_scan : ports/s des moteurs async et thread (ouverts, fermés et filtrés mélangés)"""
+    metrics, checks = {}, {}
+    with LocalListenerFarm(20, blackholed=2) as farm:
+        closed = range(20000, 20000 + size["scan_ports"])
+        ports = sorted(set(closed) | set(farm.ports) | set(farm.blackholed_ports))
+        for engine in ("async", "thread"):
+            scanner = PortScanner(farm.host, ports=ports, engine=engine, timing="aggressive",
+                                  on_open_port=lambda port: None)
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                open_ports = scanner.run_scan()
+            elapsed = time.perf_counter() - started
+            metrics[f"{engine}_ports_per_sec"] = round(len(ports) / elapsed)
+            metrics[f"{engine}_duration_s"] = round(elapsed, 3)
+            checks[f"{engine}_open_found"] = open_ports == farm.ports
+            checks[f"{engine}_filtered_found"] = all(port in scanner.states.filtered for port in farm.blackholed_ports)
+    metrics["ports"] = len(ports)
+    return metrics, checks
+
+
+def bench_strength(size):
+    """check_strength : latence par mot de passe, modes legacy et entropy"""
+    metrics = {}
+    corpus = list(synthetic_passwords(size["passwords"], seed=1))
+    for mode in PasswordChecker.MODES:
+        checker = PasswordChecker(mode=mode)
+        latencies, elapsed = timed(checker.check_strength, corpus)
+        metrics[f"{mode}_p50_us"] = round(1e6 * statistics.median(latencies), 1)
+        metrics[f"{mode}_p99_us"] = round(1e6 * percentile(latencies, 0.99), 1)
+        metrics[f"{mode}_checks_per_sec"] = round(len(corpus) / elapsed)
+    return metrics, {}
+
+
+def bench_breach(size):
+    """check_breach face à la doublure HIBP : cache froid (requête par préfixe) puis cache chaud"""
+    leaked = [f"leaked-{i}" for i in range(20000)]
+    corpus = list(synthetic_passwords(size["lookups"], leaked, seed=2))
+    leaked_set = set(leaked)
+    with StubHibpServer(leaked) as stub:
+        # Cache à la taille du corpus : le second passage mesure bien des succès de cache
+        backend = HibpRangeBackend(stub.url, cache_size=len(corpus))
+        checker = PasswordChecker(backend)
+        results = []
+        cold, cold_elapsed = timed(lambda password: results.append(checker.check_breach(password)), corpus)
+        warm, warm_elapsed = timed(checker.check_breach, corpus)
+    metrics = {
+        "cold_p50_ms": round(1e3 * statistics.median(cold), 3),
+        "cold_p99_ms": round(1e3 * percentile(cold, 0.99), 3),
+        "cold_lookups_per_sec": round(len(corpus) / cold_elapsed),
+        "warm_p50_us": round(1e6 * statistics.median(warm), 1),
+        "warm_lookups_per_sec": round(len(corpus) / warm_elapsed),
+        "upstream_requests": backend.upstream_requests,
+    }
+    return metrics, {"results_match": results == [password in leaked_set for password in corpus]}
+
+
+def bench_reports(size):
+    """Rapports : écriture synchrone, temps vu par l'appelant en arrière-plan, rapport de balayage en flux"""
+    hosts = [f"10.0.{i // 256}.{i % 256}" for i in range(size["reports"])]
+    open_ports = [22, 80, 443, 3306]
+    metrics = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        reporter = ReportGenerator(output_dir=tmp, asynchronous=False)
+        latencies, elapsed = timed(
+            lambda host: reporter.generate_port_scan_report(host, open_ports, "balayage", ports_scanned=1000), hosts)
+        metrics["sync_p50_ms"] = round(1e3 * statistics.median(latencies), 3)
+        metrics["sync_reports_per_sec"] = round(len(hosts) / elapsed)
+
+        reporter = ReportGenerator(output_dir=tmp)
+        latencies, _ = timed(
+            lambda host: reporter.generate_port_scan_report(host, open_ports, "balayage", ports_scanned=1000), hosts)
+        reporter.close()
+        metrics["async_caller_p50_us"] = round(1e6 * statistics.median(latencies), 1)
+
+        with reporter.open_sweep_report("suite") as report:
+            _, elapsed = timed(lambda host: report.add_host(host, open_ports, ports_scanned=1000), hosts)
+        metrics["sweep_hosts_per_sec"] = round(len(hosts) / elapsed)
+    return metrics, {"no_write_errors": reporter.errors == 0}
+
+
+def bench_flask(size):
+    """Endpoints Flask sous charge concurrente (8 clients) : /check_password, /metrics, /scan_ports"""
+    from werkzeug.serving import make_server
+
+    import app as dashboard
+    from modules.result_store import ResultStore
+    from modules.scan_jobs import ScanJobManager
+
+    metrics, checks = {}, {}
+    leaked = [f"leaked-{i}" for i in range(20000)]
+    with tempfile.TemporaryDirectory() as tmp, StubHibpServer(leaked) as stub, LocalListenerFarm(10) as farm:
+        # Historique, points de reprise et HIBP locaux : la suite ne touche ni au dépôt ni à Internet
+        dashboard.result_store = ResultStore(os.path.join(tmp, "results.db"))
+        dashboard.scan_jobs = ScanJobManager(workers=4, queue_size=size["scans"], per_client_jobs=size["scans"],
+                                             result_store=dashboard.result_store, checkpoint_dir=tmp)
+        dashboard.checker_tool = PasswordChecker(HibpRangeBackend(stub.url))
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        server = make_server("127.0.0.1", 0, dashboard.app, threaded=True)
+        with ThreadPoolExecutor(1) as serving:
+            serving.submit(server.serve_forever)
+            base = f"http://127.0.0.1:{server.server_port}"
+            passwords = list(synthetic_passwords(size["requests"], leaked, seed=3))
+            scan = {"target": farm.host, "ports": ",".join(map(str, farm.ports)) + ",20000-20999",
+                    "engine": "async", "timing": "aggressive"}
+            endpoints = [
+                ("check_password", "/check_password", [{"password": password} for password in passwords]),
+                ("metrics", "/metrics", [None] * size["requests"]),
+                ("scan_ports", "/scan_ports", [scan] * size["scans"]),
+            ]
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for name, path, bodies in endpoints:
+                        with ThreadPoolExecutor(8) as clients:
+                            started = time.perf_counter()
+                            responses = list(clients.map(lambda body: request(base + path, body), bodies))
+                            elapsed = time.perf_counter() - started
+                        latencies = [latency for latency, _ in responses]
+                        metrics[f"{name}_requests_per_sec"] = round(len(bodies) / elapsed, 1)
+                        metrics[f"{name}_p50_ms"] = round(1e3 * statistics.median(latencies), 2)
+                        metrics[f"{name}_p99_ms"] = round(1e3 * percentile(latencies, 0.99), 2)
+                        checks[f"{name}_ok"] = all(ok for _, ok in responses)
+            finally:
+                server.shutdown()
+                dashboard.scan_jobs.shutdown()
+    return metrics, checks
+
+
+def request(url, body=None):
+    """Une requête HTTP (POST JSON si body) : (latence, succès)"""
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=120) as response:
+            content = response.read()
+            ok = response.status == 200
+    except urllib.error.HTTPError:
+        return time.perf_counter() - started, False
+    if body is not None:
+        ok = ok and json.loads(content).get("success", False)
+    return time.perf_counter() - started, ok
+
+
+CASES = {
+    "scan": bench_scan,
+    "strength": bench_strength,
+    "breach": bench_breach,
+    "reports": bench_reports,
+    "flask": bench_flask,
+}
+
+
+def run_case(name, size, repeat, profile=None, profile_dir=None):
+    runs = [CASES[name](size) for _ in range(repeat)]
+    metrics = {key: statistics.median(run[0][key] for run in runs) for key in runs[0][0]}
+    checks = {key: all(run[1][key] for run in runs) for key in runs[0][1]}
+    result = {"metrics": metrics, "checks": checks}
+    if profile:
+        _, result["profile"] = profile_call(lambda: CASES[name](size), profile, profile_dir, name)
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, current, threshold):
+    """Affiche l'évolution de chaque mesure ; retourne le nombre de régressions au-delà du seuil"""
+    regressions = 0
+    for case, result in current["cases"].items():
+        before = previous.get("cases", {}).get(case, {}).get("metrics", {})
+        for key, value in result["metrics"].items():
+            old = before.get(key)
+            if not old or not key.endswith(HIGHER_IS_BETTER + LOWER_IS_BETTER):
+                continue
+            change = (value - old) / old
+            worse = -change if key.endswith(HIGHER_IS_BETTER) else change
+            flag = "⚠️ " if worse > threshold else "  "
+            regressions += worse > threshold
+            print(f"{flag} {case}.{key:<32} {old:>12,} → {value:>12,} ({100 * change:+.1f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", default=",".join(CASES), help="cas à lancer, séparés par des virgules")
+    parser.add_argument("--quick", action="store_true", help="tailles réduites (vérification rapide)")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="JSON d'une exécution précédente")
+    parser.add_argument("--threshold", type=float, default=0.1, help="dégradation tolérée (0.1 = 10 %%)")
+    parser.add_argument("--profile", choices=MODES)
+    parser.add_argument("--profile-dir", help="profils complets (.prof / .folded)")
+    args = parser.parse_args()
+    names = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(names) - set(CASES)
+    if unknown:
+        parser.error(f"cas inconnu(s): {', '.join(sorted(unknown))}")
+    if args.profile_dir:
+        os.makedirs(args.profile_dir, exist_ok=True)
+    size = SIZES["quick" if args.quick else "full"]
+
+    report = {
+        "meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "revision": git_revision(),
+                 "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+                 "size": "quick" if args.quick else "full", "repeat": args.repeat},
+        "cases": {},
+    }
+    for name in names:
+        started = time.perf_counter()
+        result = run_case(name, size, args.repeat, args.profile, args.profile_dir)
+        report["cases"][name] = result
+        status = "✅" if all(result["checks"].values()) else "❌"
+        print(f"{status} {name:<9} {time.perf_counter() - started:6.1f}s | "
+              + " | ".join(f"{key}={value:,}" for key, value in result["metrics"].items()))
+        for entry in result.get("profile", {}).get("hot_paths", [])[:5]:
+            print(f"   🔥 {entry['function']}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"📁 Résultats: {args.output}")
+
+    failed = [name for name, result in report["cases"].items() if not all(result["checks"].values())]
+    regressions = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        print(f"📊 {regressions} régression(s) au-delà de {100 * args.threshold:.0f}%")
+    sys.exit(1 if failed or regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,39 @@
 from modules.port_scanner import PortScanner
 from modules.password_checker import PasswordChecker
 from modules.report_generator import ReportGenerator
+from modules.sweep_scheduler import SweepScheduler
+from modules.password_audit import PasswordAuditor, format_audit_report
+from modules.result_store import ResultStore
+from modules.metrics import REGISTRY
+from modules.distributed import AGENT_PORT, ScanAgent, ScanCoordinator
+from modules.services import get_service_table, parse_port_spec
+from modules.checkpoint import CHECKPOINT_DIR
+import argparse
+import json
+import os
+import sys
 import time
 
 class CyberSecurityTool:
     def __init__(self):
         self.scanner = PortScanner
         self.checker = PasswordChecker()
-        self.reporter = ReportGenerator()  # Dossier courant par défaut
+        # Rapports écrits en arrière-plan dans reports/ (ou $CYBERSEC_REPORT_DIR)
+        self.reporter = ReportGenerator(output_dir=os.environ.get("CYBERSEC_REPORT_DIR", "reports"))
+        # Historique des scans (SQLite, $CYBERSEC_RESULTS_DB)
+        self.results = ResultStore()
+        # Résumé des métriques affiché à la fin de chaque scan
+        REGISTRY.add_hook(self.print_metrics)
+    
+    def print_metrics(self, event, data):
+        if event != "scan":
+            return
+        outcomes = data["outcomes"]
+        latency = ""
+        if data["latency_p50"] is not None:
+            latency = f" | latence p50 ≤ {data['latency_p50'] * 1000:g} ms, p95 ≤ {data['latency_p95'] * 1000:g} ms"
+        print(f"📈 {data['probes']} sondes: {outcomes['open']} ouverts, {outcomes['closed']} fermés, "
+              f"{outcomes['timeout']} sans réponse, {outcomes['filtered']} filtrés, {outcomes['error']} erreurs{latency}")
     
     def menu(self):
         while True:
@@ -17,9 +43,11 @@ class CyberSecurityTool:
             print("1. Scanner des ports")
             print("2. Vérifier un mot de passe")
             print("3. Scanner + Rapport complet")
-            print("4. Quitter")
+            print("4. Balayer un réseau (CIDR / liste d'hôtes)")
+            print("5. Historique et comparaison des scans")
+            print("6. Quitter")
             
-            choice = input("\nChoisissez une option (1-4): ").strip()
+            choice = input("\nChoisissez une option (1-6): ").strip()
             
             if choice == "1":
                 self.port_scan_menu()
@@ -28,6 +56,11 @@ class CyberSecurityTool:
             elif choice == "3":
                 self.full_scan()
             elif choice == "4":
+                self.sweep_menu()
+            elif choice == "5":
+                self.history_menu()
+            elif choice == "6":
+                self.reporter.close()
                 print("👋 Au revoir!")
                 break
             else:
@@ -40,38 +73,155 @@ class CyberSecurityTool:
                 print("❌ Veuillez entrer une cible valide")
                 return
             
-            start_port = int(input("🔸 Port de départ (défaut: 1): ") or 1)
-            end_port = int(input("🔹 Port de fin (défaut: 1000): ") or 1000)
-            
-            if start_port >= end_port:
-                print("❌ Le port de fin doit être supérieur au port de départ")
-                return
+            port_spec = input("🔸 Ports (ex: 1-1000, 22,80,443, top:100 ; défaut: 1-1000): ").strip() or "1-1000"
+            max_probes = int(input("🎯 Budget de sondes, ports les plus fréquents d'abord (défaut: illimité): ") or 0) or None
+            timing = input("⏱️  Temporisation (paranoid/sneaky/polite/normal/aggressive/insane, défaut: normal): ").strip() or "normal"
+            protocol = input("📶 Protocole (tcp/udp, défaut: tcp): ").strip().lower() or "tcp"
+            engine = "async" if protocol == "udp" else input("⚙️  Moteur (thread/async/syn, défaut: thread): ").strip() or "thread"
+            incremental = input("♻️  Re-scan incrémental depuis le dernier état connu ? (o/N): ").strip().lower() == "o"
+            resume = not incremental and input("⏯️  Reprendre un scan interrompu ? (o/N): ").strip().lower() == "o"
+            detect_services = protocol == "tcp" and input("🔎 Détecter les services (bannières, HTTP, TLS) ? (o/N): ").strip().lower() == "o"
             
-            print(f"\n🚀 Lancement du scan sur {target} (ports {start_port}-{end_port})...")
+            print(f"\n🚀 Lancement du scan sur {target} (ports {port_spec})...")
             start_time = time.time()
             
-            scanner = self.scanner(target, start_port, end_port)
+            scanner = self.scanner(target, port_spec=port_spec, max_probes=max_probes, engine=engine, timing=timing,
+                                   result_store=self.results, incremental=incremental,
+                                   checkpoint_dir=CHECKPOINT_DIR, resume=resume,
+                                   detect_services=detect_services, protocol=protocol)
             open_ports = scanner.run_scan()
             scan_time = f"{time.time() - start_time:.2f} secondes"
             
             # Générer le rapport
-            report_name = self.reporter.generate_port_scan_report(target, open_ports, scan_time)
+            report_name = self.reporter.generate_port_scan_report(target, open_ports, scan_time,
+                                                                  services=scanner.services, protocol=protocol,
+                                                                  open_filtered=scanner.open_filtered,
+                                                                  ports_scanned=scanner.resumed + scanner.scanned,
+                                                                  states=scanner.states)
             
             print(f"\n📊 RAPPORT - {target}")
             print(f"⏱️  Temps de scan: {scan_time}")
+            timing_info = scanner.timing.summary()
+            print(f"⏳ Délai effectif: {timing_info['effective_timeout']}s ({timing_info['retries']} retransmissions)")
+            if scanner.resumed:
+                print(f"⏯️  Reprise: {scanner.resumed} ports repris du point de reprise, {scanner.scanned} sondés")
+            if incremental:
+                info = scanner.incremental_summary()
+                print(f"♻️  Mode {info['mode']}: {info['probes']} sondes, "
+                      f"{info['probes_saved']} économisées ({info['saved_percent']}%)")
             print(f"🔓 Ports ouverts: {len(open_ports)}")
             if open_ports:
                 print(f"📋 Liste: {', '.join(map(str, open_ports))}")
             else:
                 print("📋 Aucun port ouvert trouvé")
+            if scanner.open_filtered:
+                print(f"❔ Ports sans réponse (ouverts ou filtrés): {len(scanner.open_filtered)}")
+            for port, info in sorted(scanner.services.items()):
+                product = f" - {info['product']}" if info['product'] else ""
+                print(f"🔎 Port {port}: {info['service'].upper()}{product}")
             
             print(f"📁 Rapports sauvegardés: {report_name}.*")
+            self.print_changes(self.results.diff_latest(target, protocol))
             
-        except ValueError:
-            print("❌ Veuillez entrer des numéros de ports valides")
+        except ValueError as e:
+            print(f"❌ Paramètre invalide: {e}")
+        except KeyboardInterrupt:
+            print("\n⏸️  Scan interrompu : relancez-le avec la reprise pour continuer là où il s'est arrêté")
         except Exception as e:
             print(f"❌ Erreur lors du scan: {e}")
     
+    def print_changes(self, diff):
+        if diff is None:
+            print("🆕 Premier scan enregistré pour cette cible")
+            return
+        print(f"🔄 Depuis le scan du {diff['old_scan']['timestamp']} ({diff['compared_ports']} ports sondés par les deux):")
+        if not diff['opened'] and not diff['closed']:
+            print("   Aucun changement")
+        if diff['opened']:
+            print(f"   🔓 Nouveaux ports ouverts: {', '.join(map(str, diff['opened']))}")
+        if diff['closed']:
+            print(f"   🔒 Ports fermés: {', '.join(map(str, diff['closed']))}")
+    
+    def history_menu(self):
+        try:
+            target = input("🎯 Cible (vide: liste des hôtes connus): ").strip()
+            if not target:
+                hosts = self.results.latest_per_host()
+                if not hosts:
+                    print("📋 Aucun scan enregistré")
+                for host in hosts:
+                    ports = ', '.join(map(str, host['open_ports'])) or 'aucun port ouvert'
+                    print(f"🖥️  {host['target']} ({host['scan_count']} scans, dernier le {host['timestamp']}): {ports}")
+                return
+            
+            history = self.results.history(target, limit=10)
+            if not history:
+                print(f"📋 Aucun scan enregistré pour {target}")
+                return
+            print(f"\n📜 HISTORIQUE - {target}")
+            for scan in history:
+                ports = f"{scan['ports_scanned']} ports parmi" if scan['sparse'] else "ports"
+                print(f"  #{scan['scan_id']} {scan['timestamp']} | {ports} {scan['start_port']}-{scan['end_port']} | "
+                      f"{scan['open_count']} ouvert(s)")
+            
+            latest = self.results.latest(target)
+            print(f"\n🔓 Ports ouverts actuellement: {', '.join(map(str, latest['open_ports'])) or 'aucun'}")
+            old_id = input("🔁 Comparer avec le scan n° (défaut: précédent): ").strip()
+            if old_id:
+                diff = self.results.diff(int(old_id), latest['scan_id'])
+                if diff is None:
+                    print("❌ Scan introuvable")
+                    return
+                self.print_changes(diff)
+            else:
+                self.print_changes(self.results.diff_latest(target))
+            
+        except ValueError as e:
+            print(f"❌ Paramètre invalide: {e}")
+        except Exception as e:
+            print(f"❌ Erreur lors de la lecture de l'historique: {e}")
+    
+    def sweep_menu(self):
+        try:
+            targets = input("🌐 Cibles (CIDR, IP ou domaines séparés par des virgules): ").strip()
+            if not targets:
+                print("❌ Veuillez entrer au moins une cible")
+                return
+            
+            port_spec = input("🔸 Ports (ex: 1-1000, 22,80,443, top:100 ; défaut: 1-1000): ").strip() or "1-1000"
+            per_host_limit = int(input("🔒 Connexions simultanées par hôte (défaut: 32): ") or 32)
+            ports = get_service_table().order(parse_port_spec(port_spec))
+            
+            # Un seul rapport (NDJSON + CSV) écrit hôte par hôte, quel que soit le nombre de cibles
+            report = self.reporter.open_sweep_report(targets)
+            
+            def on_host_states(host, states):
+                # Les hôtes sont affichés au fil de l'eau ; rapport seulement s'il y a des ports ouverts
+                if states.open:
+                    open_ports = list(states.open)
+                    print(f"🖥️  {host}: {', '.join(map(str, open_ports))}")
+                    report.add_host(host, open_ports, ports_scanned=len(ports), states=states)
+            
+            print(f"\n🚀 Balayage de {targets} (ports {port_spec})...")
+            start_time = time.time()
+            sweep = SweepScheduler(targets, ports,
+                                   per_host_limit=per_host_limit, on_host_states=on_host_states)
+            try:
+                stats = sweep.run()
+            finally:
+                report_name = report.close()
+            
+            print(f"\n📊 BALAYAGE TERMINÉ en {time.time() - start_time:.2f} secondes")
+            print(f"🖥️  Hôtes scannés: {stats['hosts_scanned']}")
+            print(f"🔍 Sondes envoyées: {stats['probes']}")
+            print(f"🔓 Ports ouverts: {stats['open_ports']}")
+            print(f"📁 Rapport sauvegardé: {report_name}.ndjson / .csv ({report.hosts} hôtes avec ports ouverts)")
+            
+        except ValueError as e:
+            print(f"❌ Paramètre invalide: {e}")
+        except Exception as e:
+            print(f"❌ Erreur lors du balayage: {e}")
+    
     def password_check_menu(self):
         try:
             password = input("🔐 Entrez le mot de passe à vérifier: ").strip()
@@ -98,7 +248,8 @@ class CyberSecurityTool:
             print(f"\n📊 ANALYSE DU MOT DE PASSE")
             print(f"🎯 Score de sécurité: {score}/100")
             print(f"📈 Évaluation: {rating}")
-            print(f"🚨 Compromis dans des fuites: {'✅ OUI' if breached else '❌ NON'}")
+            breach_status = '⚠️  INCONNU (vérification impossible)' if breached is None else ('✅ OUI' if breached else '❌ NON')
+            print(f"🚨 Compromis dans des fuites: {breach_status}")
             print(f"📁 Rapports sauvegardés: {report_name}.*")
             
             print("\n🔍 DÉTAILS:")
@@ -121,7 +272,8 @@ class CyberSecurityTool:
             
             print(f"\n🔍 Scan des ports sur {target}...")
             start_time = time.time()
-            scanner = self.scanner(target, 1, 100)
+            # Les 100 ports les plus souvent ouverts plutôt que 1-100
+            scanner = self.scanner(target, port_spec="top:100", result_store=self.results, detect_services=True)
             open_ports = scanner.run_scan()
             port_scan_time = f"{time.time() - start_time:.2f}s"
             
@@ -143,7 +295,11 @@ class CyberSecurityTool:
                 pwd_report = self.reporter.generate_password_report(pwd_data)
             
             # Générer rapport ports
-            port_report = self.reporter.generate_port_scan_report(target, open_ports, port_scan_time)
+            port_report = self.reporter.generate_port_scan_report(target, open_ports, port_scan_time,
+                                                                  services=scanner.services, protocol=scanner.protocol,
+                                                                  open_filtered=scanner.open_filtered,
+                                                                  ports_scanned=scanner.resumed + scanner.scanned,
+                                                                  states=scanner.states)
             
             print(f"\n🎉 SCAN COMPLÉTÉ!")
             print(f"🔓 Ports ouverts: {len(open_ports)}")
@@ -157,7 +313,82 @@ class CyberSecurityTool:
         except Exception as e:
             print(f"❌ Erreur lors du scan complet: {e}")
 
+def audit_command(argv):
+    """python main.py audit <fichier> : audit en masse d'un export de mots de passe"""
+    parser = argparse.ArgumentParser(prog="main.py audit", description="Audit en masse de mots de passe")
+    parser.add_argument("file", help="fichier texte, un mot de passe par ligne")
+    parser.add_argument("--processes", type=int, default=None, help="nombre de processus (défaut: nombre de CPU)")
+    parser.add_argument("--separator", default=None, help="séparateur pour les lignes « utilisateur<sep>mot de passe »")
+    parser.add_argument("--mode", choices=PasswordChecker.MODES, default="legacy",
+                        help="moteur d'évaluation (legacy: barème historique, entropy: estimation des essais)")
+    parser.add_argument("--no-breach", action="store_true", help="ne pas vérifier les fuites (HIBP)")
+    parser.add_argument("--json", action="store_true", help="sortie JSON")
+    args = parser.parse_args(argv)
+    
+    auditor = PasswordAuditor(processes=args.processes, check_breach=not args.no_breach,
+                              separator=args.separator, mode=args.mode)
+    report = auditor.audit(args.file)
+    print(json.dumps(report, indent=2, ensure_ascii=False) if args.json else format_audit_report(report))
+
+def agent_command(argv):
+    """python main.py agent : agent de scan piloté par un coordinateur (python main.py distributed)"""
+    parser = argparse.ArgumentParser(prog="main.py agent", description="Agent de scan distribué")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="adresse d'écoute (défaut: 127.0.0.1 ; toute autre adresse exige $CYBERSEC_AGENT_TOKEN)")
+    parser.add_argument("--port", type=int, default=AGENT_PORT, help=f"port d'écoute (défaut: {AGENT_PORT}, 0: libre)")
+    parser.add_argument("--max-sockets", type=int, default=512, help="connexions simultanées de la machine")
+    parser.add_argument("--max-shards", type=int, default=2, help="tranches exécutées en parallèle")
+    args = parser.parse_args(argv)
+    
+    try:
+        agent = ScanAgent(args.host, args.port, max_sockets=args.max_sockets, max_shards=args.max_shards)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"🛰️  Agent de scan à l'écoute sur {agent.address[0]}:{agent.address[1]}", flush=True)
+    try:
+        agent.serve_forever()
+    except KeyboardInterrupt:
+        agent.shutdown()
+
+def distributed_command(argv):
+    """python main.py distributed <cibles> --agents h1:p1,h2:p2 : balayage réparti entre plusieurs agents"""
+    parser = argparse.ArgumentParser(prog="main.py distributed", description="Balayage réparti entre agents")
+    parser.add_argument("targets", help="cibles (CIDR, IP ou domaines séparés par des virgules)")
+    parser.add_argument("--agents", required=True, help="agents hôte:port séparés par des virgules")
+    parser.add_argument("--ports", default="1-1000", help="ex: 1-1000, 22,80,443, top:100 (défaut: 1-1000)")
+    parser.add_argument("--shard-size", type=int, default=1000, help="ports par tranche (défaut: 1000)")
+    parser.add_argument("--timing", default="normal", help="modèle de temporisation (défaut: normal)")
+    parser.add_argument("--protocol", choices=PortScanner.PROTOCOLS, default="tcp")
+    parser.add_argument("--stall-timeout", type=float, default=10.0, help="silence toléré d'un agent (s)")
+    args = parser.parse_args(argv)
+    
+    reporter = ReportGenerator(output_dir=os.environ.get("CYBERSEC_REPORT_DIR", "reports"))
+    coordinator = ScanCoordinator(args.agents, args.targets, args.ports, shard_size=args.shard_size,
+                                  timing=args.timing, protocol=args.protocol, stall_timeout=args.stall_timeout,
+                                  on_open=lambda host, port: print(f"✅ {host}:{port} ouvert"),
+                                  report_generator=reporter)
+    results = coordinator.run()
+    reporter.close()
+    summary = coordinator.summary()
+    print(f"\n📊 BALAYAGE DISTRIBUÉ TERMINÉ en {summary['duration']:.2f} secondes")
+    print(f"🧩 Tranches: {summary['shards']} terminées, {summary['requeued']} réattribuées, {summary['failed']} perdues")
+    for agent, stats in summary["agents"].items():
+        print(f"🛰️  {agent}: {stats['shards']} tranches, {stats['ports']} ports, {stats['failures']} échecs")
+    for host, open_ports in results.items():
+        if open_ports:
+            print(f"🖥️  {host}: {', '.join(map(str, open_ports))}")
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "audit":
+        audit_command(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "agent":
+        agent_command(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "distributed":
+        distributed_command(sys.argv[2:])
+        return
     print("🔒 Initialisation de l'outil de cybersécurité...")
     tool = CyberSecurityTool()
     tool.menu()
@@ -0,0 +1,211 @@
+import asyncio
+import hashlib
+import os
+import struct
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from modules.cache import TTLCache
+from modules.sorted_index import SortedRecordFile, write_sorted_records
+
+HIBP_RANGE_URL = "https://api.pwnedpasswords.com/range/"
+
+# Enregistrement de l'index hors ligne : SHA-1 binaire (20 octets) + nombre d'occurrences (uint32)
+SHA1_SIZE = 20
+COUNT_FORMAT = struct.Struct(">I")
+
+
+class BreachLookupError(Exception):
+    """La vérification de fuite n'a pas pu aboutir (réseau indisponible, index absent...)"""
+
+
+def sha1_hex(password):
+    return hashlib.sha1(password.encode()).hexdigest().upper()
+
+
+class HibpRangeBackend:
+    """API range de Have I Been Pwned (k-anonymity) avec session HTTP partagée et cache LRU+TTL
+
+    Seul le préfixe de 5 caractères du SHA-1 est envoyé. La réponse brute est
+    mise en cache par préfixe : ~35 Ko par entrée, d'où un cache de 1024
+    préfixes par défaut. Les recherches simultanées d'un même préfixe partagent
+    une seule requête en vol (single-flight) ; au plus max_upstream requêtes
+    partent en même temps vers l'API.
+    """
+
+    def __init__(self, base_url=HIBP_RANGE_URL, cache_size=1024, cache_ttl=3600, pool_size=32, timeout=5,
+                 max_upstream=32):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.cache = TTLCache(cache_size, cache_ttl)
+        self.upstream_requests = 0
+        # Recherches servies par une requête déjà en vol pour le même préfixe
+        self.coalesced = 0
+        self.lock = threading.Lock()
+        # Préfixe -> Future de la requête en vol (attendue par les threads comme par asyncio)
+        self.in_flight = {}
+        self.upstream_slots = threading.BoundedSemaphore(max_upstream)
+        # Requêtes lancées depuis asyncio : la boucle n'attend que la Future, jamais le réseau
+        self.executor = ThreadPoolExecutor(max_upstream, thread_name_prefix="hibp")
+        # Connexions keep-alive réutilisées entre les appels (et entre threads)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Add-Padding"] = "true"
+
+    def fetch_range(self, prefix):
+        """Texte brut de la réponse range pour un préfixe (depuis le cache si possible)"""
+        text = self.cache.get(prefix)
+        if text is not None:
+            return text
+        future, leader = self._join_flight(prefix)
+        if leader:
+            self._fetch_upstream(prefix, future)
+        return future.result()
+
+    async def fetch_range_async(self, prefix):
+        """Version asyncio de fetch_range : les coroutines en attente ne bloquent aucun thread"""
+        text = self.cache.get(prefix)
+        if text is not None:
+            return text
+        future, leader = self._join_flight(prefix)
+        if leader:
+            self.executor.submit(self._fetch_upstream, prefix, future)
+        return await asyncio.wrap_future(future)
+
+    def _join_flight(self, prefix):
+        """Future de la requête en vol pour ce préfixe ; leader=True si l'appelant doit la lancer"""
+        with self.lock:
+            future = self.in_flight.get(prefix)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self.in_flight[prefix] = Future()
+            return future, True
+
+    def _fetch_upstream(self, prefix, future):
+        try:
+            # Le cache a pu être rempli entre la première lecture et la prise de la requête en vol
+            text = self.cache.get(prefix)
+            if text is None:
+                with self.upstream_slots:
+                    text = self._request(prefix)
+                self.cache.set(prefix, text)
+            future.set_result(text)
+        except Exception as e:
+            # Transmise à tous les appelants en attente (sinon ils attendraient indéfiniment)
+            future.set_exception(e)
+        finally:
+            with self.lock:
+                del self.in_flight[prefix]
+
+    def _request(self, prefix):
+        with self.lock:
+            self.upstream_requests += 1
+        try:
+            response = self.session.get(f"{self.base_url}{prefix}", timeout=self.timeout)
+        except requests.RequestException as e:
+            raise BreachLookupError(f"API HIBP injoignable: {e}") from e
+        if response.status_code != 200:
+            raise BreachLookupError(f"API HIBP: réponse HTTP {response.status_code}")
+        return response.text.upper()
+
+    def get_range(self, prefix):
+        """Suffixes compromis du préfixe et leur nombre d'occurrences"""
+        counts = {}
+        for line in self.fetch_range(prefix).splitlines():
+            suffix, _, count = line.partition(":")
+            # Les lignes de remplissage (Add-Padding) ont un compte nul
+            if count.strip() not in ("", "0"):
+                counts[suffix] = int(count)
+        return counts
+
+    def lookup(self, digest):
+        """Nombre d'apparitions du SHA-1 (hexadécimal majuscule) dans les fuites, 0 si absent"""
+        return self._count(self.fetch_range(digest[:5]), digest[5:])
+
+    async def lookup_async(self, digest):
+        return self._count(await self.fetch_range_async(digest[:5]), digest[5:])
+
+    def stats(self):
+        return {"upstream_requests": self.upstream_requests, "coalesced": self.coalesced,
+                "in_flight": len(self.in_flight), **self.cache.stats()}
+
+    @staticmethod
+    def _count(text, suffix):
+        # Recherche directe dans le texte mis en cache : pas de dictionnaire à construire par appel
+        index = text.find(f"{suffix}:")
+        while index > 0 and text[index - 1] != "\n":
+            index = text.find(f"{suffix}:", index + 1)
+        if index < 0:
+            return 0
+        end = text.find("\n", index)
+        return int(text[index + len(suffix) + 1:end if end >= 0 else None])
+
+
+class OfflineHibpBackend:
+    """Base HIBP téléchargée localement (environnements isolés), interrogée en O(log n) via un index binaire trié
+
+    L'index se construit une fois à partir du fichier texte officiel
+    « ordered by hash » (lignes HASH:COUNT) avec build_index().
+    """
+
+    def __init__(self, index_path):
+        try:
+            self.index = SortedRecordFile(index_path, SHA1_SIZE, COUNT_FORMAT.size)
+        except OSError as e:
+            raise BreachLookupError(f"Index HIBP hors ligne introuvable: {index_path}") from e
+
+    @staticmethod
+    def build_index(text_path, index_path):
+        """Convertit le fichier texte HIBP trié par hash en index binaire ; retourne le nombre d'entrées"""
+        def records():
+            with open(text_path, "r", encoding="ascii") as f:
+                for line in f:
+                    digest, _, count = line.strip().partition(":")
+                    if digest:
+                        yield bytes.fromhex(digest), COUNT_FORMAT.pack(min(int(count or 1), 0xFFFFFFFF))
+        return write_sorted_records(records(), index_path, SHA1_SIZE, COUNT_FORMAT.size)
+
+    def lookup(self, digest):
+        value = self.index.find(bytes.fromhex(digest))
+        return COUNT_FORMAT.unpack(value)[0] if value is not None else 0
+
+    async def lookup_async(self, digest):
+        # Index local projeté en mémoire : quelques microsecondes, inutile de quitter la boucle
+        return self.lookup(digest)
+
+    def get_range(self, prefix):
+        low = bytes.fromhex(prefix + "0" * 35)
+        upper = int(prefix, 16) + 1
+        high = bytes.fromhex(f"{upper:05X}" + "0" * 35) if upper < 0x100000 else b"\xff" * (SHA1_SIZE + 1)
+        return {key.hex().upper()[5:]: COUNT_FORMAT.unpack(value)[0]
+                for key, value in self.index.scan(low, high)}
+
+
+def breach_backend_from_env():
+    """Backend choisi par l'environnement : HIBP_OFFLINE_INDEX (hors ligne) ou HIBP_RANGE_URL (API ou miroir)
+
+    HIBP_MAX_UPSTREAM borne les requêtes simultanées vers l'API (32 par défaut).
+    """
+    index_path = os.environ.get("HIBP_OFFLINE_INDEX")
+    if index_path:
+        return OfflineHibpBackend(index_path)
+    max_upstream = int(os.environ.get("HIBP_MAX_UPSTREAM", 32))
+    return HibpRangeBackend(os.environ.get("HIBP_RANGE_URL", HIBP_RANGE_URL),
+                            pool_size=max_upstream, max_upstream=max_upstream)
+
+
+# Construction de l'index hors ligne :
+#   python -m modules.breach_backends pwned-passwords-sha1-ordered-by-hash.txt hibp.idx
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m modules.breach_backends <fichier HIBP .txt> <index .idx>")
+        sys.exit(1)
+    count = OfflineHibpBackend.build_index(sys.argv[1], sys.argv[2])
+    print(f"📦 Index hors ligne généré: {sys.argv[2]} ({count} empreintes)")
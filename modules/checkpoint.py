@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import re
+import struct
+import tempfile
+import threading
+from array import array
+
+from modules.port_states import BITMAP_SIZE, PortSet
+
+# Dossier des points de reprise (main.py, Flask)
+CHECKPOINT_DIR = os.environ.get("CYBERSEC_CHECKPOINT_DIR", "checkpoints")
+MAGIC = b"CKPT2\n"
+# Enregistrement : type (1 octet) + port (2 octets)
+RECORD = struct.Struct("!BH")
+# BITMAP : ports terminés, CLOSED_BITMAP : ports fermés (forme compacte, suivis de BITMAP_SIZE octets)
+DONE, OPEN, OPEN_FILTERED, CLOSED, BITMAP, CLOSED_BITMAP = b"DOFCBb"
+
+
+class CheckpointBusy(Exception):
+    """Le même scan (cible, protocole, ports) tient déjà ce point de reprise dans le processus"""
+
+
+def ports_digest(ports):
+    """Empreinte d'un ensemble de ports : un point de reprise ne vaut que pour le même scan"""
+    return hashlib.sha1(array("H", sorted(ports)).tobytes()).hexdigest()[:16]
+
+
+class ScanCheckpoint:
+    """Point de reprise d'un scan : journal binaire en ajout seul, synchronisé par lots
+
+    Chaque port terminé ajoute 3 octets au tampon (type + port) ; un thread
+    écrit le tampon et appelle fsync toutes les interval secondes, la sonde
+    ne touche donc jamais le disque. Au chargement, le journal est rejoué dans
+    des PortSet (bitmaps de 8 Ko au plus), puis réécrit sous forme compacte (bitmaps
+    des ports terminés et fermés + ports ouverts). Un crash ne fait perdre que la
+    dernière seconde. Un port terminé ni ouvert ni fermé est filtré.
+    """
+
+    # Chemins ouverts dans le processus : deux scans identiques simultanés ne partagent pas un journal
+    _active = set()
+    _active_lock = threading.Lock()
+
+    def __init__(self, path, target, protocol, ports, interval=1.0):
+        self.path = path
+        self.header = {"target": target, "protocol": protocol, "ports": ports_digest(ports), "total": len(ports)}
+        self.interval = interval
+        self.done = PortSet()
+        self.closed = PortSet()
+        self.open_ports = []
+        self.open_filtered = []
+        self.resumed = 0
+        self.records = 0
+        self.syncs = 0
+        self.buffer = bytearray()
+        self.lock = threading.Lock()
+        self.file = None
+        self.stopped = threading.Event()
+        self.flusher = None
+
+    @classmethod
+    def open(cls, directory, target, protocol, ports, resume=False, interval=1.0):
+        """Point de reprise du scan (target, protocol, ports) ; resume=True recharge l'état précédent s'il existe"""
+        os.makedirs(directory, exist_ok=True)
+        name = f"{re.sub(r'[^A-Za-z0-9._-]', '_', target)}_{protocol}_{ports_digest(ports)}.ckpt"
+        checkpoint = cls(os.path.join(directory, name), target, protocol, ports, interval)
+        with cls._active_lock:
+            if checkpoint.path in cls._active:
+                raise CheckpointBusy(f"Point de reprise déjà utilisé par un scan en cours: {checkpoint.path}")
+            cls._active.add(checkpoint.path)
+        try:
+            if resume and os.path.exists(checkpoint.path):
+                checkpoint._replay()
+            checkpoint._rewrite()
+        except BaseException:
+            checkpoint._release()
+            raise
+        checkpoint.flusher = threading.Thread(target=checkpoint._flush_loop, name="checkpoint-flush", daemon=True)
+        checkpoint.flusher.start()
+        return checkpoint
+
+    def _replay(self):
+        with open(self.path, "rb") as f:
+            data = f.read()
+        if not data.startswith(MAGIC):
+            return
+        end = data.index(b"\n", len(MAGIC))
+        if json.loads(data[len(MAGIC):end]) != self.header:
+            return
+        offset = end + 1
+        # Un crash pendant une écriture peut laisser un enregistrement tronqué : il est ignoré
+        while offset + RECORD.size <= len(data):
+            kind, port = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            if kind == DONE:
+                self.done.add(port)
+            elif kind == OPEN:
+                self.open_ports.append(port)
+            elif kind == OPEN_FILTERED:
+                self.open_filtered.append(port)
+            elif kind == CLOSED:
+                self.closed.add(port)
+            elif kind == BITMAP and offset + BITMAP_SIZE <= len(data):
+                self.done |= PortSet.frombytes(data[offset:offset + BITMAP_SIZE])
+                offset += BITMAP_SIZE
+            elif kind == CLOSED_BITMAP and offset + BITMAP_SIZE <= len(data):
+                self.closed |= PortSet.frombytes(data[offset:offset + BITMAP_SIZE])
+                offset += BITMAP_SIZE
+            else:
+                break
+        self.open_ports = sorted(set(self.open_ports))
+        self.open_filtered = sorted(set(self.open_filtered) - set(self.open_ports))
+        # Un port fermé dont l'enregistrement DONE a été perdu dans le crash sera sondé à nouveau
+        self.closed = self.closed & self.done
+        self.resumed = len(self.done)
+
+    def _rewrite(self):
+        """Remplace le journal par sa forme compacte (fichier temporaire + renommage), puis l'ouvre en ajout"""
+        content = bytearray(MAGIC + json.dumps(self.header).encode() + b"\n")
+        if self.resumed:
+            content += RECORD.pack(BITMAP, 0) + self.done.tobytes()
+            content += RECORD.pack(CLOSED_BITMAP, 0) + self.closed.tobytes()
+        for port in self.open_ports:
+            content += RECORD.pack(OPEN, port)
+        for port in self.open_filtered:
+            content += RECORD.pack(OPEN_FILTERED, port)
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.file = open(self.path, "ab")
+
+    def is_done(self, port):
+        return port in self.done
+
+    def remaining(self, ports):
+        """Ports restant à sonder, dans l'ordre donné"""
+        done = self.done
+        return [port for port in ports if port not in done]
+
+    def mark_done(self, port):
+        with self.lock:
+            self.buffer += RECORD.pack(DONE, port)
+
+    def mark_open(self, port):
+        with self.lock:
+            self.buffer += RECORD.pack(OPEN, port)
+
+    def mark_closed(self, port):
+        with self.lock:
+            self.buffer += RECORD.pack(CLOSED, port)
+
+    def mark_open_filtered(self, port):
+        with self.lock:
+            self.buffer += RECORD.pack(OPEN_FILTERED, port)
+
+    def flush(self):
+        """Écrit les enregistrements en attente et les synchronise sur disque (un seul fsync par lot)"""
+        with self.lock:
+            pending, self.buffer = self.buffer, bytearray()
+        if not pending or self.file is None:
+            return
+        self.file.write(pending)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.records += len(pending) // RECORD.size
+        self.syncs += 1
+
+    def _flush_loop(self):
+        while not self.stopped.wait(self.interval):
+            self.flush()
+
+    def close(self, complete=False):
+        """Dernier lot écrit ; un scan terminé n'a plus besoin de point de reprise (fichier supprimé)"""
+        self.stopped.set()
+        if self.flusher is not None:
+            self.flusher.join()
+        self.flush()
+        self.file.close()
+        self.file = None
+        if complete:
+            os.remove(self.path)
+        self._release()
+
+    def _release(self):
+        with self._active_lock:
+            self._active.discard(self.path)
+
+    def stats(self):
+        return {"path": self.path, "resumed": self.resumed, "records": self.records, "syncs": self.syncs}
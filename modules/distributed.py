@@ -0,0 +1,400 @@
+import http.client
+import hmac
+import ipaddress
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from modules.port_scanner import PortScanner, fd_budget
+from modules.services import get_service_table, parse_port_spec
+from modules.sweep_scheduler import expand_targets
+
+# Port d'écoute par défaut des agents
+AGENT_PORT = 8765
+# Intervalle des messages de progression d'un agent : c'est aussi son signe de vie
+HEARTBEAT = 0.5
+# Secret partagé entre coordinateur et agents (en-tête X-Agent-Token)
+TOKEN_ENV = "CYBERSEC_AGENT_TOKEN"
+# Marqueur de fin de scan dans la file des ports ouverts d'une tranche
+_DONE = object()
+
+
+class AgentError(Exception):
+    """L'agent a refusé la tranche, a coupé le flux ou a cessé de répondre"""
+
+
+class AgentBusy(AgentError):
+    """Tous les emplacements de l'agent sont occupés"""
+
+
+def is_loopback(host):
+    """Vrai si l'adresse d'écoute n'est joignable que depuis la machine (0.0.0.0, :: et les noms ne le sont pas)"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class ScanAgent:
+    """Agent de scan : exécute les tranches (cible, ports) envoyées par un coordinateur
+
+    POST /shard lance un PortScanner et répond en NDJSON au fil de l'eau : une
+    ligne "open" par port ouvert, une ligne "progress" toutes les HEARTBEAT
+    secondes, puis "done". GET /health décrit l'agent. max_sockets borne les
+    connexions simultanées de la machine, réparties entre max_shards tranches.
+    Hors boucle locale, un jeton est obligatoire : sans lui, n'importe qui sur
+    le réseau pourrait lui faire scanner des cibles arbitraires.
+    """
+
+    def __init__(self, host="127.0.0.1", port=AGENT_PORT, max_sockets=512, max_shards=2,
+                 token=None, heartbeat=HEARTBEAT):
+        self.max_sockets = fd_budget(max_sockets)
+        self.max_shards = max_shards
+        self.sockets_per_shard = max(1, self.max_sockets // max_shards)
+        self.token = token if token is not None else os.environ.get(TOKEN_ENV)
+        if not self.token and not is_loopback(host):
+            raise ValueError(f"Écoute sur {host or '0.0.0.0'} refusée sans jeton : définissez ${TOKEN_ENV}")
+        self.heartbeat = heartbeat
+        self.slots = threading.BoundedSemaphore(max_shards)
+        self.lock = threading.Lock()
+        self.running = 0
+        self.completed = 0
+        agent = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/health":
+                    return self._reply(404, {"error": "Ressource inconnue"})
+                self._reply(200, agent.health())
+
+            def do_POST(self):
+                if self.path != "/shard":
+                    return self._reply(404, {"error": "Ressource inconnue"})
+                if agent.token and not hmac.compare_digest(self.headers.get("X-Agent-Token", "").encode(), agent.token.encode()):
+                    return self._reply(403, {"error": "Jeton invalide"})
+                try:
+                    shard = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                except ValueError:
+                    return self._reply(400, {"error": "Corps JSON invalide"})
+                if not agent.slots.acquire(blocking=False):
+                    return self._reply(503, {"error": "Agent occupé"})
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.end_headers()
+                    agent.run_shard(shard, self._send_line)
+                finally:
+                    agent.slots.release()
+
+            def _send_line(self, data):
+                self.wfile.write(json.dumps(data).encode() + b"\n")
+                self.wfile.flush()
+
+            def _reply(self, status, data):
+                body = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.address = self.server.server_address[:2]
+
+    def health(self):
+        with self.lock:
+            return {"status": "ok", "running": self.running, "completed": self.completed,
+                    "max_shards": self.max_shards, "max_sockets": self.max_sockets}
+
+    def run_shard(self, shard, send):
+        """Exécute une tranche en diffusant ses résultats via send(dict) ; un flux coupé annule le scan"""
+        found = queue.Queue()
+        scanner = PortScanner(shard["target"], ports=shard["ports"], engine=shard.get("engine", "async"),
+                              timing=shard.get("timing", "normal"), protocol=shard.get("protocol", "tcp"),
+                              max_threads=self.sockets_per_shard, max_inflight=self.sockets_per_shard,
+                              on_open_port=found.put)
+        outcome = {}
+
+        def scan():
+            try:
+                scanner.run_scan()
+            except Exception as e:
+                outcome["error"] = str(e)
+            finally:
+                found.put(_DONE)
+
+        with self.lock:
+            self.running += 1
+        worker = threading.Thread(target=scan, name=f"shard-{shard.get('shard_id')}", daemon=True)
+        worker.start()
+        try:
+            while True:
+                try:
+                    port = found.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    send({"event": "progress", "scanned": scanner.scanned})
+                    continue
+                if port is _DONE:
+                    break
+                send({"event": "open", "port": port})
+            send({"event": "done", "shard_id": shard.get("shard_id"), "scanned": scanner.scanned,
+                  "open_filtered": list(scanner.open_filtered), "metrics": scanner.metrics.summary(),
+                  "error": outcome.get("error")})
+        except OSError:
+            # Coordinateur parti (tranche réattribuée) : inutile de continuer à sonder
+            scanner.cancel()
+        finally:
+            worker.join()
+            with self.lock:
+                self.running -= 1
+                self.completed += 1
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def start(self):
+        """Démarre l'agent dans un thread (tests, benchmarks) ; retourne l'agent"""
+        threading.Thread(target=self.serve_forever, name="scan-agent", daemon=True).start()
+        return self
+
+    def shutdown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _Shard:
+    __slots__ = ("id", "target", "ports", "attempts", "agents")
+
+    def __init__(self, shard_id, target, ports):
+        self.id = shard_id
+        self.target = target
+        self.ports = ports
+        self.attempts = 0
+        # Agents ayant échoué sur cette tranche : elle est d'abord proposée aux autres
+        self.agents = set()
+
+
+class ScanCoordinator:
+    """Répartit un balayage (cibles x ports) en tranches exécutées par des agents distants
+
+    Chaque agent tire les tranches d'une file commune : un agent rapide en
+    traite davantage. Un agent qui coupe le flux ou reste muet plus de
+    stall_timeout secondes perd sa tranche, remise en tête de file pour un
+    autre ; après max_failures échecs consécutifs il est écarté. Les ports
+    ouverts reçus sont fusionnés par cible, puis un rapport par cible est
+    produit via report_generator.
+    """
+
+    def __init__(self, agents, targets, ports="1-1000", shard_size=1000, engine="async", timing="normal",
+                 protocol="tcp", shards_per_agent=2, stall_timeout=10.0, max_attempts=3, max_failures=2,
+                 token=None, on_open=None, report_generator=None):
+        self.agents = [self._parse_agent(agent) for agent in
+                       (agents.replace(",", " ").split() if isinstance(agents, str) else agents)]
+        if not self.agents:
+            raise ValueError("Au moins un agent est requis")
+        self.targets = list(expand_targets(targets))
+        if not self.targets:
+            raise ValueError("Au moins une cible est requise")
+        # Ports les plus souvent ouverts d'abord : les premières tranches sont les plus rentables
+        if isinstance(ports, (str, list, tuple)):
+            ports = parse_port_spec(ports, protocol)
+        self.ports = get_service_table().order(ports, protocol)
+        self.shard_size = shard_size
+        self.engine = engine
+        self.timing = timing
+        self.protocol = protocol
+        self.shards_per_agent = shards_per_agent
+        self.stall_timeout = stall_timeout
+        self.max_attempts = max_attempts
+        self.max_failures = max_failures
+        self.token = token if token is not None else os.environ.get(TOKEN_ENV)
+        self.on_open = on_open
+        self.report_generator = report_generator
+        self.pending = deque()
+        self.remaining = 0
+        self.changed = threading.Condition()
+        self.results = {target: set() for target in self.targets}
+        self.open_filtered = {target: set() for target in self.targets}
+        # Ports sondés par cible (tranches terminées) : une tranche perdue n'est pas comptée
+        self.scanned = dict.fromkeys(self.targets, 0)
+        self.failed_shards = []
+        self.retired = set()
+        # Échecs consécutifs par agent (toutes connexions confondues), remis à zéro au premier succès
+        self.streaks = dict.fromkeys(self.agents, 0)
+        self.agent_stats = {f"{host}:{port}": {"shards": 0, "ports": 0, "failures": 0} for host, port in self.agents}
+        self.stats = {"shards": 0, "requeued": 0, "failed": 0, "probes": 0, "open_ports": 0, "duration": None}
+
+    @staticmethod
+    def _parse_agent(agent):
+        if isinstance(agent, tuple):
+            return agent
+        host, _, port = agent.rpartition(":") if ":" in agent else (agent, "", "")
+        return host.strip("[]"), int(port or AGENT_PORT)
+
+    def shards(self):
+        """Découpe le travail : tranches de shard_size ports, cible par cible"""
+        shard_id = 0
+        for target in self.targets:
+            for i in range(0, len(self.ports), self.shard_size):
+                yield _Shard(shard_id, target, self.ports[i:i + self.shard_size])
+                shard_id += 1
+
+    def _next_shard(self, agent):
+        """Tranche suivante pour cet agent (None : plus rien à faire) ; attend si des tranches sont en cours ailleurs"""
+        with self.changed:
+            while True:
+                if self.remaining == 0 or agent in self.retired:
+                    return None
+                for shard in self.pending:
+                    # Une tranche n'est rendue à l'agent qui l'a ratée que si aucun autre n'est disponible
+                    if agent not in shard.agents or len(self.retired | shard.agents) >= len(self.agents):
+                        self.pending.remove(shard)
+                        return shard
+                self.changed.wait(0.5)
+
+    def _finish(self, shard, failed=False):
+        with self.changed:
+            self.remaining -= 1
+            if failed:
+                self.failed_shards.append({"target": shard.target, "ports": [shard.ports[0], shard.ports[-1]],
+                                           "attempts": shard.attempts})
+                self.stats["failed"] += 1
+            self.changed.notify_all()
+
+    def _requeue(self, shard, agent):
+        with self.changed:
+            shard.agents.add(agent)
+            if shard.attempts >= self.max_attempts or len(self.retired) >= len(self.agents):
+                requeued = False
+            else:
+                # En tête de file : une tranche en retard ne doit pas attendre la fin du balayage
+                self.pending.appendleft(shard)
+                self.stats["requeued"] += 1
+                requeued = True
+            self.changed.notify_all()
+        if not requeued:
+            self._finish(shard, failed=True)
+
+    def _run_shard(self, agent, shard):
+        """Envoie une tranche à l'agent et lit son flux ; lève AgentError en cas de coupure ou de silence"""
+        body = json.dumps({"shard_id": shard.id, "target": shard.target, "ports": shard.ports,
+                           "engine": self.engine, "timing": self.timing, "protocol": self.protocol})
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["X-Agent-Token"] = self.token
+        # Délai de lecture : l'agent envoie un message au moins toutes les HEARTBEAT secondes
+        connection = http.client.HTTPConnection(*agent, timeout=self.stall_timeout)
+        try:
+            connection.request("POST", "/shard", body, headers)
+            response = connection.getresponse()
+            if response.status == 503:
+                raise AgentBusy("Agent occupé")
+            if response.status != 200:
+                raise AgentError(f"Tranche refusée (HTTP {response.status})")
+            while True:
+                line = response.readline()
+                if not line:
+                    raise AgentError("Flux interrompu avant la fin de la tranche")
+                message = json.loads(line)
+                if message["event"] == "open":
+                    self._record_open(shard.target, message["port"])
+                elif message["event"] == "done":
+                    return message
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            raise AgentError(str(e) or type(e).__name__) from e
+        finally:
+            connection.close()
+
+    def _record_open(self, target, port):
+        with self.changed:
+            if port in self.results[target]:
+                return
+            self.results[target].add(port)
+            self.stats["open_ports"] += 1
+        if self.on_open:
+            self.on_open(target, port)
+
+    def _dispatch(self, agent):
+        name = f"{agent[0]}:{agent[1]}"
+        while True:
+            shard = self._next_shard(agent)
+            if shard is None:
+                return
+            shard.attempts += 1
+            try:
+                done = self._run_shard(agent, shard)
+            except AgentBusy:
+                # Emplacement pris par un autre coordinateur : pas un échec de la tranche
+                shard.attempts -= 1
+                with self.changed:
+                    self.pending.appendleft(shard)
+                    self.changed.notify_all()
+                time.sleep(HEARTBEAT)
+                continue
+            except AgentError as e:
+                with self.changed:
+                    self.agent_stats[name]["failures"] += 1
+                    self.streaks[agent] += 1
+                    if self.streaks[agent] >= self.max_failures:
+                        self.retired.add(agent)
+                print(f"⚠️  Agent {name}: {e} (tranche {shard.id} réattribuée)")
+                self._requeue(shard, agent)
+                continue
+            if done.get("error"):
+                # Erreur du scan lui-même (cible introuvable...) : l'agent n'est pas en cause
+                print(f"⚠️  Tranche {shard.id} ({shard.target}): {done['error']}")
+                self._requeue(shard, agent)
+                continue
+            with self.changed:
+                self.streaks[agent] = 0
+                self.open_filtered[shard.target].update(done.get("open_filtered", ()))
+                self.scanned[shard.target] += done["scanned"]
+                self.stats["shards"] += 1
+                self.stats["probes"] += done["metrics"]["probes"]
+                self.agent_stats[name]["shards"] += 1
+                self.agent_stats[name]["ports"] += done["scanned"]
+            self._finish(shard)
+
+    def run(self):
+        """Exécute le balayage ; retourne {cible: ports ouverts triés}"""
+        started = time.perf_counter()
+        self.pending.extend(self.shards())
+        self.remaining = len(self.pending)
+        print(f"🌐 {len(self.targets)} cible(s), {self.remaining} tranche(s) réparties sur {len(self.agents)} agent(s)")
+        threads = [threading.Thread(target=self._dispatch, args=(agent,), name=f"dispatch-{agent[0]}:{agent[1]}-{i}",
+                                    daemon=True)
+                   for agent in self.agents for i in range(self.shards_per_agent)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Tous les agents écartés : les tranches restantes sont perdues
+        while self.pending:
+            shard = self.pending.popleft()
+            self.failed_shards.append({"target": shard.target, "ports": [shard.ports[0], shard.ports[-1]],
+                                       "attempts": shard.attempts})
+            self.stats["failed"] += 1
+        duration = time.perf_counter() - started
+        self.stats["duration"] = round(duration, 3)
+        results = {target: sorted(ports) for target, ports in self.results.items()}
+        if self.report_generator is not None:
+            for target, open_ports in results.items():
+                self.report_generator.generate_port_scan_report(
+                    target, open_ports, f"{duration:.2f} secondes (distribué)", protocol=self.protocol,
+                    open_filtered=sorted(self.open_filtered[target]), ports_scanned=self.scanned[target])
+        return results
+
+    def summary(self):
+        return {**self.stats, "agents": self.agent_stats, "retired": [f"{h}:{p}" for h, p in self.retired],
+                "failed_shards": self.failed_shards}
+
@@ -0,0 +1,248 @@
+import bisect
+import threading
+import time
+
+# Bornes des histogrammes de latence (secondes), du loopback au lien lointain
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Issue d'une sonde : répondu ouvert ou fermé, sans réponse, rejet explicite (ICMP) ou erreur locale
+OUTCOMES = ("open", "closed", "timeout", "filtered", "error")
+
+
+class Histogram:
+    """Histogramme à bornes fixes (cumulé au rendu, comme Prometheus)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.sum += other.sum
+        self.count += other.count
+
+    def copy(self):
+        clone = Histogram(self.buckets)
+        clone.merge(self)
+        return clone
+
+    def quantile(self, q):
+        """Quantile approché : borne supérieure du seau qui le contient"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+class ScanMetrics:
+    """Compteurs d'un scan : sondes envoyées, issue par port, latence de connexion, sondes en cours
+
+    Un objet par scan : les sondes n'incrémentent que des compteurs locaux (un
+    verrou non disputé), le registre les lit à la demande puis les absorbe en fin de scan.
+    """
+
+    def __init__(self, target, protocol="tcp", engine="thread"):
+        self.target = target
+        self.protocol = protocol
+        self.engine = engine
+        self.probes = 0
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+        self.latency = Histogram()
+        self.in_flight = 0
+        # Message de la dernière erreur locale (issue "error"), tous moteurs confondus
+        self.last_error = None
+        self.started_at = time.perf_counter()
+        self.duration = None
+        self.lock = threading.Lock()
+
+    def begin(self):
+        with self.lock:
+            self.in_flight += 1
+
+    def record(self, outcome, latency=None, attempts=1, in_flight=True, error=None):
+        """Issue finale d'un port (après retransmissions) ; latency : RTT de la dernière tentative,
+        error : cause d'une issue « error »"""
+        with self.lock:
+            self.probes += attempts
+            self.outcomes[outcome] += 1
+            if error is not None:
+                self.last_error = error
+            if latency is not None:
+                # Histogram.observe() en ligne : appelé pour chaque port, chaque appel compte
+                histogram = self.latency
+                histogram.counts[bisect.bisect_left(histogram.buckets, latency)] += 1
+                histogram.sum += latency
+                histogram.count += 1
+            if in_flight:
+                self.in_flight -= 1
+
+    def add_probes(self, count):
+        with self.lock:
+            self.probes += count
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.started_at
+
+    def summary(self):
+        with self.lock:
+            ports = sum(self.outcomes.values())
+            p50, p95 = self.latency.quantile(0.5), self.latency.quantile(0.95)
+            return {
+                "target": self.target,
+                "protocol": self.protocol,
+                "engine": self.engine,
+                "probes": self.probes,
+                "ports": ports,
+                "outcomes": dict(self.outcomes),
+                "in_flight": self.in_flight,
+                "last_error": self.last_error,
+                "latency_mean": round(self.latency.sum / self.latency.count, 6) if self.latency.count else None,
+                "latency_p50": p50,
+                "latency_p95": p95,
+                "duration": round(self.duration, 3) if self.duration is not None else None,
+            }
+
+
+class MetricsRegistry:
+    """Métriques du processus : scans (en cours et terminés), vérifications de mot de passe, écritures de rapports
+
+    Les hooks (add_hook) sont appelés avec (événement, données) : "scan" en fin
+    de scan avec le résumé de ScanMetrics. render() produit le format texte Prometheus.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = set()
+        self.scans = 0
+        self.probes = 0
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+        self.latency = Histogram()
+        # Histogrammes nommés à étiquette unique : (nom, valeur d'étiquette) -> Histogram
+        self.timings = {}
+        self.hooks = []
+
+    def add_hook(self, callback):
+        with self.lock:
+            self.hooks.append(callback)
+        return callback
+
+    def remove_hook(self, callback):
+        with self.lock:
+            if callback in self.hooks:
+                self.hooks.remove(callback)
+
+    def _notify(self, event, data):
+        for hook in list(self.hooks):
+            hook(event, data)
+
+    def scan_started(self, scan):
+        with self.lock:
+            self.active.add(scan)
+
+    def scan_finished(self, scan):
+        scan.finish()
+        with self.lock, scan.lock:
+            self.active.discard(scan)
+            self.scans += 1
+            self.probes += scan.probes
+            for outcome, count in scan.outcomes.items():
+                self.outcomes[outcome] += count
+            self.latency.merge(scan.latency)
+        self._notify("scan", scan.summary())
+
+    def observe(self, name, label, seconds):
+        """Enregistre une durée (ex. "password_check", "local") ; appel peu fréquent, sous verrou global"""
+        with self.lock:
+            histogram = self.timings.get((name, label))
+            if histogram is None:
+                histogram = self.timings[(name, label)] = Histogram()
+            histogram.observe(seconds)
+
+    def snapshot(self):
+        """Totaux cohérents : scans terminés + scans en cours"""
+        with self.lock:
+            probes = self.probes
+            outcomes = dict(self.outcomes)
+            latency = self.latency.copy()
+            in_flight = 0
+            for scan in self.active:
+                with scan.lock:
+                    probes += scan.probes
+                    for outcome, count in scan.outcomes.items():
+                        outcomes[outcome] += count
+                    latency.merge(scan.latency)
+                    in_flight += scan.in_flight
+            timings = {key: histogram.copy() for key, histogram in self.timings.items()}
+            return {
+                "scans": self.scans,
+                "active_scans": len(self.active),
+                "probes": probes,
+                "outcomes": outcomes,
+                "latency": latency,
+                "in_flight": in_flight,
+                "timings": timings,
+            }
+
+    def render(self):
+        """Exposition au format texte Prometheus (version 0.0.4)"""
+        data = self.snapshot()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        metric("cybersec_scans_total", "counter", "Scans de ports terminés", [f"cybersec_scans_total {data['scans']}"])
+        metric("cybersec_scans_active", "gauge", "Scans de ports en cours", [f"cybersec_scans_active {data['active_scans']}"])
+        metric("cybersec_scan_probes_total", "counter", "Sondes envoyées (retransmissions comprises)",
+               [f"cybersec_scan_probes_total {data['probes']}"])
+        metric("cybersec_scan_ports_total", "counter", "Ports sondés par issue",
+               [f'cybersec_scan_ports_total{{outcome="{outcome}"}} {count}' for outcome, count in data["outcomes"].items()])
+        metric("cybersec_scan_probes_in_flight", "gauge", "Sondes en attente de réponse",
+               [f"cybersec_scan_probes_in_flight {data['in_flight']}"])
+        metric("cybersec_connect_latency_seconds", "histogram", "Latence des réponses aux sondes",
+               _histogram_samples("cybersec_connect_latency_seconds", data["latency"]))
+
+        names = {"password_check": "Durée d'une vérification de mot de passe par étape",
+                 "report_write": "Durée d'écriture d'un rapport par format"}
+        label_names = {"password_check": "stage", "report_write": "format"}
+        for name, help_text in names.items():
+            samples = []
+            for (key, label), histogram in sorted(data["timings"].items()):
+                if key == name:
+                    samples += _histogram_samples(f"cybersec_{name}_seconds", histogram, f'{label_names[name]}="{label}"')
+            if samples:
+                metric(f"cybersec_{name}_seconds", "histogram", help_text, samples)
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_samples(name, histogram, labels=""):
+    samples = []
+    cumulative = 0
+    prefix = f"{labels}," if labels else ""
+    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+        cumulative += count
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        samples.append(f'{name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+    suffix = f"{{{labels}}}" if labels else ""
+    samples.append(f"{name}_sum{suffix} {histogram.sum}")
+    samples.append(f"{name}_count{suffix} {histogram.count}")
+    return samples
+
+
+# Registre du processus (Flask /metrics, CLI)
+REGISTRY = MetricsRegistry()
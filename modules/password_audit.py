@@ -0,0 +1,234 @@
+import hashlib
+import heapq
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from itertools import groupby
+
+from modules.breach_backends import BreachLookupError, breach_backend_from_env
+from modules.password_checker import PasswordChecker
+from modules.wordlist_index import WordlistIndex
+
+SHA1_SIZE = 20
+# Les empreintes sont réparties sur disque par leurs 2 premiers caractères hexadécimaux
+BUCKET_COUNT = 256
+# Empreintes triées en mémoire par tranches (1,3 Mo) avant fusion : mémoire constante quelle que soit la taille d'un bucket
+SORT_RUN_RECORDS = 65536
+# Évaluation d'un mot de passe dont le calcul du score a échoué (il reste vérifié dans les fuites)
+UNSCORABLE_RATING = "Non évaluable"
+
+# État propre à chaque processus du pool
+_checker = None
+
+
+def _init_worker(breach_backend_factory, mode):
+    global _checker
+    _checker = PasswordChecker(breach_backend=breach_backend_factory(), mode=mode)
+
+
+def iter_passwords(path, separator=None):
+    """Lit un fichier ligne à ligne (« user<sep>password » si separator est fourni)"""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            password = line.rstrip("\r\n")
+            if separator is not None:
+                password = password.rpartition(separator)[2]
+            if password:
+                yield password
+
+
+def iter_chunks(passwords, chunk_size):
+    chunk = []
+    for password in passwords:
+        chunk.append(password)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def failing_checks(feedback):
+    """Critères non respectés (common_password est en échec lorsqu'il vaut True)"""
+    return [check for check, passed in feedback.items()
+            if (passed if check == "common_password" else not passed)]
+
+
+def _score_chunk(passwords):
+    """Passe 1 : score de robustesse et empreintes SHA-1 binaires d'un lot"""
+    ratings = Counter()
+    failures = Counter()
+    digests = []
+    for password in passwords:
+        try:
+            _, rating, feedback = _checker.check_strength(password)
+        except Exception:
+            # Une ligne invalide ne doit pas interrompre l'audit du fichier entier
+            ratings[UNSCORABLE_RATING] += 1
+        else:
+            ratings[rating] += 1
+            failures.update(failing_checks(feedback))
+        digests.append(hashlib.sha1(password.encode()).digest())
+    return ratings, failures, digests
+
+
+def _read_digests(path):
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(SHA1_SIZE * SORT_RUN_RECORDS)
+            if not block:
+                return
+            for offset in range(0, len(block), SHA1_SIZE):
+                yield block[offset:offset + SHA1_SIZE]
+
+
+def _sorted_digests(path):
+    """Empreintes d'un bucket dans l'ordre : tranches triées sur disque puis fusionnées en flux"""
+    runs = []
+    try:
+        with open(path, "rb") as f:
+            while True:
+                block = f.read(SHA1_SIZE * SORT_RUN_RECORDS)
+                if not block:
+                    break
+                chunk = sorted(block[offset:offset + SHA1_SIZE] for offset in range(0, len(block), SHA1_SIZE))
+                if not runs and len(block) < SHA1_SIZE * SORT_RUN_RECORDS:
+                    # Bucket tenant en une tranche : pas de fichier intermédiaire
+                    yield from chunk
+                    return
+                runs.append(f"{path}.run{len(runs)}")
+                with open(runs[-1], "wb") as run:
+                    run.write(b"".join(chunk))
+                del chunk
+        yield from heapq.merge(*(_read_digests(run) for run in runs))
+    finally:
+        for run in runs:
+            os.remove(run)
+
+
+def _check_bucket(path):
+    """Passe 2 : parcourt les empreintes d'un bucket triées, préfixe par préfixe ; chaque plage n'est lue qu'une fois"""
+    breached = unknown = ranges = 0
+    for prefix, digests in groupby(_sorted_digests(path), key=lambda digest: digest.hex()[:5].upper()):
+        ranges += 1
+        try:
+            leaked = _checker.breach_backend.get_range(prefix)
+        except BreachLookupError:
+            unknown += sum(1 for _ in digests)
+            continue
+        breached += sum(1 for digest in digests if digest.hex().upper()[5:] in leaked)
+    return breached, unknown, ranges
+
+
+def _bounded(iterable, slots):
+    # Pool.imap consomme son entrée aussi vite que possible : on bloque tant que des lots sont en vol
+    for item in iterable:
+        slots.acquire()
+        yield item
+
+
+class PasswordAuditor:
+    """Audit en masse de fichiers de mots de passe sur un pool de processus, à mémoire bornée
+
+    Les mots de passe sont lus en flux et notés par lots. Leurs empreintes
+    sont réparties sur disque en BUCKET_COUNT fichiers, puis chaque bucket
+    est regroupé par préfixe SHA-1 : une plage HIBP n'est téléchargée (ou lue
+    dans l'index hors ligne) qu'une fois pour tout le fichier. Seul l'agrégat
+    (histogrammes) est conservé.
+    """
+
+    def __init__(self, processes=None, chunk_size=5000, check_breach=True,
+                 breach_backend_factory=breach_backend_from_env, separator=None, mode="legacy"):
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.check_breach = check_breach
+        self.breach_backend_factory = breach_backend_factory
+        self.separator = separator
+        self.mode = mode
+
+    def audit(self, path):
+        started = time.perf_counter()
+        report = {
+            "file": path,
+            "mode": self.mode,
+            "total": 0,
+            "ratings": Counter(),
+            "failing_checks": Counter(),
+            "breached": 0,
+            "breach_unknown": 0,
+            "ranges_checked": 0,
+        }
+        # Index des mots courants validé (ou reconstruit) une fois ici, pas par chaque worker en parallèle
+        WordlistIndex().load()
+        workdir = tempfile.mkdtemp(prefix="password_audit_")
+        try:
+            with multiprocessing.Pool(self.processes, _init_worker, (self.breach_backend_factory, self.mode)) as pool:
+                buckets = self._score(pool, path, workdir, report)
+                if self.check_breach:
+                    for breached, unknown, ranges in pool.imap_unordered(_check_bucket, buckets):
+                        report["breached"] += breached
+                        report["breach_unknown"] += unknown
+                        report["ranges_checked"] += ranges
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        duration = time.perf_counter() - started
+        report["unscorable"] = report["ratings"][UNSCORABLE_RATING]
+        report["ratings"] = dict(report["ratings"].most_common())
+        report["failing_checks"] = dict(report["failing_checks"].most_common())
+        report["duration"] = round(duration, 2)
+        report["passwords_per_sec"] = round(report["total"] / duration) if duration else 0
+        return report
+
+    def _score(self, pool, path, workdir, report):
+        slots = threading.BoundedSemaphore(self.processes * 2)
+        chunks = _bounded(iter_chunks(iter_passwords(path, self.separator), self.chunk_size), slots)
+        files = {}
+        try:
+            for ratings, failures, digests in pool.imap_unordered(_score_chunk, chunks):
+                slots.release()
+                report["total"] += len(digests)
+                report["ratings"].update(ratings)
+                report["failing_checks"].update(failures)
+                if not self.check_breach:
+                    continue
+                for digest in digests:
+                    bucket = digest[0]
+                    if bucket not in files:
+                        files[bucket] = open(os.path.join(workdir, f"{bucket:02x}.bin"), "wb")
+                    files[bucket].write(digest)
+        finally:
+            for f in files.values():
+                f.close()
+        return [f.name for f in files.values()]
+
+
+def format_audit_report(report):
+    """Mise en forme texte de l'agrégat, avec histogrammes"""
+    total = report["total"] or 1
+    lines = [
+        f"📁 Fichier: {report['file']}",
+        f"🔢 Mots de passe analysés: {report['total']} (moteur: {report['mode']})",
+        f"⏱️  Durée: {report['duration']}s ({report['passwords_per_sec']} mots de passe/s)",
+        "",
+        "📈 RÉPARTITION DES ÉVALUATIONS",
+    ]
+    for rating, count in report["ratings"].items():
+        lines.append(f"  {rating:<13} {count:>10} {count * 100 / total:5.1f}% {'█' * round(count * 40 / total)}")
+    lines += ["", "❌ CRITÈRES NON RESPECTÉS"]
+    for check, count in report["failing_checks"].items():
+        check_name = check.replace('_', ' ').title()
+        lines.append(f"  {check_name:<20} {count:>10} {count * 100 / total:5.1f}%")
+    lines += [
+        "",
+        f"🚨 Compromis dans des fuites: {report['breached']} ({report['breached'] * 100 / total:.1f}%)",
+    ]
+    if report["breach_unknown"]:
+        lines.append(f"⚠️  Vérification impossible: {report['breach_unknown']}")
+    if report["unscorable"]:
+        lines.append(f"⚠️  Mots de passe non évaluables: {report['unscorable']}")
+    return "\n".join(lines)
@@ -1,23 +1,49 @@
-import hashlib
+import asyncio
 import re
-import requests
-from typing import Tuple, Dict
+import time
+from typing import Tuple, Dict, Optional
+
+from modules.breach_backends import BreachLookupError, breach_backend_from_env, sha1_hex
+from modules.metrics import REGISTRY
+from modules.strength_estimator import get_estimator, score_from_guesses
+from modules.wordlist_index import WordlistIndex
 
 class PasswordChecker:
-    def __init__(self):
+    MODES = ("legacy", "entropy")
+    
+    def __init__(self, breach_backend=None, mode="legacy", metrics_registry=REGISTRY):
+        if mode not in self.MODES:
+            raise ValueError(f"Mode d'évaluation inconnu: {mode}")
+        self.mode = mode
         self.common_passwords = self.load_common_passwords()
+        # Tables de l'estimateur (trie, graphes clavier) construites une fois, au démarrage
+        self.estimator = get_estimator() if mode == "entropy" else None
+        # API HIBP (session + cache) par défaut, ou index hors ligne via HIBP_OFFLINE_INDEX
+        self.breach_backend = breach_backend or breach_backend_from_env()
+        # Latence par étape : évaluation locale ("local") et recherche de fuite ("breach")
+        self.metrics_registry = metrics_registry
     
     def load_common_passwords(self):
-        """Charge la liste des mots de passe courants"""
+        """Charge la liste des mots de passe courants (dictionnaires de wordlists/, indexés à la première recherche)"""
         common_passwords = [
             '123456', 'password', '12345678', 'qwerty', 'abc123',
             'password1', '12345', '123456789', 'letmein', 'welcome',
             'monkey', 'dragon', 'baseball', 'football', 'hello'
         ]
-        return set(common_passwords)
+        return WordlistIndex(extra_words=common_passwords)
     
     def check_strength(self, password: str) -> Tuple[int, str, Dict]:
         """Retourne un score de 0-100, une évaluation et des détails"""
+        started = time.perf_counter()
+        if self.mode == "entropy":
+            result = self._check_strength_entropy(password)
+        else:
+            result = self._check_strength_legacy(password)
+        self.metrics_registry.observe("password_check", "local", time.perf_counter() - started)
+        return result
+    
+    def _check_strength_legacy(self, password: str) -> Tuple[int, str, Dict]:
+        """Barème historique : points fixes par critère de composition"""
         score = 0
         feedback = {
             'length': False,
@@ -54,38 +80,67 @@ class PasswordChecker:
             score += 10
             feedback['common_password'] = False
         
+        return score, self._rating(score), feedback
+    
+    def _check_strength_entropy(self, password: str) -> Tuple[int, str, Dict]:
+        """Score dérivé du nombre d'essais estimé (motifs dictionnaire, clavier, dates...)"""
+        _, _, feedback = self._check_strength_legacy(password)
+        estimate = self.estimator.estimate(password)
+        patterns = {match['pattern'] for match in estimate['sequence']}
+        feedback.update({
+            'no_dictionary_word': not patterns & {'dictionary', 'l33t'},
+            'no_keyboard_pattern': 'spatial' not in patterns,
+            'no_sequence': 'sequence' not in patterns,
+            'no_repeat': 'repeat' not in patterns,
+            'no_date': 'date' not in patterns,
+        })
+        score = score_from_guesses(estimate['guesses_log10'])
+        return score, self._rating(score), feedback
+    
+    @staticmethod
+    def _rating(score):
         # Évaluation
         if score >= 80:
-            rating = "Très fort"
+            return "Très fort"
         elif score >= 60:
-            rating = "Fort"
+            return "Fort"
         elif score >= 40:
-            rating = "Moyen"
+            return "Moyen"
         elif score >= 20:
-            rating = "Faible"
+            return "Faible"
         else:
-            rating = "Très faible"
-        
-        return score, rating, feedback
+            return "Très faible"
+    
+    def check_breach(self, password: str) -> Optional[bool]:
+        """Vérifie si le mot de passe a été compromis (Have I Been Pwned, k-anonymity)
+
+        Retourne None si la vérification est impossible (API injoignable, index
+        absent) : un résultat inconnu ne doit pas passer pour un mot de passe sain.
+        """
+        started = time.perf_counter()
+        try:
+            return self.breach_backend.lookup(sha1_hex(password)) > 0
+        except BreachLookupError:
+            return None
+        finally:
+            self.metrics_registry.observe("password_check", "breach", time.perf_counter() - started)
     
-    def check_breach(self, password: str) -> bool:
-        """Vérifie si le mot de passe a été compromis (API Have I Been Pwned)"""
+    async def check_breach_async(self, password: str) -> Optional[bool]:
+        """Version asyncio de check_breach (mode ASGI) : les recherches d'un même préfixe sont regroupées"""
+        started = time.perf_counter()
         try:
-            # Hash le mot de passe en SHA-1
-            sha1_hash = hashlib.sha1(password.encode()).hexdigest().upper()
-            prefix, suffix = sha1_hash[:5], sha1_hash[5:]
-            
-            # Appel à l'API
-            response = requests.get(f"https://api.pwnedpasswords.com/range/{prefix}")
-            if response.status_code == 200:
-                hashes = (line.split(':') for line in response.text.splitlines())
-                for h, count in hashes:
-                    if h == suffix:
-                        return True
-            return False
-        except Exception:
-            # Si pas de connexion internet, retourne False
-            return False
+            lookup_async = getattr(self.breach_backend, "lookup_async", None)
+            if lookup_async is not None:
+                count = await lookup_async(sha1_hex(password))
+            else:
+                # Backend sans variante asynchrone : recherche bloquante hors de la boucle
+                count = await asyncio.get_running_loop().run_in_executor(
+                    None, self.breach_backend.lookup, sha1_hex(password))
+            return count > 0
+        except BreachLookupError:
+            return None
+        finally:
+            self.metrics_registry.observe("password_check", "breach", time.perf_counter() - started)
 
 # Test
 if __name__ == "__main__":
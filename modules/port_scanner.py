@@ -1,33 +1,564 @@
+import asyncio
+import errno
+import os
 import socket
 import threading
+import time
 from datetime import datetime
 
+from modules.checkpoint import CHECKPOINT_DIR, CheckpointBusy, ScanCheckpoint
+from modules.service_detection import ServiceDetector
+from modules.services import get_service_table, parse_port_spec
+from modules.metrics import REGISTRY, ScanMetrics
+from modules.port_states import PortStates
+from modules.rate_limit import TokenBucket
+from modules.resolver import RESOLVER
+from modules.syn_scan import OPEN as SYN_OPEN, SynScanner, syn_scan_available
+from modules.timing import AdaptiveTiming
+from modules.udp_scan import CLOSED, ERROR, OPEN, OPEN_FILTERED, probe_udp, udp_service
+
+try:
+    import resource
+except ImportError:  # Windows : pas de RLIMIT_NOFILE
+    resource = None
+
+# Descripteurs réservés au reste du processus (Flask, fichiers de rapport...)
+FD_RESERVE = 64
+
+# Codes renvoyés par connect_ex sur un socket non bloquant (10035 = WSAEWOULDBLOCK)
+CONNECT_PENDING = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY, 10035}
+
+# Détections de service simultanées (moteur async), prélevées sur le budget de descripteurs
+DETECTION_SLOTS = 64
+
+# Absence de réponse : seul cas ambigu (filtré ou perdu), donc seul cas retenté
+TIMEOUT_ERRORS = {errno.ETIMEDOUT, errno.EAGAIN, errno.EWOULDBLOCK}
+
+# Issue d'une sonde -> état du port (une erreur locale ne dit rien du port)
+PORT_STATE = {"open": "open", "closed": "closed", "timeout": "filtered"}
+
+# Débits par défaut (paquets/s) : Linux limite les ICMP port injoignable (~1000/s par défaut),
+# un scan UDP plus rapide prendrait des ports fermés pour des ports muets
+SYN_RATE = 10000
+UDP_RATE = 1000
+
+
+def fd_budget(requested):
+    """Borne le nombre de sockets simultanés à la limite de descripteurs du processus"""
+    if resource is None:
+        return requested
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return requested
+    return max(1, min(requested, soft - FD_RESERVE))
+
+
+async def connect_once(address, port, timeout, family=socket.AF_INET):
+    """Une tentative de connexion non bloquante : code errno (0 = ouvert, ETIMEDOUT = sans réponse)"""
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    try:
+        result = sock.connect_ex((address, port))
+        if result in CONNECT_PENDING:
+            # add_writer + call_later plutôt que wait_for : pas de Task créée par sonde
+            waiter = loop.create_future()
+            fd = sock.fileno()
+            loop.add_writer(fd, lambda: waiter.done() or waiter.set_result(True))
+            timer = loop.call_later(timeout, lambda: waiter.done() or waiter.set_result(False))
+            try:
+                answered = await waiter
+            finally:
+                loop.remove_writer(fd)
+                timer.cancel()
+            if not answered:
+                return errno.ETIMEDOUT
+            result = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        return result
+    except OSError as e:
+        return e.errno or errno.EIO
+    finally:
+        sock.close()
+
+
+def classify(result):
+    """Issue d'une tentative de connexion (code errno) pour les métriques et l'état du port"""
+    if result == 0:
+        return "open"
+    if result == errno.ECONNREFUSED:
+        return "closed"
+    if result in TIMEOUT_ERRORS:
+        return "timeout"
+    return "error"
+
+
+async def probe_connect(address, port, timing, metrics=None, family=socket.AF_INET):
+    """Sonde un port ("open", "closed", "timeout" ou "error") en ne retentant que les expirations,
+    avec le délai adaptatif de l'hôte"""
+    attempts = 0
+    for attempt in range(timing.max_retries + 1):
+        if attempt:
+            timing.record_retry()
+        attempts += 1
+        started = time.perf_counter()
+        result = await connect_once(address, port, timing.timeout(), family)
+        if result in TIMEOUT_ERRORS:
+            continue
+        latency = None
+        if result in (0, errno.ECONNREFUSED):
+            latency = time.perf_counter() - started
+            timing.record_rtt(latency)
+        outcome = classify(result)
+        if metrics is not None:
+            metrics.record(outcome, latency, attempts, error=os.strerror(result) if outcome == "error" else None)
+        return outcome
+    if metrics is not None:
+        metrics.record("timeout", None, attempts)
+    return "timeout"
+
+
 class PortScanner:
-    def __init__(self, target, start_port=1, end_port=1000, max_threads=100):
+    ENGINES = ("thread", "async", "syn")
+    PROTOCOLS = ("tcp", "udp")
+
+    def __init__(self, target, start_port=1, end_port=1000, max_threads=100,
+                 engine="thread", max_inflight=2000, timing="normal", max_retries=None,
+                 on_open_port=None, result_store=None, ports=None, incremental=False, rotation=10,
+                 detect_services=False, on_service=None, packet_rate=None, protocol="tcp",
+                 metrics_registry=REGISTRY, resolver=RESOLVER, port_spec=None, max_probes=None,
+                 checkpoint_dir=None, resume=False):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Moteur de scan inconnu: {engine}")
+        if protocol not in self.PROTOCOLS:
+            raise ValueError(f"Protocole inconnu: {protocol}")
+        if protocol == "udp":
+            # UDP : sondes asynchrones à débit limité, quel que soit le moteur demandé
+            engine = "async"
+        elif engine == "syn" and not syn_scan_available():
+            print("⚠️  Scan SYN indisponible (Linux et CAP_NET_RAW requis) : scan par connexion")
+            engine = "async"
+        if incremental and result_store is None:
+            raise ValueError("Le mode incrémental nécessite un historique (result_store)")
+        if incremental and resume:
+            raise ValueError("La reprise d'un scan interrompu est incompatible avec le mode incrémental")
         self.target = target
+        # Cible résolue une seule fois par scan (cache TTL partagé entre les scans du processus)
+        self.resolver = resolver
+        self.family = None
+        self.address = None
         self.start_port = start_port
         self.end_port = end_port
-        self.max_threads = max_threads
-        self.open_ports = []
+        self.timing = AdaptiveTiming(timing, max_retries)
+        self.max_threads = self.timing.limit_parallelism(max_threads)
+        self.engine = engine
+        self.protocol = protocol
+        # Moteur SYN et scan UDP : paquets envoyés par seconde (seau à jetons)
+        self.packet_rate = packet_rate or (UDP_RATE if protocol == "udp" else SYN_RATE)
+        self.max_inflight = self.timing.limit_parallelism(max_inflight)
+        # État de chaque port sondé (ouvert, fermé, filtré) : tableaux triés ou bitmaps de 8 Ko
+        self.states = PortStates()
+        # UDP : ports restés muets (ouverts sans réponse ou filtrés, indiscernables)
+        self.open_filtered = []
         self.lock = threading.Lock()
+        # Hook appelé à chaque port ouvert (sinon affichage console)
+        self.on_open_port = on_open_port
+        self.scanned = 0
+        self.started_at = None
+        self.cancelled = threading.Event()
+        # Historique SQLite (ResultStore) : chaque scan terminé y est enregistré
+        self.result_store = result_store
+        self.scan_id = None
+        # Liste explicite de ports ("22,80", "1-1024", "top:100"...), sinon toute la plage start_port..end_port
+        if port_spec is not None:
+            ports = parse_port_spec(port_spec, protocol)
+        self.ports = sorted(set(ports)) if ports is not None else None
+        if self.ports:
+            self.start_port, self.end_port = self.ports[0], self.ports[-1]
+        # Budget de sondes : les ports au meilleur rendement d'abord, arrêt une fois le budget atteint
+        self.max_probes = max_probes
+        self._order = None
+        self.planned = len(self.port_list())
+        # Mode incrémental : ports connus ouverts, puis 1/rotation de l'espace fermé à chaque passage
+        self.incremental = incremental
+        self.rotation = max(1, rotation)
+        self.scan_mode = "full"
+        self.drift = None
+        # Détection de service (bannières, sondes HTTP/TLS), lancée dès qu'un port s'ouvre
+        self.detector = ServiceDetector() if detect_services and protocol == "tcp" else None
+        self.services = {}
+        self.on_service = on_service
+        # Compteurs du scan (sondes, issues, latence), publiés dans le registre du processus
+        self.metrics = ScanMetrics(target, protocol, engine)
+        self.metrics_registry = metrics_registry
+        # Point de reprise sur disque (ports terminés, ports ouverts) ; resume repart du dernier
+        self.checkpoint_dir = checkpoint_dir if checkpoint_dir is not None or not resume else CHECKPOINT_DIR
+        self.resume = resume
+        self.checkpoint = None
+        self.resumed = 0
+    
+    @property
+    def open_ports(self):
+        """Ports ouverts, par ordre croissant"""
+        with self.lock:
+            return list(self.states.open)
+    
+    def cancel(self):
+        """Interrompt le scan : les sondes en cours se terminent, aucune nouvelle n'est lancée"""
+        self.cancelled.set()
+    
+    def port_list(self):
+        """Ports à sonder, les plus souvent ouverts d'abord (table des services), tronqués au budget"""
+        if self._order is None:
+            ports = self.ports if self.ports is not None else range(self.start_port, self.end_port + 1)
+            self._order = get_service_table().order(ports, self.protocol)[:self.max_probes]
+        return self._order
+    
+    @property
+    def total_ports(self):
+        """Nombre de sondes prévues (peut augmenter si un scan incrémental s'élargit)"""
+        return self.planned
+    
+    def progress(self):
+        """Avancement courant : ports sondés, pourcentage et débit"""
+        elapsed = time.perf_counter() - self.started_at if self.started_at else 0
+        total = self.total_ports
+        return {
+            "scanned": self.scanned,
+            "total": total,
+            "percent": round(100 * self.scanned / total, 1) if total else 100.0,
+            "ports_per_sec": round(self.scanned / elapsed) if elapsed else 0,
+        }
+    
+    def _record_state(self, port, state):
+        with self.lock:
+            self.states.record(port, state)
+        # Journalisé avant mark_done : en reprise, un port terminé ni ouvert ni fermé est filtré
+        if state == "closed" and self.checkpoint is not None:
+            self.checkpoint.mark_closed(port)
+    
+    def _record_open(self, port):
+        self._record_state(port, "open")
+        if self.checkpoint is not None:
+            self.checkpoint.mark_open(port)
+        if self.on_open_port:
+            self.on_open_port(port)
+        else:
+            print(f"✅ Port {port} ouvert")
     
     def scan_port(self, port):
+        self.metrics.begin()
+        outcome = "error"
+        try:
+            outcome = self._probe_port(port)
+        finally:
+            with self.lock:
+                self.scanned += 1
+        # Erreur locale : ni réponse ni expiration, le port sera sondé à nouveau en reprise
+        if self.checkpoint is not None and outcome != "error":
+            self.checkpoint.mark_done(port)
+    
+    def _probe_port(self, port):
+        attempts = 0
+        for attempt in range(self.timing.max_retries + 1):
+            if attempt:
+                self.timing.record_retry()
+            attempts += 1
+            try:
+                with socket.socket(self.family, socket.SOCK_STREAM) as sock:
+                    sock.settimeout(self.timing.timeout())
+                    started = time.perf_counter()
+                    result = sock.connect_ex((self.address, port))
+            except socket.timeout:
+                continue
+            except Exception as e:
+                # Erreur locale (résolution, descripteurs épuisés...) : comptée, pas retentée
+                self.metrics.record("error", None, attempts, error=str(e))
+                return "error"
+            if result in TIMEOUT_ERRORS:
+                continue
+            latency = None
+            if result in (0, errno.ECONNREFUSED):
+                latency = time.perf_counter() - started
+                self.timing.record_rtt(latency)
+            outcome = classify(result)
+            self.metrics.record(outcome, latency, attempts)
+            if result == 0:
+                self._record_open(port)
+                if self.detector:
+                    # Dans le thread de la sonde : les autres connexions continuent pendant ce temps
+                    self._record_service(port, asyncio.run(self.detector.detect(self.address, port)))
+            elif outcome in PORT_STATE:
+                self._record_state(port, PORT_STATE[outcome])
+            return outcome
+        self.metrics.record("timeout", None, attempts)
+        self._record_state(port, "filtered")
+        return "timeout"
+    
+    def _record_service(self, port, info):
+        if info is None:
+            return
+        with self.lock:
+            self.services[port] = info
+        if self.on_service:
+            self.on_service(port, info)
+    
+    async def scan_port_async(self, address, port):
+        """Version asyncio de scan_port (même sémantique : connexion réussie = port ouvert)"""
+        self.metrics.begin()
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(1)
-                result = sock.connect_ex((self.target, port))
-                if result == 0:
-                    with self.lock:
-                        self.open_ports.append(port)
-                    print(f"✅ Port {port} ouvert")
-        except Exception as e:
-            pass
+            outcome = await probe_connect(address, port, self.timing, self.metrics, self.family)
+        finally:
+            self.scanned += 1
+        is_open = outcome == "open"
+        if is_open:
+            self._record_open(port)
+            if self.detector:
+                # Étage 2 en tâche de fond : la fenêtre de connexion n'attend pas la bannière
+                self._detections.append(asyncio.ensure_future(self._detect_async(address, port)))
+        elif outcome in PORT_STATE:
+            self._record_state(port, PORT_STATE[outcome])
+        # Après le port ouvert : un port marqué terminé a toujours son résultat dans le journal ;
+        # une erreur locale n'en est pas un, le port sera sondé à nouveau en reprise
+        if self.checkpoint is not None and outcome != "error":
+            self.checkpoint.mark_done(port)
+        return is_open
+    
+    async def _detect_async(self, address, port):
+        async with self._detection_slots:
+            self._record_service(port, await self.detector.detect(address, port))
+    
+    async def _run_async(self, ports):
+        address = self.address
+        budget = fd_budget(self.max_inflight)
+        if self.detector:
+            slots = min(DETECTION_SLOTS, max(budget // 4, 1))
+            self._detection_slots = asyncio.Semaphore(slots)
+            self._detections = []
+            budget = max(budget - slots, 1)
+        window = min(budget, len(ports))
+        ports = iter(ports)
+        
+        async def worker():
+            # Fenêtre glissante : chaque worker enchaîne dès qu'une tentative se termine
+            for port in ports:
+                if self.cancelled.is_set():
+                    return
+                await self.scan_port_async(address, port)
+        
+        await asyncio.gather(*(worker() for _ in range(max(window, 0))))
+        if self.detector:
+            await asyncio.gather(*self._detections)
     
     def run_scan(self):
-        print(f"🔍 Scan des ports {self.start_port}-{self.end_port} sur {self.target}")
+        label = " UDP" if self.protocol == "udp" else ""
+        if self.ports is not None:
+            print(f"🔍 Scan{label} de {len(self.ports)} ports sur {self.target}")
+        else:
+            print(f"🔍 Scan{label} des ports {self.start_port}-{self.end_port} sur {self.target}")
+        # Résolution unique : passer le nom à connect_ex ferait un getaddrinfo par port
+        self.family, self.address = self.resolver.resolve(self.target)
+        if self.engine == "syn" and self.family != socket.AF_INET:
+            print("⚠️  Scan SYN limité à IPv4 : scan par connexion")
+            self.engine = "async"
+            self.metrics.engine = self.engine
+        ports = self.port_list()
+        if self.checkpoint_dir is not None and not self.incremental:
+            ports = self._open_checkpoint(ports)
+        started_wall = time.time()
+        self.started_at = time.perf_counter()
+        self.metrics_registry.scan_started(self.metrics)
+        completed = False
+        try:
+            if self.incremental:
+                self._run_incremental()
+            else:
+                self._probe_ports(ports)
+            completed = True
+        finally:
+            self.metrics_registry.scan_finished(self.metrics)
+            if self.checkpoint is not None:
+                # Interruption (Ctrl-C, exception) : les sondes encore en vol s'arrêtent, le journal est conservé
+                if not completed:
+                    self.cancel()
+                self.checkpoint.close(complete=completed and not self.cancelled.is_set())
+        open_ports = self.open_ports
+        
+        # Un scan interrompu est partiel : l'enregistrer ferait apparaître de fausses fermetures
+        if self.result_store is not None and not self.cancelled.is_set():
+            self.scan_id = self.result_store.record_scan(
+                self.target, open_ports, self.start_port, self.end_port, timestamp=started_wall,
+                duration=time.perf_counter() - self.started_at, ports_scanned=self.scanned,
+                mode=self.scan_mode, protocol=self.protocol, probed=self.port_list())
+        return open_ports
+    
+    def _open_checkpoint(self, ports):
+        """Ouvre le point de reprise ; en reprise, restaure les résultats et retourne les ports restants"""
+        try:
+            self.checkpoint = ScanCheckpoint.open(self.checkpoint_dir, self.target, self.protocol, ports,
+                                                  resume=self.resume)
+        except CheckpointBusy:
+            # Scan identique déjà en cours : il tient le journal, celui-ci s'en passe
+            print("ℹ️  Le même scan est déjà en cours : pas de point de reprise pour celui-ci")
+            return ports
+        if not self.checkpoint.resumed:
+            if self.resume:
+                print("ℹ️  Aucun point de reprise pour ce scan : scan complet")
+            return ports
+        self.resumed = self.checkpoint.resumed
+        remaining = self.checkpoint.remaining(ports)
+        print(f"♻️  Reprise : {self.resumed} ports déjà sondés, {len(remaining)} restants")
+        self.open_filtered.extend(self.checkpoint.open_filtered)
+        # Tous les états journalisés sont restaurés : les totaux fermés / filtrés couvrent aussi les ports repris
+        open_ports, closed = set(self.checkpoint.open_ports), self.checkpoint.closed
+        with self.lock:
+            for port in self.checkpoint.done:
+                if port not in open_ports:
+                    self.states.record(port, "closed" if port in closed else "filtered")
+        for port in self.checkpoint.open_ports:
+            self._record_state(port, "open")
+            if self.on_open_port:
+                self.on_open_port(port)
+        self.planned = len(remaining)
+        return remaining
+    
+    def _probe_ports(self, ports):
+        if not ports or self.cancelled.is_set():
+            return
+        if self.protocol == "udp":
+            asyncio.run(self._run_udp(ports))
+        elif self.engine == "syn":
+            self._run_syn(ports)
+        elif self.engine == "async":
+            asyncio.run(self._run_async(ports))
+        else:
+            self._run_threads(ports)
+    
+    def _run_syn(self, ports):
+        address = self.address
+        
+        def answered(port):
+            with self.lock:
+                self.scanned += 1
+            outcome = "open" if syn.state[port] == SYN_OPEN else "closed"
+            if outcome == "closed":
+                self._record_state(port, "closed")
+            self.metrics.record(outcome, time.perf_counter() - syn.sent_at[port], attempts=0, in_flight=False)
+            if self.checkpoint is not None:
+                self.checkpoint.mark_done(port)
+        
+        syn = SynScanner(address, ports, self.timing, rate=self.packet_rate,
+                         on_open=self._record_open, on_answer=answered, cancelled=self.cancelled)
+        result = syn.run()
+        # Ports restés sans réponse après toutes les retransmissions (filtrés) : sondés eux aussi, et
+        # seuls marqués terminés avec les ports qui ont répondu ; sur annulation, les autres ports
+        # sans réponse restent non sondés et seront repris
+        with self.lock:
+            self.scanned += len(result["filtered"])
+        for port in result["filtered"]:
+            self._record_state(port, "filtered")
+            self.metrics.record("timeout", attempts=0, in_flight=False)
+            if self.checkpoint is not None:
+                self.checkpoint.mark_done(port)
+        self.metrics.add_probes(result["packets_sent"])
+        if self.detector and result["open"]:
+            asyncio.run(self._detect_ports(address, result["open"]))
+    
+    async def _run_udp(self, ports):
+        address = self.address
+        # Un seul seau pour tout le scan : le débit global, pas celui de chaque worker, est borné
+        bucket = TokenBucket(self.packet_rate)
+        # Fenêtre dimensionnée pour tenir le débit malgré les ports muets (chacun occupe un worker jusqu'à expiration)
+        window = min(fd_budget(self.max_inflight), len(ports))
+        ports = iter(ports)
+        
+        async def worker():
+            for port in ports:
+                if self.cancelled.is_set():
+                    return
+                self.metrics.begin()
+                try:
+                    state, data = await probe_udp(address, port, self.timing, bucket, self.metrics, self.family)
+                finally:
+                    self.scanned += 1
+                if state == ERROR:
+                    # Erreur locale : port ni classé ni marqué terminé, il sera sondé à nouveau en reprise
+                    continue
+                if state == OPEN:
+                    self._record_open(port)
+                    self._record_service(port, udp_service(port, data))
+                else:
+                    # Ouvert|filtré et filtré : tous deux sans réponse exploitable, donc filtrés
+                    self._record_state(port, "closed" if state == CLOSED else "filtered")
+                if state == OPEN_FILTERED:
+                    self.open_filtered.append(port)
+                    if self.checkpoint is not None:
+                        self.checkpoint.mark_open_filtered(port)
+                if self.checkpoint is not None:
+                    self.checkpoint.mark_done(port)
+        
+        await asyncio.gather(*(worker() for _ in range(max(window, 0))))
+        self.open_filtered.sort()
+    
+    async def _detect_ports(self, address, ports):
+        self._detection_slots = asyncio.Semaphore(DETECTION_SLOTS)
+        await asyncio.gather(*(self._detect_async(address, port) for port in ports))
+    
+    def _run_incremental(self):
+        """Revérifie les ports connus ouverts, puis un échantillon tournant des ports fermés ;
+        toute dérive (fermeture ou nouvelle ouverture) élargit immédiatement à toute la plage"""
+        universe = self.port_list()
+        previous = self.result_store.latest(self.target, self.protocol)
+        covered = previous is not None and previous["start_port"] <= self.start_port \
+            and previous["end_port"] >= self.end_port
+        if covered and previous["sparse"]:
+            probed = self.result_store.probed_ports(previous["scan_id"])
+            covered = all(port in probed for port in universe)
+        if not covered:
+            # Pas d'état de référence sur ces ports : scan complet
+            self._probe_ports(universe)
+            return
+        
+        in_scope = set(universe)
+        known_open = [p for p in previous["open_ports"] if p in in_scope]
+        known = set(known_open)
+        # La tranche échantillonnée change à chaque passage : toute la plage est couverte en `rotation` passages
+        slot = self.result_store.scan_count(self.target, self.protocol) % self.rotation
+        sample = [p for i, p in enumerate(universe) if i % self.rotation == slot and p not in known]
+        self.scan_mode = "incremental"
+        self.planned = len(known_open) + len(sample)
+        
+        self._probe_ports(known_open)
+        probed = set(known)
+        if known.issubset(self.open_ports):
+            self._probe_ports(sample)
+            probed.update(sample)
+        current = set(self.open_ports)
+        
+        if current != known and not self.cancelled.is_set():
+            self.scan_mode = "widened"
+            rest = [p for p in universe if p not in probed]
+            self.planned += len(rest)
+            self._probe_ports(rest)
+            current = set(self.open_ports)
+        self.drift = {"opened": sorted(current - known), "closed": sorted(known - current)}
+    
+    def incremental_summary(self):
+        """Mode effectif, sondes envoyées et économisées par rapport à un scan complet"""
+        full = len(self.port_list())
+        return {
+            "mode": self.scan_mode,
+            "probes": self.scanned,
+            "probes_saved": max(full - self.scanned, 0),
+            "saved_percent": round(100 * (full - self.scanned) / full, 1) if full else 0.0,
+            "drift": self.drift,
+        }
+    
+    def _run_threads(self, ports):
         threads = []
         
-        for port in range(self.start_port, self.end_port + 1):
+        for port in ports:
+            if self.cancelled.is_set():
+                break
             thread = threading.Thread(target=self.scan_port, args=(port,))
             threads.append(thread)
             thread.start()
@@ -41,11 +572,9 @@ class PortScanner:
         # Attendre les threads restants
         for t in threads:
             t.join()
-        
-        return sorted(self.open_ports)
 
 # Test
 if __name__ == "__main__":
     scanner = PortScanner("localhost", 1, 100)
     open_ports = scanner.run_scan()
-    print(f"📊 Ports ouverts: {open_ports}")
\ No newline at end of file
+    print(f"📊 Ports ouverts: {open_ports}")
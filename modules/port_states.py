@@ -0,0 +1,226 @@
+import re
+from array import array
+from bisect import bisect_left
+
+PORT_SPACE = 65536
+BITMAP_SIZE = PORT_SPACE // 8
+# Au-delà de 4096 ports, le tableau trié (2 octets par port) dépasse le bitmap de 8 Ko
+DENSE_THRESHOLD = BITMAP_SIZE // 2
+
+_ALL = (1 << PORT_SPACE) - 1
+
+OPEN, CLOSED, FILTERED = "open", "closed", "filtered"
+STATES = (OPEN, CLOSED, FILTERED)
+
+# Positions des bits à 1 de chaque valeur d'octet (parcours d'un bitmap)
+_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+_NONZERO = re.compile(rb"[^\x00]")
+
+# int.bit_count n'existe qu'à partir de Python 3.10
+_popcount = getattr(int, "bit_count", None) or (lambda value: bin(value).count("1"))
+
+
+def _ports_from_bitmap(bitmap):
+    # Les octets nuls (la grande majorité d'un bitmap creux) sont sautés par le moteur d'expressions régulières
+    return [(match.start() << 3) | bit for match in _NONZERO.finditer(bitmap) for bit in _BITS[bitmap[match.start()]]]
+
+
+class PortSet:
+    """Ensemble de ports (0-65535) : tableau trié tant qu'il est petit, bitmap de 8 Ko au-delà
+
+    Même règle que les bitmaps « roaring » : un hôte avec 3 ports ouverts
+    coûte 6 octets, un scan complet de 65 536 ports fermés 8 Ko. Les
+    opérations ensemblistes (&, |, -, ^) passent par des entiers Python
+    de 65 536 bits, calculées en C.
+    """
+
+    __slots__ = ("sparse", "bitmap")
+
+    def __init__(self, ports=()):
+        self.sparse = array("H")
+        self.bitmap = None
+        self.update(ports)
+
+    @classmethod
+    def frombytes(cls, data):
+        """Ensemble depuis un bitmap de 8 Ko (bit n = port n)"""
+        return cls._from_int(int.from_bytes(data, "little"))
+
+    @classmethod
+    def _from_sorted(cls, ports):
+        result = cls()
+        result.sparse = array("H", ports)
+        if len(result.sparse) > DENSE_THRESHOLD:
+            result._densify()
+        return result
+
+    @classmethod
+    def _from_int(cls, value):
+        result = cls()
+        if _popcount(value) > DENSE_THRESHOLD:
+            result.bitmap = bytearray(value.to_bytes(BITMAP_SIZE, "little"))
+        elif value:
+            result.sparse = array("H", _ports_from_bitmap(value.to_bytes(BITMAP_SIZE, "little")))
+        return result
+
+    def _as_bitmap(self):
+        if self.bitmap is not None:
+            return self.bitmap
+        bitmap = bytearray(BITMAP_SIZE)
+        for port in self.sparse:
+            bitmap[port >> 3] |= 1 << (port & 7)
+        return bitmap
+
+    def _to_int(self):
+        return int.from_bytes(self._as_bitmap(), "little")
+
+    def _densify(self):
+        self.bitmap = self._as_bitmap()
+        self.sparse = array("H")
+
+    def add(self, port):
+        bitmap = self.bitmap
+        if bitmap is not None:
+            bitmap[port >> 3] |= 1 << (port & 7)
+            return
+        sparse = self.sparse
+        # Les scans produisent surtout des ports croissants : ajout en fin dans le cas courant
+        if not sparse or port > sparse[-1]:
+            sparse.append(port)
+        else:
+            index = bisect_left(sparse, port)
+            if index < len(sparse) and sparse[index] == port:
+                return
+            sparse.insert(index, port)
+        if len(sparse) > DENSE_THRESHOLD:
+            self._densify()
+
+    def update(self, ports):
+        for port in ports:
+            self.add(port)
+
+    def discard(self, port):
+        if self.bitmap is not None:
+            self.bitmap[port >> 3] &= ~(1 << (port & 7)) & 0xFF
+            return
+        index = bisect_left(self.sparse, port)
+        if index < len(self.sparse) and self.sparse[index] == port:
+            del self.sparse[index]
+
+    def __contains__(self, port):
+        if self.bitmap is not None:
+            return bool(self.bitmap[port >> 3] & (1 << (port & 7)))
+        index = bisect_left(self.sparse, port)
+        return index < len(self.sparse) and self.sparse[index] == port
+
+    def __len__(self):
+        if self.bitmap is not None:
+            return _popcount(int.from_bytes(self.bitmap, "little"))
+        return len(self.sparse)
+
+    def __bool__(self):
+        return bool(self.sparse) or (self.bitmap is not None and any(self.bitmap))
+
+    def __iter__(self):
+        """Ports par ordre croissant"""
+        if self.bitmap is not None:
+            return iter(_ports_from_bitmap(self.bitmap))
+        return iter(self.sparse)
+
+    def __eq__(self, other):
+        if not isinstance(other, PortSet):
+            return NotImplemented
+        return self._to_int() == other._to_int()
+
+    def _combine(self, other, operation):
+        if self.bitmap is None and other.bitmap is None:
+            # Deux petits ensembles : les set Python suffisent, sans passer par 8 Ko
+            return PortSet._from_sorted(sorted(operation(set(self.sparse), set(other.sparse))))
+        return PortSet._from_int(operation(self._to_int(), other._to_int()) & _ALL)
+
+    def __and__(self, other):
+        return self._combine(other, lambda a, b: a & b)
+
+    def __or__(self, other):
+        return self._combine(other, lambda a, b: a | b)
+
+    def __sub__(self, other):
+        return self._combine(other, lambda a, b: a - b if isinstance(a, set) else a & ~b)
+
+    def __xor__(self, other):
+        return self._combine(other, lambda a, b: a ^ b)
+
+    def __ior__(self, other):
+        merged = self | other
+        self.sparse, self.bitmap = merged.sparse, merged.bitmap
+        return self
+
+    def tobytes(self):
+        """Bitmap de 8 Ko (format de frombytes)"""
+        return bytes(self._as_bitmap())
+
+    def ranges(self):
+        """Plages contiguës [(début, fin)], pour un affichage ou une spécification compacte"""
+        result = []
+        for port in self:
+            if result and port == result[-1][1] + 1:
+                result[-1][1] = port
+            else:
+                result.append([port, port])
+        return [tuple(pair) for pair in result]
+
+    @property
+    def nbytes(self):
+        """Mémoire occupée par les ports (hors en-tête de l'objet)"""
+        return len(self.bitmap) if self.bitmap is not None else self.sparse.itemsize * len(self.sparse)
+
+    def __repr__(self):
+        return f"PortSet({len(self)} ports)"
+
+
+class PortStates:
+    """État de chaque port sondé d'un hôte : ouvert, fermé ou filtré (un PortSet par état)
+
+    Un port sans réponse exploitable (erreur locale) n'apparaît dans aucun
+    état. Reclasser un port le retire de son état précédent.
+    """
+
+    __slots__ = ("open", "closed", "filtered")
+
+    def __init__(self):
+        self.open = PortSet()
+        self.closed = PortSet()
+        self.filtered = PortSet()
+
+    def record(self, port, state):
+        getattr(self, state).add(port)
+
+    def reclassify(self, port, state):
+        for name in STATES:
+            if name != state:
+                getattr(self, name).discard(port)
+        self.record(port, state)
+
+    def state(self, port):
+        """État du port (None s'il n'a pas été sondé)"""
+        for name in STATES:
+            if port in getattr(self, name):
+                return name
+        return None
+
+    @property
+    def scanned(self):
+        return self.open | self.closed | self.filtered
+
+    def counts(self):
+        return {name: len(getattr(self, name)) for name in STATES}
+
+    def changes(self, previous):
+        """Ports ouverts et fermés depuis un état précédent du même hôte"""
+        return {"opened": list(self.open - previous.open), "closed": list(previous.open - self.open)}
+
+    @property
+    def nbytes(self):
+        return self.open.nbytes + self.closed.nbytes + self.filtered.nbytes
@@ -0,0 +1,56 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """Limiteur de débit à seau à jetons (rate jetons/s, rafales jusqu'à burst)
+
+    acquire() bloque jusqu'à disposer des jetons demandés ; les attentes se
+    font par tranches pour ne pas payer un sleep par paquet à haut débit.
+    """
+
+    def __init__(self, rate, burst=None):
+        if rate <= 0:
+            raise ValueError("Le débit doit être strictement positif")
+        self.rate = float(rate)
+        # Par défaut : 10 ms de trafic, au moins un jeton
+        self.burst = float(burst) if burst is not None else max(1.0, self.rate / 100)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens=1):
+        """Prend des jetons s'ils sont disponibles, sans attendre"""
+        with self.lock:
+            self._refill(time.monotonic())
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def reserve(self, tokens=1):
+        """Réserve des jetons immédiatement (quitte à s'endetter) ; retourne le délai à respecter
+
+        Pour les appelants asyncio : await asyncio.sleep(bucket.reserve()) ne bloque pas la boucle.
+        """
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= tokens
+            return max(0.0, -self.tokens / self.rate)
+
+    def acquire(self, tokens=1):
+        """Attend puis prend des jetons ; retourne le temps passé à attendre"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill(time.monotonic())
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
@@ -1,39 +1,155 @@
-import json
+import atexit
 import csv
-from datetime import datetime
+import io
+import json
 import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime
+
+from modules.metrics import REGISTRY
+from modules.services import get_service_table
+
+FORMATS = ("json", "csv", "txt")
+# Rapports de balayage multi-hôtes, écrits hôte par hôte
+SWEEP_FORMATS = ("ndjson", "csv")
+# Marqueur de fin pour le thread d'écriture
+_STOP = object()
+# O_BINARY : pas de conversion des fins de ligne sous Windows (absent ailleurs)
+_TEMP_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+# Risque par service (nom de la table des services ou service détecté), par protocole
+SERVICE_RISKS = {
+    "tcp": {
+        "ftp": "FTP - Risque: Élevé (authentification en clair)",
+        "ssh": "SSH - Risque: Faible (si bien configuré)",
+        "telnet": "Telnet - Risque: Très élevé (pas de chiffrement)",
+        "smtp": "SMTP - Risque: Moyen",
+        "dns": "DNS - Risque: Faible",
+        "http": "HTTP - Risque: Moyen",
+        "pop3": "POP3 - Risque: Élevé",
+        "imap": "IMAP - Risque: Élevé",
+        "https": "HTTPS - Risque: Faible",
+        "tls": "TLS - Risque: Faible",
+        "imaps": "IMAPS - Risque: Faible",
+        "pop3s": "POP3S - Risque: Faible",
+        "mssql": "MSSQL - Risque: Élevé",
+        "mysql": "MySQL - Risque: Élevé",
+        "rdp": "RDP - Risque: Élevé",
+        "postgresql": "PostgreSQL - Risque: Élevé",
+        "vnc": "VNC - Risque: Élevé",
+        "http-proxy": "HTTP Proxy - Risque: Moyen",
+    },
+    "udp": {
+        "dns": "DNS - Risque: Moyen (résolveur ouvert, amplification)",
+        "tftp": "TFTP - Risque: Élevé (aucune authentification)",
+        "ntp": "NTP - Risque: Moyen (amplification)",
+        "netbios-ns": "NetBIOS - Risque: Élevé (fuite d'informations)",
+        "snmp": "SNMP - Risque: Élevé (communauté par défaut)",
+        "ssdp": "SSDP - Risque: Élevé (amplification)",
+        "mdns": "mDNS - Risque: Moyen (exposé hors du réseau local)",
+    },
+}
+
+
+def _open_temp(directory, prefix):
+    """Fichier temporaire exclusif (O_EXCL) à côté de sa destination : (fichier texte, chemin)
+
+    Créé en 0666 filtré par l'umask, comme un open() classique (mkstemp impose 0600).
+    """
+    while True:
+        path = os.path.join(directory or ".", f"{prefix}{os.urandom(6).hex()}.tmp")
+        try:
+            fd = os.open(path, _TEMP_FLAGS, 0o666)
+        except FileExistsError:
+            continue
+        return os.fdopen(fd, "w", encoding="utf-8", newline=""), path
+
 
 class ReportGenerator:
-    def __init__(self, output_dir="."):
+    """Génère les rapports et les confie à un thread d'écriture en arrière-plan
+
+    L'appelant ne fait que préparer les données ; le rendu (JSON, CSV, texte)
+    et l'écriture disque sont faits par lots dans output_dir, chaque fichier
+    étant écrit dans un fichier temporaire puis renommé (un lecteur ne voit
+    jamais de rapport partiel). asynchronous=False écrit immédiatement.
+    """
+
+    def __init__(self, output_dir=".", formats=FORMATS, asynchronous=True,
+                 batch_size=64, linger=0.05, max_pending=10000, metrics_registry=REGISTRY):
+        unknown = set(formats) - set(FORMATS)
+        if unknown:
+            raise ValueError(f"Format(s) de rapport inconnu(s): {', '.join(sorted(unknown))}")
         self.output_dir = output_dir
+        self.formats = tuple(formats)
+        self.asynchronous = asynchronous
+        self.batch_size = batch_size
+        self.linger = linger
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        # Durée de rendu + écriture de chaque fichier (histogramme report_write par format)
+        self.metrics_registry = metrics_registry
+        self.closed = False
+        os.makedirs(output_dir, exist_ok=True)
+        if asynchronous:
+            # File bornée : un producteur trop rapide est ralenti plutôt que de saturer la mémoire
+            self.queue = queue.Queue(max_pending)
+            self.writer = threading.Thread(target=self._writer_loop, name="report-writer", daemon=True)
+            self.writer.start()
+            atexit.register(self.close)
     
-    def generate_port_scan_report(self, target, open_ports, scan_time):
-        """Génère un rapport de scan de ports"""
+    def generate_port_scan_report(self, target, open_ports, scan_time, formats=None, services=None,
+                                  protocol="tcp", open_filtered=None, ports_scanned=None, states=None):
+        """Génère un rapport de scan de ports ; retourne le chemin des fichiers (sans extension)
+
+        En UDP, open_filtered liste les ports restés muets (ouverts ou filtrés).
+        ports_scanned est le nombre de ports sondés ; à défaut, il est déduit
+        de states (PortStates du scanner), qui ajoute aussi les ports fermés
+        et filtrés au résumé.
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"port_scan_{target}_{timestamp}"
+        prefix = "udp_scan" if protocol == "udp" else "port_scan"
+        filename = f"{prefix}_{self._safe_name(target)}_{timestamp}"
+        
+        if ports_scanned is None and states is not None:
+            ports_scanned = sum(states.counts().values())
         
         # Données du rapport
         report_data = {
             "scan_info": {
                 "target": target,
+                "protocol": protocol,
                 "scan_time": scan_time,
                 "timestamp": datetime.now().isoformat(),
-                "total_ports_scanned": open_ports[-1] - open_ports[0] + 1 if open_ports else 0,
+                "total_ports_scanned": ports_scanned,
                 "open_ports_count": len(open_ports)
             },
-            "open_ports": open_ports,
-            "security_assessment": self.assess_port_security(open_ports)
+            "open_ports": list(open_ports),  # copie : le rendu peut avoir lieu plus tard
+            "open_filtered": list(open_filtered or []),
+            "services": {str(port): dict(info) for port, info in (services or {}).items()},
+            "security_assessment": self.assess_port_security(open_ports, services, protocol)
         }
+        if states is not None:
+            report_data["scan_info"]["closed_ports_count"] = len(states.closed)
+            report_data["scan_info"]["filtered_ports_count"] = len(states.filtered)
         
-        # Générer les rapports dans le dossier courant
-        self._generate_json_report(report_data, filename)
-        self._generate_csv_report(report_data, filename)
-        self._generate_text_report(report_data, filename)
-        
-        return filename
+        return self._emit(report_data, filename, formats)
     
-    def generate_password_report(self, password_data):
-        """Génère un rapport d'analyse de mot de passe"""
+    def open_sweep_report(self, name, formats=SWEEP_FORMATS, protocol="tcp"):
+        """Rapport de balayage écrit au fil de l'eau (une ligne par hôte) ; voir SweepReport"""
+        unknown = set(formats) - set(SWEEP_FORMATS)
+        if unknown:
+            raise ValueError(f"Format(s) de rapport inconnu(s): {', '.join(sorted(unknown))}")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        prefix = "udp_sweep" if protocol == "udp" else "port_sweep"
+        filename = f"{prefix}_{self._safe_name(name)}_{timestamp}"
+        return SweepReport(self, os.path.join(self.output_dir, filename), formats, protocol)
+    
+    def generate_password_report(self, password_data, formats=None):
+        """Génère un rapport d'analyse de mot de passe (JSON et texte)"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"password_analysis_{timestamp}"
         
@@ -45,46 +161,154 @@ class ReportGenerator:
                 "rating": password_data['rating'],
                 "compromised": password_data['compromised']
             },
-            "detailed_feedback": password_data['feedback'],
+            "detailed_feedback": dict(password_data['feedback']),
             "recommendations": self._generate_password_recommendations(password_data)
         }
         
-        self._generate_json_report(report_data, filename)
-        self._generate_text_report(report_data, filename)
-        
-        return filename
-    
-    def assess_port_security(self, open_ports):
-        """Évalue la sécurité basée sur les ports ouverts"""
-        common_risky_ports = {
-            21: "FTP - Risque: Élevé (authentification en clair)",
-            22: "SSH - Risque: Faible (si bien configuré)",
-            23: "Telnet - Risque: Très élevé (pas de chiffrement)",
-            25: "SMTP - Risque: Moyen",
-            53: "DNS - Risque: Faible",
-            80: "HTTP - Risque: Moyen",
-            110: "POP3 - Risque: Élevé",
-            143: "IMAP - Risque: Élevé",
-            443: "HTTPS - Risque: Faible",
-            993: "IMAPS - Risque: Faible",
-            995: "POP3S - Risque: Faible",
-            1433: "MSSQL - Risque: Élevé",
-            3306: "MySQL - Risque: Élevé",
-            3389: "RDP - Risque: Élevé",
-            5432: "PostgreSQL - Risque: Élevé",
-            5900: "VNC - Risque: Élevé",
-            8080: "HTTP Proxy - Risque: Moyen"
+        return self._emit(report_data, filename, formats)
+    
+    def flush(self, timeout=None):
+        """Attend que tous les rapports en attente soient écrits ; retourne False si le délai expire"""
+        if not self.asynchronous:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+    
+    def close(self, timeout=None):
+        """Écrit les rapports en attente puis arrête le thread d'écriture"""
+        if self.closed:
+            return
+        self.closed = True
+        if self.asynchronous:
+            self.queue.put(_STOP)
+            self.writer.join(timeout)
+            atexit.unregister(self.close)
+    
+    def stats(self):
+        return {
+            "pending": self.queue.unfinished_tasks if self.asynchronous else 0,
+            "written": self.written,
+            "batches": self.batches,
+            "errors": self.errors,
         }
+    
+    @staticmethod
+    def _safe_name(target):
+        # Les cibles IPv6, CIDR ou URL contiennent des caractères interdits dans un nom de fichier
+        return re.sub(r"[^\w.-]", "_", str(target))
+    
+    def _emit(self, data, filename, formats):
+        if self.closed:
+            raise RuntimeError("ReportGenerator fermé")
+        formats = self.formats if formats is None else formats
+        if self.asynchronous:
+            self.queue.put((data, filename, formats))
+        else:
+            self._write_batch([(data, filename, formats)])
+        return os.path.join(self.output_dir, filename)
+    
+    def _render_files(self, data, filename, formats):
+        renderers = {"json": self._render_json_report, "csv": self._render_csv_report, "txt": self._render_text_report}
+        for fmt in FORMATS:
+            if fmt in formats:
+                content = renderers[fmt](data)
+                if content is not None:
+                    yield os.path.join(self.output_dir, f"{filename}.{fmt}"), content
+    
+    def _writer_loop(self):
+        while True:
+            batch = [self.queue.get()]
+            # Regroupe ce qui arrive pendant `linger` (au plus batch_size rapports)
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                try:
+                    batch.append(self.queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            reports = [item for item in batch if item is not _STOP]
+            try:
+                self._write_batch(reports)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+            if batch[-1] is _STOP:
+                return
+    
+    def _write_batch(self, reports):
+        # Le rendu est fait ici aussi : en mode asynchrone, l'appelant ne paie ni le formatage ni le disque
+        for data, filename, formats in reports:
+            try:
+                self._write_report(data, filename, formats)
+            except Exception as e:
+                # Rendu impossible (données inattendues...) : compté, sans arrêter le thread d'écriture
+                self.errors += 1
+                print(f"❌ Rapport {filename} impossible: {e}")
+        if reports:
+            self.batches += 1
+    
+    def _write_report(self, data, filename, formats):
+        started = time.perf_counter()
+        for path, content in self._render_files(data, filename, formats):
+            try:
+                self._write_atomic(path, content)
+                self.written += 1
+            except OSError as e:
+                self.errors += 1
+                print(f"❌ Écriture du rapport {path} impossible: {e}")
+            finished = time.perf_counter()
+            self.metrics_registry.observe("report_write", path.rsplit(".", 1)[-1], finished - started)
+            started = finished
+    
+    @staticmethod
+    def _write_atomic(path, content):
+        directory, name = os.path.split(path)
+        f, tmp_path = _open_temp(directory, f".{name}.")
+        try:
+            with f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    
+    def assess_port_security(self, open_ports, services=None, protocol="tcp"):
+        """Évalue la sécurité basée sur les ports ouverts
+
+        Le service détecté (services : port -> résultat de ServiceDetector)
+        prime sur le service habituel du port (table des services) : SSH sur
+        2222 est évalué comme tel. En UDP, seuls les ports ayant répondu comptent.
+        """
+        services = services or {}
+        table = get_service_table()
+        risks_by_service = SERVICE_RISKS[protocol]
         
         risks = []
         for port in open_ports:
-            if port in common_risky_ports:
-                risks.append({
-                    "port": port,
-                    "service": common_risky_ports[port].split(" - ")[0],
-                    "risk_level": common_risky_ports[port].split("Risque: ")[1].split(")")[0] + ")",
-                    "description": common_risky_ports[port]
-                })
+            detected = services.get(port) or {}
+            service = detected.get("service") or table.name(port, protocol)
+            if service == "ssh" and (detected.get("version") or "").startswith("1."):
+                description = "SSH - Risque: Très élevé (protocole SSH-1 obsolète)"
+            elif service in risks_by_service:
+                description = risks_by_service[service]
+            else:
+                continue
+            risks.append({
+                "port": port,
+                "service": description.split(" - ")[0],
+                "risk_level": description.split("Risque: ")[1],
+                "description": description,
+                "detected": bool(detected),
+                "product": detected.get("product")
+            })
         
         # Déterminer le niveau de risque global
         risk_count = len(risks)
@@ -101,37 +325,32 @@ class ReportGenerator:
             "risk_ports_count": risk_count
         }
     
-    def _generate_json_report(self, data, filename):
-        """Génère un rapport JSON"""
-        filepath = f"{filename}.json"
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        print(f"📄 Rapport JSON généré: {filepath}")
+    def _render_json_report(self, data):
+        """Rendu JSON"""
+        return json.dumps(data, indent=2, ensure_ascii=False)
     
-    def _generate_csv_report(self, data, filename):
-        """Génère un rapport CSV pour les scans de ports"""
+    def _render_csv_report(self, data):
+        """Rendu CSV (scans de ports uniquement)"""
         if "open_ports" in data:
-            filepath = f"{filename}.csv"
-            with open(filepath, 'w', newline='', encoding='utf-8') as f:
+            with io.StringIO(newline='') as f:
                 writer = csv.writer(f)
-                writer.writerow(["Port", "Service", "Statut"])
-                
-                # Ajouter les services connus
-                service_mapping = {
-                    21: "FTP", 22: "SSH", 23: "Telnet", 25: "SMTP", 53: "DNS",
-                    80: "HTTP", 110: "POP3", 143: "IMAP", 443: "HTTPS",
-                    993: "IMAPS", 995: "POP3S", 3389: "RDP", 5900: "VNC"
-                }
+                protocol = data.get("scan_info", {}).get("protocol", "tcp")
+                table = get_service_table()
+                writer.writerow(["Port", "Protocole", "Service", "Statut"])
                 
                 for port in data["open_ports"]:
-                    service = service_mapping.get(port, "Inconnu")
-                    writer.writerow([port, service, "OUVERT"])
-            print(f"📊 Rapport CSV généré: {filepath}")
-    
-    def _generate_text_report(self, data, filename):
-        """Génère un rapport texte lisible"""
-        filepath = f"{filename}.txt"
-        with open(filepath, 'w', encoding='utf-8') as f:
+                    detected = data.get("services", {}).get(str(port))
+                    service = detected["service"] if detected else table.name(port, protocol)
+                    writer.writerow([port, protocol.upper(), service.upper() if service else "Inconnu", "OUVERT"])
+                for port in data.get("open_filtered", []):
+                    service = table.name(port, protocol)
+                    writer.writerow([port, protocol.upper(), service.upper() if service else "Inconnu", "OUVERT|FILTRÉ"])
+                return f.getvalue()
+        return None
+    
+    def _render_text_report(self, data):
+        """Rendu texte lisible"""
+        with io.StringIO() as f:
             f.write("="*60 + "\n")
             f.write("RAPPORT DE CYBERSÉCURITÉ\n")
             f.write("="*60 + "\n\n")
@@ -140,11 +359,24 @@ class ReportGenerator:
                 f.write("📡 SCAN DE PORTS\n")
                 f.write("-" * 40 + "\n")
                 f.write(f"Cible: {data['scan_info']['target']}\n")
+                f.write(f"Protocole: {data['scan_info'].get('protocol', 'tcp').upper()}\n")
                 f.write(f"Date: {data['scan_info']['timestamp']}\n")
                 f.write(f"Temps de scan: {data['scan_info']['scan_time']}\n")
-                f.write(f"Ports scannés: {data['scan_info']['total_ports_scanned']}\n")
+                scanned = data['scan_info']['total_ports_scanned']
+                f.write(f"Ports scannés: {scanned if scanned is not None else 'inconnu'}\n")
                 f.write(f"Ports ouverts: {len(data['open_ports'])}\n")
-                f.write(f"Liste des ports: {', '.join(map(str, data['open_ports']))}\n\n")
+                f.write(f"Liste des ports: {', '.join(map(str, data['open_ports']))}\n")
+                if data.get('open_filtered'):
+                    f.write(f"Ports sans réponse (ouverts ou filtrés): {len(data['open_filtered'])}\n")
+                f.write("\n")
+                
+                if data.get('services'):
+                    f.write("🔎 SERVICES DÉTECTÉS\n")
+                    f.write("-" * 40 + "\n")
+                    for port, info in data['services'].items():
+                        product = f" - {info['product']}" if info.get('product') else ""
+                        f.write(f"  • Port {port}: {info['service'].upper()}{product}\n")
+                    f.write("\n")
                 
                 f.write("⚠️  ÉVALUATION DE SÉCURITÉ\n")
                 f.write("-" * 40 + "\n")
@@ -164,7 +396,9 @@ class ReportGenerator:
                 f.write(f"Score de sécurité: {data['analysis_info']['score']}/100\n")
                 f.write(f"Évaluation: {data['analysis_info']['rating']}\n")
                 f.write(f"Longueur: {data['analysis_info']['password_length']} caractères\n")
-                f.write(f"Compromis dans des fuites: {'✅ OUI' if data['analysis_info']['compromised'] else '❌ NON'}\n\n")
+                compromised = data['analysis_info']['compromised']
+                breach_status = 'INCONNU (vérification impossible)' if compromised is None else ('✅ OUI' if compromised else '❌ NON')
+                f.write(f"Compromis dans des fuites: {breach_status}\n\n")
                 
                 f.write("📊 DÉTAILS DE L'ANALYSE\n")
                 f.write("-" * 40 + "\n")
@@ -181,8 +415,7 @@ class ReportGenerator:
             f.write(f"\n" + "="*60 + "\n")
             f.write(f"Rapport généré le: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
             f.write("="*60 + "\n")
-        
-        print(f"📝 Rapport texte généré: {filepath}")
+            return f.getvalue()
     
     def _generate_password_recommendations(self, password_data):
         """Génère des recommandations basées sur l'analyse du mot de passe"""
@@ -214,4 +447,72 @@ class ReportGenerator:
         else:
             recommendations.append("Utilisez un mot de passe unique pour chaque compte")
         
-        return recommendations
\ No newline at end of file
+        return recommendations
+
+class SweepReport:
+    """Rapport d'un balayage de nombreux hôtes, écrit hôte par hôte
+
+    NDJSON : une ligne par hôte (ports ouverts, compteurs d'états, risques) ;
+    CSV : une ligne par port ouvert. Rien n'est conservé en mémoire entre deux
+    hôtes, quel que soit leur nombre. Les fichiers sont écrits sous un nom
+    temporaire et renommés à close() : un lecteur ne voit jamais de rapport partiel.
+    """
+
+    def __init__(self, reporter, path, formats=SWEEP_FORMATS, protocol="tcp"):
+        self.reporter = reporter
+        self.path = path
+        self.protocol = protocol
+        self.table = get_service_table()
+        self.hosts = 0
+        self.open_ports = 0
+        self.files = {}
+        self.closed = False
+        directory, name = os.path.split(path)
+        for fmt in formats:
+            self.files[fmt] = _open_temp(directory, f".{name}.{fmt}.")
+        if "csv" in self.files:
+            self.csv = csv.writer(self.files["csv"][0])
+            self.csv.writerow(["Hôte", "Port", "Protocole", "Service", "Statut"])
+    
+    def add_host(self, host, open_ports, ports_scanned=None, states=None, services=None):
+        """Ajoute un hôte au rapport (states : PortStates de l'hôte, pour les compteurs d'états)"""
+        services = services or {}
+        self.hosts += 1
+        self.open_ports += len(open_ports)
+        if "ndjson" in self.files:
+            assessment = self.reporter.assess_port_security(open_ports, services, self.protocol)
+            record = {"host": host, "protocol": self.protocol, "open_ports": list(open_ports)}
+            if states is not None:
+                record.update(states.counts())
+                if ports_scanned is None:
+                    ports_scanned = sum(record[name] for name in ("open", "closed", "filtered"))
+            record["ports_scanned"] = ports_scanned
+            record["overall_risk"] = assessment["overall_risk"]
+            record["risky_ports"] = [{"port": risk["port"], "service": risk["service"], "risk_level": risk["risk_level"]}
+                                     for risk in assessment["risky_ports"]]
+            self.files["ndjson"][0].write(json.dumps(record, ensure_ascii=False) + "\n")
+        if "csv" in self.files:
+            for port in open_ports:
+                detected = services.get(port)
+                service = detected["service"] if detected else self.table.name(port, self.protocol)
+                self.csv.writerow([host, port, self.protocol.upper(), service.upper() if service else "Inconnu", "OUVERT"])
+    
+    def close(self, discard=False):
+        """Publie les fichiers (renommage) ; discard=True les supprime. Retourne le chemin sans extension"""
+        if self.closed:
+            return self.path
+        self.closed = True
+        for fmt, (f, tmp_path) in self.files.items():
+            f.close()
+            if discard:
+                os.unlink(tmp_path)
+                continue
+            os.replace(tmp_path, f"{self.path}.{fmt}")
+            self.reporter.written += 1
+        return self.path
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close(discard=exc_type is not None)
@@ -0,0 +1,229 @@
+import asyncio
+import ipaddress
+import os
+import random
+import socket
+import struct
+import threading
+
+from modules.cache import TTLCache
+
+# Types d'enregistrement DNS par famille d'adresses
+QTYPES = {socket.AF_INET: 1, socket.AF_INET6: 28}
+DNS_HEADER = struct.Struct("!HHHHHH")
+DNS_RECORD = struct.Struct("!HHIH")
+NXDOMAIN = 3
+
+
+def build_query(name, qtype, query_id):
+    """Requête DNS standard (récursion demandée) pour un nom et un type"""
+    labels = b"".join(bytes([len(label)]) + label for label in name.rstrip(".").encode("idna").split(b"."))
+    return DNS_HEADER.pack(query_id, 0x0100, 1, 0, 0, 0) + labels + b"\x00" + struct.pack("!HH", qtype, 1)
+
+
+def _skip_name(data, offset):
+    while True:
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        if length == 0:
+            return offset + 1
+        offset += length + 1
+
+
+def parse_response(data, query_id, qtype):
+    """Adresses du type demandé et plus petit TTL ; ([], None) pour un nom inexistant
+
+    Les CNAME éventuels précèdent les adresses dans la réponse d'un résolveur
+    récursif : seuls les enregistrements du type demandé sont retenus.
+    """
+    ident, flags, qdcount, ancount, _, _ = DNS_HEADER.unpack_from(data)
+    if ident != query_id or not flags & 0x8000:
+        raise ValueError("Réponse DNS inattendue")
+    rcode = flags & 0x000F
+    if rcode == NXDOMAIN:
+        return [], None
+    if rcode:
+        raise ValueError(f"Erreur DNS (rcode {rcode})")
+    offset = DNS_HEADER.size
+    for _ in range(qdcount):
+        offset = _skip_name(data, offset) + 4
+    addresses, ttl = [], None
+    for _ in range(ancount):
+        offset = _skip_name(data, offset)
+        rtype, _, record_ttl, length = DNS_RECORD.unpack_from(data, offset)
+        offset += DNS_RECORD.size
+        if rtype == qtype:
+            family = socket.AF_INET if qtype == 1 else socket.AF_INET6
+            addresses.append(socket.inet_ntop(family, data[offset:offset + length]))
+            ttl = record_ttl if ttl is None else min(ttl, record_ttl)
+        offset += length
+    return addresses, ttl
+
+
+class Resolver:
+    """Résolution des cibles de scan (IPv4 et IPv6) avec un cache TTL partagé
+
+    Par défaut getaddrinfo, dont la libc ne rend pas le TTL : les entrées
+    vivent ttl secondes. Avec nameserver=(ip, port), les requêtes DNS sont
+    envoyées directement en UDP et le TTL des réponses est respecté (borné
+    par max_ttl). Les échecs sont mis en cache negative_ttl secondes.
+    """
+
+    def __init__(self, nameserver=None, family=socket.AF_UNSPEC, ttl=60, max_ttl=3600,
+                 negative_ttl=30, maxsize=4096, concurrency=64, timeout=2.0, retries=1):
+        self.nameserver = nameserver
+        self.family = family
+        self.ttl = ttl
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        # Requêtes réellement envoyées (getaddrinfo ou DNS), hors cache
+        self.lookups = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def literal(host):
+        """(famille, adresse) si host est déjà une adresse IP, sinon None"""
+        try:
+            ip = ipaddress.ip_address(host.strip("[]"))
+        except ValueError:
+            return None
+        return (socket.AF_INET if ip.version == 4 else socket.AF_INET6), str(ip)
+
+    def _families(self, family):
+        family = self.family if family is None else family
+        return (socket.AF_INET, socket.AF_INET6) if family == socket.AF_UNSPEC else (family,)
+
+    def _cached(self, host, family):
+        found = self.literal(host)
+        if found is not None:
+            return found
+        entry = self.cache.get((host.lower(), family))
+        if entry is False:
+            raise socket.gaierror(socket.EAI_NONAME, f"Résolution impossible: {host}")
+        return entry
+
+    def _store(self, host, family, result, ttl):
+        if result is None:
+            self.cache.set((host.lower(), family), False, ttl=self.negative_ttl)
+            raise socket.gaierror(socket.EAI_NONAME, f"Résolution impossible: {host}")
+        self.cache.set((host.lower(), family), result, ttl=min(ttl, self.max_ttl))
+        return result
+
+    def _count(self):
+        with self.lock:
+            self.lookups += 1
+
+    def resolve(self, host, family=None):
+        """(famille, adresse) de host ; lève socket.gaierror si le nom est introuvable"""
+        found = self._cached(host, family)
+        if found is not None:
+            return found
+        self._count()
+        if self.nameserver is None:
+            result, ttl = self._getaddrinfo(host, family), self.ttl
+        else:
+            result, ttl = self._query_blocking(host, family)
+        return self._store(host, family, result, ttl)
+
+    async def resolve_async(self, host, family=None):
+        """Version asyncio de resolve() (ne bloque pas la boucle d'événements)"""
+        found = self._cached(host, family)
+        if found is not None:
+            return found
+        self._count()
+        if self.nameserver is None:
+            loop = asyncio.get_running_loop()
+            result, ttl = await loop.run_in_executor(None, self._getaddrinfo, host, family), self.ttl
+        else:
+            result, ttl = await self._query_async(host, family)
+        return self._store(host, family, result, ttl)
+
+    async def resolve_many(self, hosts, family=None):
+        """Résout une liste d'hôtes en parallèle (concurrency requêtes à la fois) ; None pour un échec"""
+        slots = asyncio.Semaphore(self.concurrency)
+        unique = list(dict.fromkeys(hosts))
+
+        async def one(host):
+            async with slots:
+                try:
+                    return await self.resolve_async(host, family)
+                except (socket.gaierror, OSError):
+                    return None
+
+        results = await asyncio.gather(*(one(host) for host in unique))
+        return dict(zip(unique, results))
+
+    def _getaddrinfo(self, host, family):
+        family = self.family if family is None else family
+        try:
+            infos = socket.getaddrinfo(host, None, family=family, type=socket.SOCK_STREAM)
+        except socket.gaierror:
+            return None
+        # Sans famille imposée : IPv4 d'abord s'il existe (le scan SYN est limité à IPv4)
+        if family == socket.AF_UNSPEC:
+            infos.sort(key=lambda info: info[0] != socket.AF_INET)
+        return infos[0][0], infos[0][4][0]
+
+    def _query_blocking(self, host, family):
+        for qfamily in self._families(family):
+            qtype = QTYPES[qfamily]
+            for _ in range(self.retries + 1):
+                query_id = random.getrandbits(16)
+                with socket.socket(self._server_family(), socket.SOCK_DGRAM) as sock:
+                    sock.settimeout(self.timeout)
+                    sock.connect(self.nameserver)
+                    sock.send(build_query(host, qtype, query_id))
+                    try:
+                        addresses, ttl = parse_response(sock.recv(4096), query_id, qtype)
+                    except (socket.timeout, ValueError):
+                        continue
+                if addresses:
+                    return (qfamily, addresses[0]), ttl
+                break
+        return None, self.negative_ttl
+
+    async def _query_async(self, host, family):
+        loop = asyncio.get_running_loop()
+        for qfamily in self._families(family):
+            qtype = QTYPES[qfamily]
+            for _ in range(self.retries + 1):
+                query_id = random.getrandbits(16)
+                sock = socket.socket(self._server_family(), socket.SOCK_DGRAM)
+                sock.setblocking(False)
+                try:
+                    sock.connect(self.nameserver)
+                    sock.send(build_query(host, qtype, query_id))
+                    data = await asyncio.wait_for(loop.sock_recv(sock, 4096), self.timeout)
+                    addresses, ttl = parse_response(data, query_id, qtype)
+                except (asyncio.TimeoutError, ValueError):
+                    continue
+                finally:
+                    sock.close()
+                if addresses:
+                    return (qfamily, addresses[0]), ttl
+                break
+        return None, self.negative_ttl
+
+    def _server_family(self):
+        return socket.AF_INET6 if ":" in self.nameserver[0] else socket.AF_INET
+
+    def stats(self):
+        return {"lookups": self.lookups, **self.cache.stats()}
+
+
+def resolver_from_env():
+    """Résolveur configuré par $CYBERSEC_DNS_SERVER ("ip", "ip:port" ou "[ipv6]:port"), sinon getaddrinfo"""
+    server = os.environ.get("CYBERSEC_DNS_SERVER")
+    if not server:
+        return Resolver()
+    host, _, port = server.rpartition(":") if server.count(":") == 1 or server.startswith("[") else (server, "", "")
+    return Resolver(nameserver=(host.strip("[]"), int(port or 53)))
+
+
+# Résolveur partagé par tous les scans du processus (Flask, CLI)
+RESOLVER = resolver_from_env()
@@ -0,0 +1,330 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+
+from modules.port_states import PortSet
+
+DEFAULT_DB_PATH = os.environ.get(
+    "CYBERSEC_RESULTS_DB",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scan_results.db"),
+)
+
+SCHEMA_VERSION = 4
+
+# Seuls les ports ouverts sont stockés : un port sondé absent de open_ports était fermé. probed vaut NULL
+# quand toute la plage start_port..end_port a été sondée, sinon c'est le bitmap compressé des ports sondés.
+# target et timestamp sont dupliqués dans open_ports pour l'index (target, port, timestamp).
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    target TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    start_port INTEGER NOT NULL,
+    end_port INTEGER NOT NULL,
+    ports_scanned INTEGER NOT NULL,
+    open_count INTEGER NOT NULL,
+    duration REAL,
+    mode TEXT NOT NULL DEFAULT 'full',
+    protocol TEXT NOT NULL DEFAULT 'tcp',
+    probed BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_scans_target_timestamp ON scans(target, timestamp);
+
+CREATE TABLE IF NOT EXISTS open_ports (
+    scan_id INTEGER NOT NULL REFERENCES scans(id) ON DELETE CASCADE,
+    target TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    PRIMARY KEY (scan_id, port)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_open_ports_target_port_timestamp ON open_ports(target, port, timestamp);
+
+-- Dernier scan de chaque hôte et protocole, tenu à jour à l'insertion (pas de GROUP BY sur tout l'historique)
+CREATE TABLE IF NOT EXISTS hosts (
+    target TEXT NOT NULL,
+    protocol TEXT NOT NULL DEFAULT 'tcp',
+    last_scan_id INTEGER NOT NULL REFERENCES scans(id),
+    last_timestamp REAL NOT NULL,
+    scan_count INTEGER NOT NULL,
+    PRIMARY KEY (target, protocol)
+) WITHOUT ROWID;
+"""
+
+# Migrations d'une version du schéma à la suivante (bases créées par une version antérieure)
+MIGRATIONS = {
+    2: "ALTER TABLE scans ADD COLUMN mode TEXT NOT NULL DEFAULT 'full';",
+    # Les scans UDP ont leur propre état courant : la clé de hosts devient (target, protocol)
+    3: """
+ALTER TABLE scans ADD COLUMN protocol TEXT NOT NULL DEFAULT 'tcp';
+CREATE TABLE hosts_v3 (
+    target TEXT NOT NULL,
+    protocol TEXT NOT NULL DEFAULT 'tcp',
+    last_scan_id INTEGER NOT NULL REFERENCES scans(id),
+    last_timestamp REAL NOT NULL,
+    scan_count INTEGER NOT NULL,
+    PRIMARY KEY (target, protocol)
+) WITHOUT ROWID;
+INSERT INTO hosts_v3 SELECT target, 'tcp', last_scan_id, last_timestamp, scan_count FROM hosts;
+DROP TABLE hosts;
+ALTER TABLE hosts_v3 RENAME TO hosts;
+""",
+    # Listes de ports creuses et budgets de sondes : ensemble des ports sondés
+    4: "ALTER TABLE scans ADD COLUMN probed BLOB;",
+}
+
+SCAN_COLUMNS = "id, target, timestamp, start_port, end_port, ports_scanned, open_count, duration, mode, protocol, probed"
+
+
+class IncomparableScans(ValueError):
+    """Les deux scans ne portent pas sur la même cible ou le même protocole"""
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp).isoformat(timespec="seconds")
+
+
+def _coverage(row):
+    """Ports sondés par un scan, sous forme d'entier (bit n = port n)"""
+    if row["probed"] is None:
+        return ((1 << (row["end_port"] + 1)) - 1) ^ ((1 << row["start_port"]) - 1)
+    return int.from_bytes(zlib.decompress(row["probed"]), "little")
+
+
+class ResultStore:
+    """Historique des scans dans une base SQLite embarquée
+
+    Chaque thread a sa propre connexion (mode WAL : les lectures ne bloquent pas
+    les écritures des workers de scan). Les requêtes d'historique, d'état
+    courant et de comparaison passent toutes par un index.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+        conn = self._connection()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < SCHEMA_VERSION:
+            with conn:
+                if version == 0:
+                    conn.executescript(SCHEMA)
+                else:
+                    for step in range(version + 1, SCHEMA_VERSION + 1):
+                        conn.executescript(MIGRATIONS[step])
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA foreign_keys = ON")
+            self.local.conn = conn
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    def close(self):
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections = []
+        self.local = threading.local()
+
+    def record_scan(self, target, open_ports, start_port, end_port, timestamp=None,
+                    duration=None, ports_scanned=None, mode="full", protocol="tcp", probed=None):
+        """Enregistre un scan terminé ; retourne son identifiant
+
+        Pour un scan incrémental, open_ports est l'état reconstitué de toute la
+        plage et ports_scanned le nombre de sondes réellement envoyées.
+        En UDP, seuls les ports ayant répondu sont enregistrés comme ouverts.
+        probed : ports couverts par le scan, si ce n'est pas toute la plage
+        (liste creuse, budget de sondes) ; les autres ne sont ni ouverts ni fermés.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        open_ports = sorted(set(open_ports))
+        covered = end_port - start_port + 1
+        if probed is not None:
+            probed = PortSet(sorted(set(probed)))
+            covered = len(probed)
+            probed = None if covered == end_port - start_port + 1 else zlib.compress(probed.tobytes())
+        if ports_scanned is None:
+            ports_scanned = covered
+        conn = self._connection()
+        with conn:
+            scan_id = conn.execute(
+                "INSERT INTO scans (target, timestamp, start_port, end_port, ports_scanned, open_count, duration, mode, "
+                "protocol, probed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (target, timestamp, start_port, end_port, ports_scanned, len(open_ports), duration, mode, protocol,
+                 probed),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO open_ports (scan_id, target, port, timestamp) VALUES (?, ?, ?, ?)",
+                ((scan_id, target, port, timestamp) for port in open_ports),
+            )
+            conn.execute(
+                "INSERT INTO hosts (target, protocol, last_scan_id, last_timestamp, scan_count) VALUES (?, ?, ?, ?, 1) "
+                "ON CONFLICT(target, protocol) DO UPDATE SET scan_count = scan_count + 1, "
+                "last_scan_id = CASE WHEN excluded.last_timestamp >= last_timestamp THEN excluded.last_scan_id ELSE last_scan_id END, "
+                "last_timestamp = MAX(last_timestamp, excluded.last_timestamp)",
+                (target, protocol, scan_id, timestamp),
+            )
+        return scan_id
+
+    def _scan_dict(self, row, with_ports=True):
+        scan = {
+            "scan_id": row["id"],
+            "target": row["target"],
+            "timestamp": _iso(row["timestamp"]),
+            "start_port": row["start_port"],
+            "end_port": row["end_port"],
+            "ports_scanned": row["ports_scanned"],
+            "open_count": row["open_count"],
+            "duration": row["duration"],
+            "mode": row["mode"],
+            "protocol": row["protocol"],
+            # Une partie seulement de la plage start_port..end_port a été sondée
+            "sparse": row["probed"] is not None,
+        }
+        if with_ports:
+            scan["open_ports"] = self._open_ports(row["id"])
+        return scan
+
+    def _open_ports(self, scan_id):
+        rows = self._connection().execute("SELECT port FROM open_ports WHERE scan_id = ? ORDER BY port", (scan_id,))
+        return [port for (port,) in rows]
+
+    def _scan_row(self, scan_id):
+        return self._connection().execute(f"SELECT {SCAN_COLUMNS} FROM scans WHERE id = ?", (scan_id,)).fetchone()
+
+    def get_scan(self, scan_id):
+        row = self._scan_row(scan_id)
+        return self._scan_dict(row) if row else None
+
+    def probed_ports(self, scan_id):
+        """Ports sondés par un scan (PortSet), None si toute sa plage l'a été ou si le scan n'existe pas"""
+        row = self._scan_row(scan_id)
+        if row is None or row["probed"] is None:
+            return None
+        return PortSet.frombytes(zlib.decompress(row["probed"]))
+
+    def history(self, target, port=None, since=None, limit=50, protocol="tcp"):
+        """Scans d'un hôte, du plus récent au plus ancien
+
+        Avec port : état de ce port (ouvert ou non) dans chaque scan qui l'a sondé.
+        """
+        since = 0 if since is None else since
+        conn = self._connection()
+        if port is None:
+            rows = conn.execute(
+                f"SELECT {SCAN_COLUMNS} FROM scans WHERE target = ? AND timestamp >= ? AND protocol = ? "
+                "ORDER BY timestamp DESC LIMIT ?",
+                (target, since, protocol, limit),
+            )
+            return [self._scan_dict(row, with_ports=False) for row in rows]
+        rows = conn.execute(
+            "SELECT s.id, s.timestamp, s.probed, "
+            "EXISTS(SELECT 1 FROM open_ports o WHERE o.scan_id = s.id AND o.port = ?) AS is_open "
+            "FROM scans s WHERE s.target = ? AND s.timestamp >= ? AND s.start_port <= ? AND s.end_port >= ? "
+            "AND s.protocol = ? ORDER BY s.timestamp DESC",
+            (port, target, since, port, port, protocol),
+        )
+        history = []
+        for row in rows:
+            # Scan creux : le port est dans sa plage sans avoir forcément été sondé
+            if row["probed"] is not None and not int.from_bytes(zlib.decompress(row["probed"]), "little") >> port & 1:
+                continue
+            history.append({"scan_id": row["id"], "timestamp": _iso(row["timestamp"]), "port": port,
+                            "open": bool(row["is_open"])})
+            if len(history) >= limit:
+                break
+        return history
+
+    def port_last_seen_open(self, target, port, protocol="tcp"):
+        """Date de la dernière détection du port ouvert sur cet hôte (None si jamais vu)"""
+        row = self._connection().execute(
+            "SELECT MAX(o.timestamp) FROM open_ports o JOIN scans s ON s.id = o.scan_id "
+            "WHERE o.target = ? AND o.port = ? AND s.protocol = ?", (target, port, protocol)
+        ).fetchone()
+        return _iso(row[0]) if row[0] is not None else None
+
+    def latest(self, target, protocol="tcp"):
+        """Dernier scan connu d'un hôte (avec ses ports ouverts), ou None"""
+        row = self._connection().execute(
+            f"SELECT {SCAN_COLUMNS} FROM scans WHERE id = "
+            "(SELECT last_scan_id FROM hosts WHERE target = ? AND protocol = ?)",
+            (target, protocol),
+        ).fetchone()
+        return self._scan_dict(row) if row else None
+
+    def scan_count(self, target, protocol="tcp"):
+        row = self._connection().execute(
+            "SELECT scan_count FROM hosts WHERE target = ? AND protocol = ?", (target, protocol)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def latest_per_host(self, limit=100, offset=0):
+        """État le plus récent de chaque hôte (et protocole), par ordre alphabétique"""
+        rows = self._connection().execute(
+            "SELECT s.id, s.target, s.timestamp, s.start_port, s.end_port, s.ports_scanned, s.open_count, "
+            "s.duration, s.mode, s.protocol, s.probed, h.scan_count "
+            "FROM hosts h JOIN scans s ON s.id = h.last_scan_id ORDER BY h.target, h.protocol LIMIT ? OFFSET ?",
+            (limit, offset),
+        )
+        hosts = []
+        for row in rows:
+            scan = self._scan_dict(row)
+            scan["scan_count"] = row["scan_count"]
+            hosts.append(scan)
+        return hosts
+
+    def diff(self, old_scan_id, new_scan_id):
+        """Ports ouverts et fermés entre deux scans, sur les seuls ports sondés par les deux
+
+        Lève IncomparableScans si les cibles ou les protocoles diffèrent.
+        """
+        old_row, new_row = self._scan_row(old_scan_id), self._scan_row(new_scan_id)
+        if old_row is None or new_row is None:
+            return None
+        if old_row["target"] != new_row["target"] or old_row["protocol"] != new_row["protocol"]:
+            raise IncomparableScans(f"Scans incomparables: {old_row['target']} ({old_row['protocol']}) "
+                                    f"et {new_row['target']} ({new_row['protocol']})")
+        old, new = self._scan_dict(old_row), self._scan_dict(new_row)
+        low = max(old["start_port"], new["start_port"])
+        high = min(old["end_port"], new["end_port"])
+        common = _coverage(old_row) & _coverage(new_row)
+        before = {p for p in old["open_ports"] if common >> p & 1}
+        after = {p for p in new["open_ports"] if common >> p & 1}
+        return {
+            "target": new["target"],
+            "protocol": new["protocol"],
+            "old_scan": {"scan_id": old["scan_id"], "timestamp": old["timestamp"]},
+            "new_scan": {"scan_id": new["scan_id"], "timestamp": new["timestamp"]},
+            "compared_range": [low, high] if low <= high else None,
+            "compared_ports": bin(common).count("1"),
+            "opened": sorted(after - before),
+            "closed": sorted(before - after),
+            "unchanged": sorted(before & after),
+        }
+
+    def diff_latest(self, target, protocol="tcp"):
+        """Comparaison des deux derniers scans d'un hôte (None s'il en a moins de deux)"""
+        rows = self._connection().execute(
+            "SELECT id FROM scans WHERE target = ? AND protocol = ? ORDER BY timestamp DESC LIMIT 2", (target, protocol)
+        ).fetchall()
+        if len(rows) < 2:
+            return None
+        return self.diff(rows[1]["id"], rows[0]["id"])
+
+    def stats(self):
+        hosts, scans = self._connection().execute("SELECT COUNT(*), SUM(scan_count) FROM hosts").fetchone()
+        return {"hosts": hosts, "scans": scans or 0, "path": self.path}
@@ -0,0 +1,272 @@
+import json
+import queue
+import threading
+import time
+import uuid
+
+from modules.port_scanner import PortScanner
+from modules.sweep_scheduler import SweepScheduler
+
+# Durée de conservation d'un job terminé (le temps que le client lise la fin du flux)
+FINISHED_JOB_TTL = 600
+
+
+class ScanQueueFull(Exception):
+    """La file d'attente des jobs est pleine"""
+
+
+class ClientQuotaExceeded(Exception):
+    """Le client a déjà atteint son nombre maximal de jobs actifs"""
+
+
+def sse_event(event, data):
+    """Formate un événement Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class Job:
+    """Travail exécuté par un worker du pool : statut, annulation et attente de la fin
+
+    task est le scanner (PortScanner, SweepScheduler) : il expose run(),
+    cancel() et l'événement cancelled.
+    """
+
+    def __init__(self, task, client=None):
+        self.id = uuid.uuid4().hex
+        self.client = client
+        self.task = task
+        self.status = "pending"
+        self.error = None
+        self.duration = None
+        self.finished_at = None
+        self.changed = threading.Condition()
+
+    def _set_status(self, status):
+        with self.changed:
+            self.status = status
+            if self.finished:
+                self.finished_at = time.time()
+            self.changed.notify_all()
+
+    def _execute(self):
+        self.task.run()
+
+    def run(self):
+        # Annulé pendant l'attente dans la file : rien à exécuter
+        if self.task.cancelled.is_set():
+            self._set_status("cancelled")
+            return
+        self._set_status("running")
+        start_time = time.time()
+        try:
+            self._execute()
+            status = "cancelled" if self.task.cancelled.is_set() else "done"
+        except Exception as e:
+            self.error = str(e)
+            status = "error"
+        self.duration = time.time() - start_time
+        self._set_status(status)
+
+    def cancel(self):
+        self.task.cancel()
+        # Un job encore en file est marqué tout de suite ; un job en cours le sera en fin de run()
+        with self.changed:
+            if self.status == "pending":
+                self.status = "cancelled"
+                self.finished_at = time.time()
+                self.changed.notify_all()
+
+    def wait(self, timeout=None):
+        """Attend la fin du job ; retourne True s'il est terminé"""
+        with self.changed:
+            return self.changed.wait_for(lambda: self.finished, timeout)
+
+    @property
+    def finished(self):
+        return self.status in ("done", "error", "cancelled")
+
+
+class ScanJob(Job):
+    """Scan de ports exécuté en arrière-plan, dont les résultats sont publiés au fil de l'eau"""
+
+    def __init__(self, target, start_port, end_port, client=None, **scanner_options):
+        self.scanner = PortScanner(target, start_port, end_port,
+                                   on_open_port=self._on_open_port, **scanner_options)
+        super().__init__(self.scanner, client)
+        # Ports dans l'ordre de découverte (open_ports du scanner n'est trié qu'à la fin)
+        self.found_ports = []
+
+    def _on_open_port(self, port):
+        with self.changed:
+            self.found_ports.append(port)
+            self.changed.notify_all()
+
+    def _execute(self):
+        self.scanner.run_scan()
+
+    def summary(self):
+        return {
+            "job_id": self.id,
+            "target": self.scanner.target,
+            "protocol": self.scanner.protocol,
+            "status": self.status,
+            "error": self.error,
+            "open_ports": sorted(self.found_ports),
+            "count": len(self.found_ports),
+            "open_filtered": list(self.scanner.open_filtered),
+            "duration": f"{self.duration:.2f}" if self.duration is not None else None,
+            "progress": self.scanner.progress(),
+            "timing": self.scanner.timing.summary(),
+            "metrics": self.scanner.metrics.summary(),
+            "scan_id": self.scanner.scan_id,
+            "incremental": self.scanner.incremental_summary() if self.scanner.incremental else None,
+            "resumed": self.scanner.resumed,
+            "services": dict(self.scanner.services),
+        }
+
+    def events(self, progress_interval=0.5):
+        """Générateur SSE : ports ouverts dès leur découverte, avancement périodique, puis résumé final"""
+        sent = 0
+        last_progress = 0
+        while True:
+            with self.changed:
+                if sent == len(self.found_ports) and not self.finished:
+                    self.changed.wait(progress_interval)
+                new_ports = self.found_ports[sent:]
+                finished = self.finished
+            for port in new_ports:
+                yield sse_event("port", {"port": port})
+            sent += len(new_ports)
+            if finished:
+                yield sse_event("done", self.summary())
+                return
+            if time.monotonic() - last_progress >= progress_interval:
+                last_progress = time.monotonic()
+                yield sse_event("progress", self.scanner.progress())
+
+
+class SweepJob(Job):
+    """Balayage multi-cibles exécuté par le pool ; les résultats passent par les callbacks du SweepScheduler"""
+
+    def __init__(self, targets, ports, client=None, **sweep_options):
+        self.sweep = SweepScheduler(targets, ports, **sweep_options)
+        super().__init__(self.sweep, client)
+
+    def summary(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "error": self.error,
+            "stats": dict(self.sweep.stats),
+            "duration": f"{self.duration:.2f}" if self.duration is not None else None,
+        }
+
+
+class ScanJobManager:
+    """File d'attente bornée et pool fixe de workers exécutant les jobs de scan
+
+    Le plafond global de sockets est réparti entre les workers : chaque job
+    ouvre au plus max_open_sockets // workers connexions simultanées, donc
+    le processus ne dépasse jamais max_open_sockets quel que soit le nombre
+    de requêtes. Les balayages multi-cibles passent par la même file et le
+    même quota par client. Les jobs terminés sont purgés après FINISHED_JOB_TTL.
+    """
+
+    def __init__(self, workers=4, max_open_sockets=512, queue_size=100, per_client_jobs=5,
+                 ttl=FINISHED_JOB_TTL, result_store=None, checkpoint_dir=None):
+        self.sockets_per_job = max(1, max_open_sockets // workers)
+        self.per_client_jobs = per_client_jobs
+        self.ttl = ttl
+        # Historique partagé par tous les jobs (None : pas d'enregistrement)
+        self.result_store = result_store
+        # Points de reprise des scans (None : désactivés) ; un job annulé à l'arrêt pourra être repris
+        self.checkpoint_dir = checkpoint_dir
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.accepting = True
+        self.workers = [threading.Thread(target=self._worker, name=f"scan-worker-{i}", daemon=True)
+                        for i in range(workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def _worker(self):
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                job.run()
+            finally:
+                self.queue.task_done()
+
+    def submit(self, target, start_port, end_port, client=None, **scanner_options):
+        """Met un scan en file ; lève ScanQueueFull ou ClientQuotaExceeded si la demande est refusée"""
+        if not self.accepting:
+            raise ScanQueueFull("Le service de scan est en cours d'arrêt")
+        scanner_options.update(max_threads=self.sockets_per_job, max_inflight=self.sockets_per_job)
+        scanner_options.setdefault("result_store", self.result_store)
+        scanner_options.setdefault("checkpoint_dir", self.checkpoint_dir)
+        return self._enqueue(ScanJob(target, start_port, end_port, client=client, **scanner_options))
+
+    def submit_sweep(self, targets, ports, client=None, **sweep_options):
+        """Met un balayage en file, avec la même part du plafond de sockets qu'un scan"""
+        if not self.accepting:
+            raise ScanQueueFull("Le service de scan est en cours d'arrêt")
+        sweep_options.update(max_inflight=self.sockets_per_job)
+        return self._enqueue(SweepJob(targets, ports, client=client, **sweep_options))
+
+    def _enqueue(self, job):
+        client = job.client
+        with self.lock:
+            self._purge()
+            active = sum(1 for j in self.jobs.values() if j.client == client and not j.finished)
+            if client is not None and active >= self.per_client_jobs:
+                raise ClientQuotaExceeded(f"Quota atteint: {self.per_client_jobs} scans actifs maximum par client")
+            try:
+                self.queue.put_nowait(job)
+            except queue.Full:
+                raise ScanQueueFull("File d'attente des scans pleine, réessayez plus tard") from None
+            self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def stats(self):
+        with self.lock:
+            statuses = [job.status for job in self.jobs.values()]
+        return {
+            "workers": len(self.workers),
+            "queued": self.queue.qsize(),
+            "running": statuses.count("running"),
+            "sockets_per_job": self.sockets_per_job,
+        }
+
+    def shutdown(self, cancel_running=False, timeout=None):
+        """Arrêt propre : refuse les nouveaux jobs, annule ceux en file, laisse finir (ou annule) ceux en cours"""
+        self.accepting = False
+        with self.lock:
+            jobs = list(self.jobs.values())
+        for job in jobs:
+            if job.status == "pending" or (cancel_running and job.status == "running"):
+                job.cancel()
+        for _ in self.workers:
+            # put() bloquant : les workers vident la file (jobs annulés) avant de lire la sentinelle
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join(timeout)
+
+    def _purge(self):
+        now = time.time()
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job.finished and now - job.finished_at > self.ttl]
+        for job_id in expired:
+            del self.jobs[job_id]
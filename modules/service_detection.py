@@ -0,0 +1,132 @@
+import asyncio
+import re
+import ssl
+
+# Taille maximale lue par sonde : une bannière ou un en-tête HTTP suffit
+MAX_BANNER = 2048
+
+# Table de signatures compilée une fois : (service, motif d'identification, motif du produit/version)
+SIGNATURES = [
+    ("ssh", re.compile(rb"^SSH-(?P<version>[\d.]+)-(?P<product>[^\r\n ]+)"), None),
+    ("http", re.compile(rb"^HTTP/(?P<version>[\d.]+) \d{3}"), re.compile(rb"\r\nServer: *(?P<product>[^\r\n]+)", re.I)),
+    ("ftp", re.compile(rb"^220[ -][^\r\n]*(?:FTP|FileZilla|vsFTPd|ProFTPD)", re.I), re.compile(rb"^220[ -]\(?(?P<product>[^\r\n)]+)")),
+    ("smtp", re.compile(rb"^220[ -][^\r\n]*(?:SMTP|Postfix|Exim|Sendmail)", re.I), re.compile(rb"^220[ -](?P<product>[^\r\n]+)")),
+    ("pop3", re.compile(rb"^\+OK"), re.compile(rb"^\+OK (?P<product>[^\r\n]+)")),
+    ("imap", re.compile(rb"^\* OK"), re.compile(rb"^\* OK (?P<product>[^\r\n]+)")),
+    ("mysql", re.compile(rb"^.\x00\x00\x00\x0a(?P<version>[\d.]+[^\x00]*)\x00", re.S), None),
+    ("vnc", re.compile(rb"^RFB (?P<version>\d{3}\.\d{3})"), None),
+    ("telnet", re.compile(rb"^\xff[\xfb-\xfe]"), None),
+    # Handshake ou alerte TLS (une alerte en réponse à du texte clair trahit aussi un service TLS)
+    ("tls", re.compile(rb"^[\x15\x16]\x03[\x00-\x04]"), None),
+    # Bannière 220 générique (FTP et SMTP partagent ce code) : SMTP par défaut
+    ("smtp", re.compile(rb"^220[ -]"), re.compile(rb"^220[ -](?P<product>[^\r\n]+)")),
+]
+
+HTTP_PROBE = b"HEAD / HTTP/1.0\r\nUser-Agent: cybersec-dashboard\r\n\r\n"
+
+# Ports où le client parle en premier : inutile d'attendre une bannière
+HTTP_FIRST_PORTS = {80, 3000, 5000, 8000, 8008, 8080, 8081, 8888}
+TLS_FIRST_PORTS = {443, 465, 636, 853, 993, 995, 8443}
+
+_client_hello = None
+
+
+def client_hello():
+    """ClientHello TLS généré une fois par le module ssl (handshake en mémoire, jamais terminé)"""
+    global _client_hello
+    if _client_hello is None:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        incoming, outgoing = ssl.MemoryBIO(), ssl.MemoryBIO()
+        tls = context.wrap_bio(incoming, outgoing)
+        try:
+            tls.do_handshake()
+        except ssl.SSLWantReadError:
+            pass
+        _client_hello = outgoing.read()
+    return _client_hello
+
+
+def match_signature(data):
+    """Identifie un service d'après sa réponse ; None si aucune signature ne correspond"""
+    if not data:
+        return None
+    for service, pattern, product_pattern in SIGNATURES:
+        found = pattern.search(data)
+        if not found:
+            continue
+        groups = found.groupdict()
+        if product_pattern is not None:
+            product = product_pattern.search(data)
+            if product:
+                groups.update(product.groupdict())
+        return {
+            "service": service,
+            "product": _text(groups.get("product")),
+            "version": _text(groups.get("version")),
+            "banner": _text(data.split(b"\r\n", 1)[0][:200]) if service not in ("tls", "telnet", "mysql") else None,
+        }
+    return None
+
+
+def _text(value):
+    return value.decode("utf-8", "replace").strip() if value else None
+
+
+class ServiceDetector:
+    """Deuxième étage du scan : bannière et sondes protocolaires sur les ports ouverts
+
+    Une connexion attend d'abord une bannière (SSH, FTP, SMTP...), puis envoie
+    un HEAD HTTP sur la même connexion si le serveur reste muet ; en dernier
+    recours, un ClientHello TLS est envoyé sur une nouvelle connexion. Les
+    ports web connus commencent directement par la sonde adaptée.
+    """
+
+    def __init__(self, connect_timeout=1.0, greeting_timeout=0.5, read_timeout=1.0):
+        self.connect_timeout = connect_timeout
+        self.greeting_timeout = greeting_timeout
+        self.read_timeout = read_timeout
+
+    def _plans(self, port):
+        """Séquences de sondes à essayer, chacune sur sa propre connexion : (méthode, données, attente)"""
+        hello = ("tls", client_hello(), self.read_timeout)
+        head = ("http", HTTP_PROBE, self.read_timeout)
+        plans = [[hello]] if port in TLS_FIRST_PORTS else []
+        plans.append([head] if port in HTTP_FIRST_PORTS else [("banner", None, self.greeting_timeout), head])
+        if port not in TLS_FIRST_PORTS:
+            plans.append([hello])
+        return plans
+
+    async def detect(self, address, port):
+        """Service détecté sur un port ouvert (dict), ou None"""
+        for steps in self._plans(port):
+            try:
+                result = await self._exchange(address, port, steps)
+            except (OSError, asyncio.TimeoutError):
+                return None
+            if result:
+                if result["service"] == "tls" and port in (443, 8443):
+                    result["service"] = "https"
+                return result
+        return None
+
+    async def _exchange(self, address, port, steps):
+        """Enchaîne les sondes sur une même connexion tant que le serveur reste muet"""
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(address, port), self.connect_timeout)
+        try:
+            for method, payload, wait in steps:
+                if payload:
+                    writer.write(payload)
+                    await writer.drain()
+                try:
+                    data = await asyncio.wait_for(reader.read(MAX_BANNER), wait)
+                except asyncio.TimeoutError:
+                    continue
+                result = match_signature(data)
+                if result:
+                    result["method"] = method
+                return result
+            return None
+        finally:
+            writer.close()
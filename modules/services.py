@@ -0,0 +1,102 @@
+import os
+from array import array
+from functools import lru_cache
+
+SERVICES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "services.tsv")
+
+MAX_PORT = 65535
+# Rang attribué aux ports absents de la table : après tous les ports connus, dans l'ordre croissant
+UNRANKED = MAX_PORT
+
+
+class ServiceTable:
+    """Table des services classés par fréquence d'ouverture (data/services.tsv)
+
+    Stockage compact par protocole : les ports connus par fréquence
+    décroissante (array 'H') et le rang de chacun des 65 536 ports
+    (array 'H', 128 Ko). Trier une liste de ports par rendement
+    attendu ne coûte qu'une indexation par port.
+    """
+
+    def __init__(self, path=SERVICES_PATH):
+        entries = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                name, port_proto, frequency = line.split("\t")
+                port, protocol = port_proto.split("/")
+                entries.setdefault(protocol, []).append((float(frequency), int(port), name))
+        self.ranked = {}
+        self.ranks = {}
+        self.names = {}
+        for protocol, rows in entries.items():
+            rows.sort(key=lambda row: (-row[0], row[1]))
+            self.ranked[protocol] = array("H", (port for _, port, _ in rows))
+            ranks = array("H", [UNRANKED]) * (MAX_PORT + 1)
+            for rank, (_, port, _) in enumerate(rows):
+                ranks[port] = rank
+            self.ranks[protocol] = ranks
+            self.names[protocol] = {port: name for _, port, name in rows}
+
+    def name(self, port, protocol="tcp"):
+        """Nom usuel du service sur ce port (None s'il n'est pas dans la table)"""
+        return self.names.get(protocol, {}).get(port)
+
+    def top(self, count, protocol="tcp"):
+        """Les count ports les plus souvent ouverts ; au-delà de la table, les autres ports dans l'ordre croissant"""
+        ranked = self.ranked.get(protocol, array("H"))
+        if count <= len(ranked):
+            return list(ranked[:count])
+        known = set(ranked)
+        rest = (port for port in range(1, MAX_PORT + 1) if port not in known)
+        return list(ranked) + [port for _, port in zip(range(count - len(ranked)), rest)]
+
+    def rank(self, port, protocol="tcp"):
+        """Rang du port par fréquence (0 = le plus souvent ouvert, UNRANKED hors table)"""
+        ranks = self.ranks.get(protocol)
+        return ranks[port] if ranks is not None else UNRANKED
+
+    def order(self, ports, protocol="tcp"):
+        """Trie des ports par rendement attendu (ports fréquents d'abord, puis ordre croissant)"""
+        wanted = set(ports)
+        first = [port for port in self.ranked.get(protocol, ()) if port in wanted]
+        known = set(first)
+        # Les ports hors table sont souvent déjà triés (plage) : tri quasi linéaire
+        return first + sorted(port for port in wanted if port not in known)
+
+
+@lru_cache(maxsize=1)
+def get_service_table():
+    """Table des services, chargée au premier usage puis partagée"""
+    return ServiceTable()
+
+
+def parse_port_spec(spec, protocol="tcp"):
+    """Développe une spécification de ports : "22,80,443", "1-1024", "top:1000" ou un mélange
+
+    Accepte aussi une liste d'entiers ou de morceaux de spécification.
+    Retourne les ports sans doublons, dans l'ordre où ils apparaissent.
+    """
+    if isinstance(spec, str):
+        parts = spec.replace(" ", "").split(",")
+    else:
+        parts = [str(part) for part in spec]
+    ports = {}
+    for part in parts:
+        if not part:
+            continue
+        if part.startswith("top:"):
+            count = int(part[4:])
+            if not 1 <= count <= MAX_PORT:
+                raise ValueError(f"top:N attend N entre 1 et {MAX_PORT}: {part}")
+            ports.update(dict.fromkeys(get_service_table().top(count, protocol)))
+            continue
+        low, _, high = part.partition("-")
+        low, high = int(low), int(high or low)
+        if not 1 <= low <= high <= MAX_PORT:
+            raise ValueError(f"Plage de ports invalide: {part}")
+        ports.update(dict.fromkeys(range(low, high + 1)))
+    if not ports:
+        raise ValueError("Aucun port dans la spécification")
+    return list(ports)
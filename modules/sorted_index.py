@@ -0,0 +1,91 @@
+import mmap
+import os
+
+
+class SortedRecordFile:
+    """Fichier binaire d'enregistrements de taille fixe triés par clé, projeté en mémoire
+
+    Chaque enregistrement est une clé de key_size octets suivie de value_size
+    octets. La recherche est une dichotomie directement sur le mmap : O(log n),
+    sans charger le fichier, et les pages sont partagées entre processus.
+    """
+
+    def __init__(self, path, key_size, value_size=0):
+        self.path = path
+        self.key_size = key_size
+        self.record_size = key_size + value_size
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        if size % self.record_size:
+            self.file.close()
+            raise ValueError(f"Index corrompu: {path} ({size} octets, enregistrements de {self.record_size})")
+        self.count = size // self.record_size
+        # mmap refuse les fichiers vides
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self):
+        return self.count
+
+    def key_at(self, index):
+        offset = index * self.record_size
+        return self.data[offset:offset + self.key_size]
+
+    def record_at(self, index):
+        offset = index * self.record_size
+        return self.data[offset:offset + self.key_size], self.data[offset + self.key_size:offset + self.record_size]
+
+    def lower_bound(self, key):
+        """Indice du premier enregistrement dont la clé est >= key"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, key):
+        """Valeur associée à la clé exacte, ou None"""
+        index = self.lower_bound(key)
+        if index < self.count and self.key_at(index) == key:
+            return self.record_at(index)[1]
+        return None
+
+    def scan(self, low, high):
+        """Enregistrements (clé, valeur) dont la clé est comprise dans [low, high)"""
+        index = self.lower_bound(low)
+        while index < self.count:
+            key, value = self.record_at(index)
+            if key >= high:
+                return
+            yield key, value
+            index += 1
+
+    def close(self):
+        if self.count:
+            self.data.close()
+        self.file.close()
+
+
+def write_sorted_records(records, path, key_size, value_size=0):
+    """Écrit des enregistrements (clé, valeur) déjà triés ; vérifie l'ordre et la taille des champs"""
+    previous = None
+    count = 0
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            for key, value in records:
+                if len(key) != key_size or len(value) != value_size:
+                    raise ValueError(f"Enregistrement de taille invalide: {key!r}")
+                if previous is not None and key < previous:
+                    raise ValueError("Les enregistrements doivent être triés par clé")
+                f.write(key)
+                f.write(value)
+                previous = key
+                count += 1
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return count
@@ -0,0 +1,446 @@
+import functools
+import glob
+import math
+import os
+import re
+from datetime import date
+from itertools import islice
+
+from modules.wordlist_index import WORDLIST_DIR
+
+# Estimation du nombre d'essais nécessaires à un attaquant, dans l'esprit de zxcvbn :
+# le mot de passe est découpé en motifs (dictionnaire, l33t, clavier, date,
+# répétition, suite) et on retient le découpage qui minimise le nombre d'essais.
+
+BRUTEFORCE_CARDINALITY = 10
+MIN_GUESSES_BEFORE_GROWING_SEQUENCE = 10000
+MIN_SUBMATCH_GUESSES_SINGLE_CHAR = 10
+MIN_SUBMATCH_GUESSES_MULTI_CHAR = 50
+MIN_YEAR_SPACE = 20
+# Comme zxcvbn : seuls les 100 premiers caractères sont analysés (au-delà, le coût croît sans changer le score)
+MAX_PASSWORD_LENGTH = 100
+# Plafond des produits d'essais, calculés en flottants (un entier exact ne tiendrait plus dans un float)
+MAX_GUESSES = 1e300
+# Exposant au-delà duquel MIN_GUESSES_BEFORE_GROWING_SEQUENCE ** (l - 1) dépasse MAX_GUESSES
+MAX_SEQUENCE_EXPONENT = int(math.log(MAX_GUESSES, MIN_GUESSES_BEFORE_GROWING_SEQUENCE))
+REFERENCE_YEAR = date.today().year
+# Mots retenus par fichier de wordlists/ (les plus fréquents en tête, comme le top 30k de zxcvbn)
+DICTIONARY_WORDS_PER_FILE = 30000
+
+# Mots de passe et mots fréquents, classés du plus au moins courant
+RANKED_PASSWORDS = [
+    "123456", "password", "12345678", "qwerty", "123456789", "12345", "1234", "111111",
+    "1234567", "dragon", "123123", "baseball", "abc123", "football", "monkey", "letmein",
+    "696969", "shadow", "master", "666666", "qwertyuiop", "123321", "mustang", "1234567890",
+    "michael", "654321", "superman", "1qaz2wsx", "7777777", "121212", "000000", "qazwsx",
+    "123qwe", "killer", "trustno1", "jordan", "jennifer", "zxcvbnm", "asdfgh", "hunter",
+    "buster", "soccer", "harley", "batman", "andrew", "tigger", "sunshine", "iloveyou",
+    "charlie", "robert", "thomas", "hockey", "ranger", "daniel", "starwars", "klaster",
+    "112233", "george", "computer", "michelle", "jessica", "pepper", "zxcvbn", "555555",
+    "131313", "freedom", "777777", "pass", "maggie", "159753", "aaaaaa", "ginger",
+    "princess", "joshua", "cheese", "amanda", "summer", "love", "ashley", "nicole",
+    "chelsea", "biteme", "matthew", "access", "yankees", "987654321", "dallas", "austin",
+    "thunder", "taylor", "matrix", "welcome", "hello", "password1", "admin", "secret",
+    "azerty", "azertyuiop", "soleil", "bonjour", "motdepasse", "doudou", "loulou", "chouchou",
+    "marseille", "nicolas", "julien", "camille", "chocolat", "coucou", "jetaime", "amour",
+    "titeuf", "toto", "test", "root", "toor", "changeme", "default", "guest", "user",
+]
+COMMON_WORDS = [
+    "the", "love", "you", "my", "baby", "angel", "girl", "boy", "life", "star", "king",
+    "queen", "money", "happy", "black", "white", "blue", "red", "green", "summer", "winter",
+    "spring", "house", "dog", "cat", "lion", "tiger", "eagle", "dragon", "magic", "power",
+    "secret", "admin", "pass", "word", "welcome", "hello", "world", "super", "monkey",
+    "chat", "chien", "maison", "soleil", "lune", "amour", "bonjour", "merci", "france",
+    "paris", "lyon", "marseille", "football", "coeur", "bebe", "papa", "maman", "mot", "passe",
+]
+
+L33T_TABLE = {
+    "4": "a", "@": "a", "8": "b", "(": "c", "{": "c", "3": "e", "6": "g", "1": "il",
+    "!": "i", "|": "il", "0": "o", "$": "s", "5": "s", "+": "t", "7": "t", "%": "x", "2": "z",
+}
+
+# Claviers décalés : chaque rangée est alignée de sorte que la touche (r, c) touche
+# (r-1, c), (r-1, c+1), (r+1, c-1), (r+1, c). Caractères sans et avec Maj.
+SLANTED_KEYBOARDS = {
+    "qwerty": (
+        ["`1234567890-=", " qwertyuiop[]\\", " asdfghjkl;'", " zxcvbnm,./"],
+        ["~!@#$%^&*()_+", " QWERTYUIOP{}|", ' ASDFGHJKL:"', " ZXCVBNM<>?"],
+    ),
+    "azerty": (
+        ["²&é\"'(-è_çà)=", " azertyuiop^$", " qsdfghjklmù*", "<wxcvbn,;:!"],
+        [" 1234567890°+", " AZERTYUIOP¨£", " QSDFGHJKLM%µ", ">WXCVBN?./§"],
+    ),
+}
+# Pavé numérique : grille alignée, les 8 voisins comptent
+KEYPAD = ["/*-", "789+", "456+", "123", "0.."]
+
+DATE_SEPARATED = re.compile(r"(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4})")
+DIGITS_RUN = re.compile(r"\d{4,8}")
+REPEAT = re.compile(r"(.+?)\1+")
+
+# Seuils (nombre d'essais) des scores 0 à 4 de zxcvbn
+SCORE_THRESHOLDS = [1e3, 1e6, 1e8, 1e10]
+
+
+class Match:
+    __slots__ = ("pattern", "i", "j", "token", "guesses", "extra")
+
+    def __init__(self, pattern, i, j, token, guesses, **extra):
+        self.pattern = pattern
+        self.i = i
+        self.j = j
+        self.token = token
+        self.guesses = guesses
+        self.extra = extra
+
+
+def _n_choose_k(n, k):
+    return math.comb(n, k) if 0 <= k <= n else 0
+
+
+def _build_trie(ranked):
+    trie = {}
+    for word, rank in ranked.items():
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node["$"] = rank
+    return trie
+
+
+def _slanted_graph(rows, shifted_rows):
+    positions = {}
+    for grid, shifted in ((rows, False), (shifted_rows, True)):
+        for r, row in enumerate(grid):
+            for c, char in enumerate(row):
+                if char != " ":
+                    positions.setdefault(char, (r, c, shifted))
+    neighbours = {}
+    for char, (r, c, _) in positions.items():
+        adjacent = [(r, c - 1), (r, c + 1), (r - 1, c), (r - 1, c + 1), (r + 1, c - 1), (r + 1, c)]
+        keys = set()
+        for rr, cc in adjacent:
+            for grid in (rows, shifted_rows):
+                if 0 <= rr < len(grid) and 0 <= cc < len(grid[rr]) and grid[rr][cc] != " ":
+                    keys.add(grid[rr][cc])
+        neighbours[char] = keys
+    return positions, neighbours
+
+
+def _aligned_graph(rows):
+    positions = {}
+    neighbours = {}
+    for r, row in enumerate(rows):
+        for c, char in enumerate(row):
+            positions.setdefault(char, (r, c, False))
+    for char, (r, c, _) in positions.items():
+        keys = set()
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                rr, cc = r + dr, c + dc
+                if (dr or dc) and 0 <= rr < len(rows) and 0 <= cc < len(rows[rr]):
+                    if rows[rr][cc] != char:
+                        keys.add(rows[rr][cc])
+        neighbours[char] = keys
+    return positions, neighbours
+
+
+class StrengthEstimator:
+    """Estimateur de robustesse par motifs et nombre minimal d'essais (style zxcvbn)
+
+    Toutes les tables (trie des dictionnaires, graphes d'adjacence des
+    claviers) sont construites une seule fois à l'instanciation ; une
+    estimation ne fait ensuite que des parcours de dictionnaires Python.
+    """
+
+    def __init__(self, wordlist_dir=WORDLIST_DIR, extra_words=()):
+        ranked = {}
+        for word in list(extra_words) + RANKED_PASSWORDS:
+            ranked.setdefault(word.lower(), len(ranked) + 1)
+        for path in sorted(glob.glob(os.path.join(wordlist_dir, "*.txt"))):
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                for line in islice(f, DICTIONARY_WORDS_PER_FILE):
+                    word = line.strip().lower()
+                    if len(word) >= 3:
+                        ranked.setdefault(word, len(ranked) + 1)
+        for word in COMMON_WORDS:
+            ranked.setdefault(word, len(ranked) + 1)
+        self.trie = _build_trie(ranked)
+
+        self.graphs = {name: _slanted_graph(*rows) for name, rows in SLANTED_KEYBOARDS.items()}
+        self.graphs["keypad"] = _aligned_graph(KEYPAD)
+        # Nombre de touches et degré moyen, utilisés pour compter les motifs clavier possibles
+        self.graph_stats = {
+            name: (len(neighbours), sum(len(keys) for keys in neighbours.values()) / len(neighbours))
+            for name, (_, neighbours) in self.graphs.items()
+        }
+        self.l33t_chars = frozenset(L33T_TABLE)
+
+    # --- Matchers ---------------------------------------------------------
+
+    def _dictionary_matches(self, password, lowered=None):
+        lowered = lowered if lowered is not None else password.lower()
+        trie = self.trie
+        matches = []
+        n = len(lowered)
+        for i in range(n):
+            node = trie
+            for j in range(i, n):
+                node = node.get(lowered[j])
+                if node is None:
+                    break
+                rank = node.get("$")
+                if rank is not None:
+                    token = password[i:j + 1]
+                    guesses = rank * self._uppercase_variations(token)
+                    matches.append(Match("dictionary", i, j, token, guesses, rank=rank))
+        return matches
+
+    def _l33t_matches(self, password):
+        subs = [(i, L33T_TABLE[c]) for i, c in enumerate(password) if c in self.l33t_chars]
+        if not subs:
+            return []
+        # Variantes dé-l33tées : un choix par caractère ambigu (1 -> i ou l), 16 variantes au plus
+        variants = [list(password.lower())]
+        for i, options in subs:
+            expanded = []
+            for variant in variants:
+                for option in options:
+                    candidate = variant[:]
+                    candidate[i] = option
+                    expanded.append(candidate)
+            variants = expanded[:16]
+        sub_positions = {i for i, _ in subs}
+        matches = []
+        seen = set()
+        for variant in variants:
+            for match in self._dictionary_matches(password, "".join(variant)):
+                substituted = sum(1 for k in range(match.i, match.j + 1) if k in sub_positions)
+                if not substituted or (match.i, match.j) in seen:
+                    continue
+                seen.add((match.i, match.j))
+                unsubstituted = match.j - match.i + 1 - substituted
+                variations = sum(_n_choose_k(substituted + unsubstituted, k) for k in range(1, substituted + 1))
+                match.pattern = "l33t"
+                match.guesses *= max(2, variations)
+                matches.append(match)
+        return matches
+
+    def _spatial_matches(self, password):
+        matches = []
+        for name, (positions, neighbours) in self.graphs.items():
+            starting, degree = self.graph_stats[name]
+            i = 0
+            n = len(password)
+            while i < n - 2:
+                j = i
+                turns = 0
+                shifted = 1 if positions.get(password[i], (0, 0, False))[2] else 0
+                last_direction = None
+                while j + 1 < n and password[j + 1] in neighbours.get(password[j], ()):
+                    a, b = positions[password[j]], positions[password[j + 1]]
+                    direction = (b[0] - a[0], b[1] - a[1])
+                    if direction != last_direction:
+                        turns += 1
+                        last_direction = direction
+                    if b[2]:
+                        shifted += 1
+                    j += 1
+                if j - i >= 2:
+                    length = j - i + 1
+                    guesses = 0
+                    for k in range(2, length + 1):
+                        for t in range(1, min(turns, k - 1) + 1):
+                            guesses += _n_choose_k(k - 1, t - 1) * starting * degree ** t
+                    if shifted:
+                        unshifted = length - shifted
+                        guesses *= 2 if unshifted == 0 else sum(
+                            _n_choose_k(length, k) for k in range(1, min(shifted, unshifted) + 1))
+                    matches.append(Match("spatial", i, j, password[i:j + 1], guesses, graph=name, turns=turns))
+                    i = j
+                else:
+                    i += 1
+        return matches
+
+    def _sequence_matches(self, password):
+        matches = []
+        n = len(password)
+        i = 0
+        while i < n - 2:
+            delta = ord(password[i + 1]) - ord(password[i])
+            j = i + 1
+            if 0 < abs(delta) <= 5:
+                while j + 1 < n and ord(password[j + 1]) - ord(password[j]) == delta:
+                    j += 1
+            if j - i >= 2:
+                token = password[i:j + 1]
+                first = token[0]
+                if first in "aAzZ019":
+                    base = 4
+                elif first.isdigit():
+                    base = 10
+                else:
+                    base = 26
+                guesses = base * len(token) * (1 if delta > 0 else 2)
+                matches.append(Match("sequence", i, j, token, guesses))
+                i = j
+            else:
+                i += 1
+        return matches
+
+    def _repeat_matches(self, password):
+        matches = []
+        for found in REPEAT.finditer(password):
+            unit = found.group(1)
+            count = len(found.group(0)) // len(unit)
+            base = self.estimate(unit)["guesses"] if len(unit) > 1 else MIN_SUBMATCH_GUESSES_SINGLE_CHAR
+            matches.append(Match("repeat", found.start(), found.end() - 1, found.group(0), base * count))
+        return matches
+
+    def _date_matches(self, password):
+        matches = []
+        for found in DATE_SEPARATED.finditer(password):
+            parts = [int(found.group(1)), int(found.group(3)), int(found.group(4))]
+            year = self._date_year(parts)
+            if year is not None:
+                guesses = max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE) * 365 * 4
+                matches.append(Match("date", found.start(), found.end() - 1, found.group(0), guesses))
+        for found in DIGITS_RUN.finditer(password):
+            # Toutes les sous-chaînes de 4 à 8 chiffres : année seule ou date compacte
+            digits = found.group(0)
+            for i in range(len(digits)):
+                for j in range(i + 4, min(len(digits), i + 8) + 1):
+                    token = digits[i:j]
+                    guesses = None
+                    if len(token) == 4 and token[:2] in ("19", "20"):
+                        guesses = max(abs(int(token) - REFERENCE_YEAR), MIN_YEAR_SPACE)
+                    elif len(token) in (6, 8):
+                        half = 2 if len(token) == 6 else 4
+                        splits = ([token[:2], token[2:4], token[4:]], [token[:half], token[half:half + 2], token[half + 2:]])
+                        for split in splits:
+                            year = self._date_year([int(p) for p in split])
+                            if year is not None:
+                                guesses = max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE) * 365
+                                break
+                    if guesses is not None:
+                        start = found.start() + i
+                        matches.append(Match("date", start, start + len(token) - 1, token, guesses))
+        return matches
+
+    @staticmethod
+    def _date_year(parts):
+        """Année si les trois nombres forment une date plausible (jj/mm/aaaa, aaaa/mm/jj ou jj/mm/aa)"""
+        for day, month, year in ((parts[0], parts[1], parts[2]), (parts[2], parts[1], parts[0]),
+                                 (parts[1], parts[0], parts[2])):
+            if 1 <= day <= 31 and 1 <= month <= 12:
+                if year < 100:
+                    year += 1900 if year > 50 else 2000
+                if 1900 <= year <= 2050:
+                    return year
+        return None
+
+    @staticmethod
+    def _uppercase_variations(token):
+        if token.islower() or not any(c.isalpha() for c in token):
+            return 1
+        if token.isupper() or (token[0].isupper() and token[1:].islower()) or \
+                (token[-1].isupper() and token[:-1].islower()):
+            return 2
+        upper = sum(1 for c in token if c.isupper())
+        lower = sum(1 for c in token if c.islower())
+        return sum(_n_choose_k(upper + lower, k) for k in range(1, min(upper, lower) + 1))
+
+    # --- Recherche du découpage minimal -----------------------------------
+
+    def estimate(self, password):
+        """Nombre minimal d'essais estimé, score 0-4 et séquence de motifs retenue"""
+        password = password[:MAX_PASSWORD_LENGTH]
+        n = len(password)
+        if not n:
+            return {"guesses": 1, "guesses_log10": 0.0, "score": 0, "sequence": []}
+        matches = (self._dictionary_matches(password) + self._l33t_matches(password) +
+                   self._spatial_matches(password) + self._sequence_matches(password) +
+                   self._date_matches(password))
+        if REPEAT.search(password):
+            matches += self._repeat_matches(password)
+
+        by_end = [[] for _ in range(n)]
+        for match in matches:
+            min_guesses = 1 if len(match.token) == n else (
+                MIN_SUBMATCH_GUESSES_SINGLE_CHAR if len(match.token) == 1 else MIN_SUBMATCH_GUESSES_MULTI_CHAR)
+            match.guesses = max(match.guesses, min_guesses)
+            by_end[match.j].append(match)
+
+        # optimal_*[k][l] : meilleur découpage de password[:k+1] en l motifs
+        optimal_m = [{} for _ in range(n)]
+        optimal_pi = [{} for _ in range(n)]
+        optimal_g = [{} for _ in range(n)]
+
+        def update(match, length):
+            k = match.j
+            pi = float(match.guesses)
+            if length > 1:
+                pi = min(pi * optimal_pi[match.i - 1][length - 1], MAX_GUESSES)
+            growth = float(MIN_GUESSES_BEFORE_GROWING_SEQUENCE) ** min(length - 1, MAX_SEQUENCE_EXPONENT)
+            g = min(math.factorial(length) * pi + growth, MAX_GUESSES)
+            for other_length, other_g in optimal_g[k].items():
+                if other_length <= length and other_g <= g:
+                    return
+            optimal_g[k][length] = g
+            optimal_m[k][length] = match
+            optimal_pi[k][length] = pi
+
+        def bruteforce(i, j):
+            length = j - i + 1
+            guesses = min(float(BRUTEFORCE_CARDINALITY) ** length, MAX_GUESSES)
+            if length < n:
+                guesses = max(guesses, MIN_SUBMATCH_GUESSES_SINGLE_CHAR if length == 1 else MIN_SUBMATCH_GUESSES_MULTI_CHAR)
+            return Match("bruteforce", i, j, password[i:j + 1], guesses)
+
+        for k in range(n):
+            for match in by_end[k]:
+                if match.i > 0:
+                    for length in list(optimal_m[match.i - 1]):
+                        update(match, length + 1)
+                else:
+                    update(match, 1)
+            update(bruteforce(0, k), 1)
+            for i in range(1, k + 1):
+                segment = bruteforce(i, k)
+                for length, last in list(optimal_m[i - 1].items()):
+                    # Deux segments bruteforce consécutifs n'en font qu'un
+                    if last.pattern != "bruteforce":
+                        update(segment, length + 1)
+
+        best_length = min(optimal_g[n - 1], key=optimal_g[n - 1].get)
+        guesses = optimal_g[n - 1][best_length]
+        sequence = []
+        k, length = n - 1, best_length
+        while k >= 0:
+            match = optimal_m[k][length]
+            sequence.append(match)
+            k, length = match.i - 1, length - 1
+        sequence.reverse()
+
+        score = sum(1 for threshold in SCORE_THRESHOLDS if guesses >= threshold + 5)
+        return {
+            "guesses": guesses,
+            "guesses_log10": math.log10(guesses),
+            "score": score,
+            "sequence": [{"pattern": m.pattern, "token": m.token, "guesses": m.guesses} for m in sequence],
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def get_estimator(wordlist_dir=WORDLIST_DIR):
+    """Estimateur partagé par processus : les tables ne sont construites qu'une fois"""
+    return StrengthEstimator(wordlist_dir)
+
+
+def score_from_guesses(guesses_log10):
+    """Projette log10(essais) sur l'échelle 0-100 du dashboard, avec les mêmes paliers que les évaluations"""
+    bands = [(0, 0), (3, 20), (6, 40), (8, 60), (10, 80), (14, 100)]
+    for (low, low_score), (high, high_score) in zip(bands, bands[1:]):
+        if guesses_log10 < high:
+            return round(low_score + (guesses_log10 - low) * (high_score - low_score) / (high - low))
+    return 100
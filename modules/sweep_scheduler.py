@@ -0,0 +1,192 @@
+import asyncio
+import ipaddress
+import threading
+from collections import deque
+from itertools import islice
+
+from modules.port_scanner import PORT_STATE, fd_budget, probe_connect
+from modules.port_states import PortStates
+from modules.resolver import RESOLVER
+from modules.timing import AdaptiveTiming
+
+
+def expand_targets(specs):
+    """Développe paresseusement des plages CIDR, IP et noms d'hôtes (liste ou chaîne séparée par des virgules)"""
+    if isinstance(specs, str):
+        specs = specs.replace(",", " ").split()
+    for spec in specs:
+        spec = spec.strip()
+        if not spec:
+            continue
+        if "/" in spec:
+            # hosts() est un générateur : un /8 ne coûte rien en mémoire
+            yield from (str(ip) for ip in ipaddress.ip_network(spec, strict=False).hosts())
+        else:
+            yield spec
+
+
+class _HostState:
+    __slots__ = ("host", "family", "address", "ports", "timing", "inflight", "states", "exhausted")
+
+    def __init__(self, host, family, address, ports, timing):
+        self.host = host
+        self.family = family
+        self.address = address
+        self.ports = iter(ports)
+        self.timing = timing
+        self.inflight = 0
+        # Tableaux triés tant qu'ils sont petits : un hôte entièrement fermé sur 65 536 ports tient en 8 Ko
+        self.states = PortStates()
+        self.exhausted = False
+
+
+class SweepScheduler:
+    """Balayage multi-cibles : entrelace les sondes (hôte, port) entre les cibles actives
+
+    Seule une fenêtre d'hôtes est active à la fois, la mémoire reste donc bornée
+    quel que soit le nombre de cibles. Les résultats sont diffusés par hôte via
+    les callbacks on_open(host, port) et on_host_complete(host, open_ports) ;
+    on_host_states(host, states) reçoit l'état complet (PortStates) de l'hôte.
+    cancel() arrête le balayage depuis un autre thread.
+    """
+
+    def __init__(self, targets, ports=range(1, 1001), max_inflight=2000, per_host_limit=32,
+                 timing="normal", max_retries=None, on_open=None, on_host_complete=None, on_host_states=None,
+                 resolver=RESOLVER):
+        self.targets = targets
+        self.ports = ports
+        self.max_inflight = max_inflight
+        self.timing = timing
+        self.max_retries = max_retries
+        # Valide le modèle dès la construction et applique son plafond de parallélisme
+        self.per_host_limit = AdaptiveTiming(timing, max_retries).limit_parallelism(per_host_limit)
+        self.on_open = on_open
+        self.on_host_complete = on_host_complete
+        self.on_host_states = on_host_states
+        # Noms résolus par lots, en parallèle, avant d'entrer dans la fenêtre d'hôtes actifs
+        self.resolver = resolver
+        self.stats = {"hosts_scanned": 0, "hosts_unresolved": 0, "probes": 0, "retries": 0, "open_ports": 0}
+        self._running = 0
+        self.cancelled = threading.Event()
+
+    async def _resolve_batch(self, hosts, size):
+        """Prochain lot d'hôtes résolus : [(hôte, (famille, adresse) ou None)]"""
+        batch = list(islice(hosts, size))
+        names = [host for host in batch if self.resolver.literal(host) is None]
+        resolved = await self.resolver.resolve_many(names) if names else {}
+        return [(host, self.resolver.literal(host) or resolved[host]) for host in batch]
+
+    def cancel(self):
+        """Interrompt le balayage : les sondes en cours se terminent, aucune nouvelle n'est lancée
+
+        Les hôtes inachevés ne sont pas signalés (leur état serait partiel).
+        """
+        self.cancelled.set()
+
+    async def _probe(self, state, port, slots, wakeup):
+        try:
+            outcome = await probe_connect(state.address, port, state.timing, family=state.family)
+            if outcome in PORT_STATE:
+                state.states.record(port, PORT_STATE[outcome])
+            if outcome == "open":
+                self.stats["open_ports"] += 1
+                if self.on_open:
+                    self.on_open(state.host, port)
+        finally:
+            state.inflight -= 1
+            self._running -= 1
+            slots.release()
+            if state.exhausted and state.inflight == 0:
+                self._complete(state)
+            wakeup.set()
+
+    def _complete(self, state):
+        self.stats["hosts_scanned"] += 1
+        self.stats["retries"] += state.timing.retries
+        if self.on_host_complete:
+            self.on_host_complete(state.host, list(state.states.open))
+        if self.on_host_states:
+            self.on_host_states(state.host, state.states)
+
+    async def _run(self):
+        window = fd_budget(self.max_inflight)
+        slots = asyncio.Semaphore(window)
+        wakeup = asyncio.Event()
+        # Assez d'hôtes actifs pour remplir la fenêtre globale sans dépasser la limite par hôte
+        host_window = max(1, -(-window // self.per_host_limit))
+        hosts = expand_targets(self.targets)
+        pending = deque()
+        active = deque()
+        # Références fortes vers les tâches en cours (sinon le GC peut les collecter)
+        tasks = set()
+
+        while True:
+            # Effacé avant le tour : une sonde terminée pendant le tour relance la boucle
+            wakeup.clear()
+            if self.cancelled.is_set():
+                if self._running == 0:
+                    self.stats["cancelled"] = True
+                    break
+                await wakeup.wait()
+                continue
+            while len(active) < host_window:
+                if not pending:
+                    # Un lot de la taille de la fenêtre : les résolutions ne s'enchaînent pas une à une
+                    pending.extend(await self._resolve_batch(hosts, host_window))
+                    if not pending:
+                        break
+                host, resolved = pending.popleft()
+                if resolved is None:
+                    self.stats["hosts_unresolved"] += 1
+                    print(f"⚠️  Résolution impossible: {host}")
+                    continue
+                # Délai adaptatif propre à chaque hôte : un hôte lent ne pénalise pas les autres
+                timing = AdaptiveTiming(self.timing, self.max_retries)
+                active.append(_HostState(host, *resolved, self.ports, timing))
+
+            if not active and self._running == 0:
+                break
+
+            # Un tour de rotation : au plus une sonde par hôte, pour ne marteler aucune cible
+            launched = False
+            for _ in range(len(active)):
+                state = active.popleft()
+                if state.inflight >= self.per_host_limit:
+                    active.append(state)
+                    continue
+                port = next(state.ports, None)
+                if port is None:
+                    state.exhausted = True
+                    if state.inflight == 0:
+                        self._complete(state)
+                    continue
+                active.append(state)
+                await slots.acquire()
+                if self.cancelled.is_set():
+                    slots.release()
+                    break
+                state.inflight += 1
+                self._running += 1
+                self.stats["probes"] += 1
+                task = asyncio.ensure_future(self._probe(state, port, slots, wakeup))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                launched = True
+
+            if not launched and self._running:
+                await wakeup.wait()
+
+        return self.stats
+
+    def run(self):
+        """Lance le balayage et retourne les statistiques globales"""
+        return asyncio.run(self._run())
+
+
+# Test
+if __name__ == "__main__":
+    scheduler = SweepScheduler(
+        "127.0.0.0/30, localhost", range(1, 101),
+        on_host_complete=lambda host, ports: print(f"🖥️  {host}: {ports}")
+    )
+    print(f"📊 {scheduler.run()}")
@@ -0,0 +1,196 @@
+import random
+import select
+import socket
+import struct
+import sys
+import threading
+import time
+
+from modules.rate_limit import TokenBucket
+
+# En-tête TCP de 24 octets : 20 octets fixes + option MSS (comme un SYN de noyau)
+TCP_SYN = struct.Struct("!HHIIBBHHH4s")
+TCP_REPLY = struct.Struct("!HHIIBB")
+MSS_OPTION = b"\x02\x04\x05\xb4"
+PSEUDO_HEADER = struct.Struct("!4s4sBBH")
+
+SYN = 0x02
+RST = 0x04
+ACK = 0x10
+
+# États par port
+UNKNOWN, OPEN, CLOSED = 0, 1, 2
+
+_available = None
+
+
+def syn_scan_available():
+    """Vrai si un socket brut peut être ouvert (Linux, root ou CAP_NET_RAW)"""
+    global _available
+    if _available is None:
+        if not sys.platform.startswith("linux"):
+            _available = False
+        else:
+            try:
+                socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP).close()
+                _available = True
+            except OSError:
+                _available = False
+    return _available
+
+
+class SynScanner:
+    """Scan SYN (semi-ouvert) : un socket brut envoie les SYN, un thread lit les réponses
+
+    SYN-ACK = ouvert, RST = fermé, silence après les retransmissions = filtré.
+    Le noyau, qui ne connaît pas la connexion, répond lui-même RST aux SYN-ACK :
+    la poignée de main n'est jamais terminée. Le numéro de séquence encode le
+    port visé (cookie), ce qui permet d'écarter les paquets sans rapport.
+    """
+
+    def __init__(self, address, ports, timing, rate=10000, on_open=None, on_answer=None, cancelled=None):
+        self.address = address
+        self.ports = list(ports)
+        self.timing = timing
+        self.bucket = TokenBucket(rate)
+        self.on_open = on_open
+        self.on_answer = on_answer
+        self.cancelled = cancelled or threading.Event()
+        self.state = bytearray(65536)
+        self.sent_at = [0.0] * 65536
+        self.answered = 0
+        self.packets_sent = 0
+        self.changed = threading.Condition()
+        self.secret = random.getrandbits(32)
+
+    def _cookie(self, port):
+        return (self.secret ^ (port * 2654435761)) & 0xFFFFFFFF
+
+    def _source(self):
+        # Adresse source choisie par la table de routage ; port réservé par un bind pour éviter toute collision
+        probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            probe.connect((self.address, 9))
+            source_ip = probe.getsockname()[0]
+        finally:
+            probe.close()
+        reservation = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        reservation.bind((source_ip, 0))
+        return source_ip, reservation
+
+    def _prepare(self):
+        # Somme partielle des champs constants (pseudo-en-tête, port source, options) : seuls port
+        # destination et numéro de séquence sont ajoutés par paquet (checksum incrémental)
+        constant = PSEUDO_HEADER.pack(self.source_bytes, self.target_bytes, 0, socket.IPPROTO_TCP, TCP_SYN.size) + \
+            TCP_SYN.pack(self.source_port, 0, 0, 0, 6 << 4, SYN, 1024, 0, 0, MSS_OPTION)
+        self.base_sum = sum(struct.unpack(f"!{len(constant) // 2}H", constant))
+
+    def _packet(self, port):
+        seq = self._cookie(port)
+        total = self.base_sum + port + (seq >> 16) + (seq & 0xFFFF)
+        while total >> 16:
+            total = (total & 0xFFFF) + (total >> 16)
+        return TCP_SYN.pack(self.source_port, port, seq, 0, 6 << 4, SYN, 1024, ~total & 0xFFFF, 0, MSS_OPTION)
+
+    def _receive(self, sock, stop):
+        target = self.target_bytes
+        while not stop.is_set():
+            ready, _, _ = select.select([sock], [], [], 0.05)
+            if not ready:
+                continue
+            while True:
+                try:
+                    packet = sock.recv(128)
+                except BlockingIOError:
+                    break
+                if len(packet) < 20 or packet[12:16] != target:
+                    continue
+                offset = (packet[0] & 0x0F) * 4
+                if len(packet) < offset + 14:
+                    continue
+                sport, dport, _, ack, _, flags = TCP_REPLY.unpack_from(packet, offset)
+                if dport != self.source_port or not flags & ACK or ack != (self._cookie(sport) + 1) & 0xFFFFFFFF:
+                    continue
+                if self.state[sport] != UNKNOWN:
+                    continue
+                if flags & SYN:
+                    self.state[sport] = OPEN
+                elif flags & RST:
+                    self.state[sport] = CLOSED
+                else:
+                    continue
+                self.timing.record_rtt(time.perf_counter() - self.sent_at[sport])
+                with self.changed:
+                    self.answered += 1
+                    self.changed.notify_all()
+                if self.state[sport] == OPEN and self.on_open:
+                    self.on_open(sport)
+                if self.on_answer:
+                    self.on_answer(sport)
+
+    def run(self):
+        """Exécute le scan ; retourne les ports ouverts et filtrés"""
+        source_ip, reservation = self._source()
+        self.source_port = reservation.getsockname()[1]
+        self.source_bytes = socket.inet_aton(source_ip)
+        self.target_bytes = socket.inet_aton(self.address)
+        self._prepare()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+        sock.setblocking(False)
+        stop = threading.Event()
+        receiver = threading.Thread(target=self._receive, args=(sock, stop), name="syn-receiver", daemon=True)
+        receiver.start()
+        pending = self.ports
+        try:
+            for attempt in range(self.timing.max_retries + 1):
+                if attempt:
+                    self.timing.record_retry()
+                for port in pending:
+                    if self.cancelled.is_set():
+                        return self._result([])
+                    self.bucket.acquire()
+                    self.sent_at[port] = time.perf_counter()
+                    self._send(sock, self._packet(port))
+                self._wait_answers(len(self.ports))
+                if self.cancelled.is_set():
+                    # Délai de retransmission interrompu : aucun port muet n'est encore filtré
+                    return self._result([])
+                pending = [port for port in pending if self.state[port] == UNKNOWN]
+                if not pending:
+                    break
+        finally:
+            stop.set()
+            receiver.join()
+            sock.close()
+            reservation.close()
+        return self._result(pending)
+
+    def _send(self, sock, packet):
+        while True:
+            try:
+                sock.sendto(packet, (self.address, 0))
+                self.packets_sent += 1
+                return
+            except BlockingIOError:
+                # Tampon d'émission plein : on laisse le noyau vider la file
+                select.select([], [sock], [], 0.01)
+
+    def _wait_answers(self, expected):
+        # Après le dernier envoi, on laisse un délai de retransmission aux réponses en retard
+        deadline = time.monotonic() + self.timing.timeout()
+        with self.changed:
+            while self.answered < expected and not self.cancelled.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.changed.wait(remaining)
+
+    def _result(self, timed_out):
+        # filtered : ports restés muets après toutes les retransmissions ; sur annulation, les ports
+        # jamais envoyés ou encore en attente ne sont ni filtrés ni sondés
+        return {
+            "open": [port for port in self.ports if self.state[port] == OPEN],
+            "filtered": [port for port in timed_out if self.state[port] == UNKNOWN],
+            "packets_sent": self.packets_sent,
+        }
@@ -0,0 +1,83 @@
+import threading
+
+# Modèles de temporisation inspirés de nmap (-T0 à -T5), durées en secondes.
+# parallelism plafonne le nombre de connexions simultanées (None = réglage du scanner).
+TIMING_TEMPLATES = {
+    "paranoid":   {"initial_timeout": 5.0,  "min_timeout": 0.1,  "max_timeout": 10.0, "max_retries": 3, "parallelism": 1},
+    "sneaky":     {"initial_timeout": 3.0,  "min_timeout": 0.1,  "max_timeout": 10.0, "max_retries": 3, "parallelism": 5},
+    "polite":     {"initial_timeout": 1.0,  "min_timeout": 0.1,  "max_timeout": 10.0, "max_retries": 2, "parallelism": 10},
+    "normal":     {"initial_timeout": 1.0,  "min_timeout": 0.1,  "max_timeout": 10.0, "max_retries": 1, "parallelism": None},
+    "aggressive": {"initial_timeout": 0.5,  "min_timeout": 0.1,  "max_timeout": 1.25, "max_retries": 1, "parallelism": None},
+    "insane":     {"initial_timeout": 0.25, "min_timeout": 0.05, "max_timeout": 0.3,  "max_retries": 0, "parallelism": None},
+}
+
+
+def get_template(name):
+    """Retourne le modèle de temporisation demandé"""
+    try:
+        return TIMING_TEMPLATES[name]
+    except KeyError:
+        raise ValueError(f"Modèle de temporisation inconnu: {name} "
+                         f"(disponibles: {', '.join(TIMING_TEMPLATES)})") from None
+
+
+class AdaptiveTiming:
+    """Délai d'attente adaptatif par hôte : SRTT + k·RTTVAR, comme la retransmission TCP (RFC 6298)
+
+    Chaque réponse (SYN-ACK ou RST) fournit un échantillon de RTT ; seules les
+    expirations, ambiguës (port filtré ou paquet perdu), sont retentées.
+    """
+
+    def __init__(self, template="normal", max_retries=None, k=4):
+        settings = get_template(template)
+        self.template = template
+        self.initial_timeout = settings["initial_timeout"]
+        self.min_timeout = settings["min_timeout"]
+        self.max_timeout = settings["max_timeout"]
+        self.max_retries = settings["max_retries"] if max_retries is None else max_retries
+        self.parallelism = settings["parallelism"]
+        self.k = k
+        self.srtt = None
+        self.rttvar = None
+        self.samples = 0
+        self.retries = 0
+        self.lock = threading.Lock()
+
+    def timeout(self):
+        """Délai d'attente courant, borné par le modèle"""
+        if self.srtt is None:
+            return self.initial_timeout
+        rto = self.srtt + self.k * self.rttvar
+        return min(self.max_timeout, max(self.min_timeout, rto))
+
+    def record_rtt(self, rtt):
+        """Intègre un échantillon de RTT mesuré sur une réponse"""
+        with self.lock:
+            if self.srtt is None:
+                self.srtt = rtt
+                self.rttvar = rtt / 2
+            else:
+                self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+                self.srtt = 0.875 * self.srtt + 0.125 * rtt
+            self.samples += 1
+
+    def record_retry(self):
+        with self.lock:
+            self.retries += 1
+
+    def limit_parallelism(self, requested):
+        """Applique le plafond de parallélisme du modèle"""
+        if self.parallelism is None:
+            return requested
+        return min(requested, self.parallelism)
+
+    def summary(self):
+        """Résumé à inclure dans les résultats de scan"""
+        return {
+            "template": self.template,
+            "effective_timeout": round(self.timeout(), 4),
+            "srtt": round(self.srtt, 6) if self.srtt is not None else None,
+            "rtt_samples": self.samples,
+            "retries": self.retries,
+            "max_retries": self.max_retries,
+        }
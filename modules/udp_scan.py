@@ -0,0 +1,122 @@
+import asyncio
+import errno
+import socket
+import struct
+import time
+
+# États UDP : sans réponse, un port est ouvert (service muet) ou filtré, impossible de trancher
+OPEN, CLOSED, OPEN_FILTERED, FILTERED = "open", "closed", "open|filtered", "filtered"
+# Erreur locale (descripteurs épuisés, adresse inutilisable) : le port n'a pas été sondé
+ERROR = "error"
+
+# Issue de chaque état pour les métriques (ScanMetrics)
+METRIC_OUTCOMES = {OPEN: "open", CLOSED: "closed", OPEN_FILTERED: "timeout", FILTERED: "filtered", ERROR: "error"}
+
+# Erreurs ICMP autres que « port injoignable » : un pare-feu rejette explicitement
+FILTERED_ERRORS = {errno.EHOSTUNREACH, errno.ENETUNREACH, errno.EACCES, errno.EPERM}
+
+
+def _dns_query():
+    # Requête NS pour la racine : toute implémentation DNS y répond (même par un refus)
+    return struct.pack("!HHHHHH", 0x4353, 0x0100, 1, 0, 0, 0) + b"\x00" + struct.pack("!HH", 2, 1)
+
+
+def _ber(tag, payload):
+    return bytes([tag, len(payload)]) + payload
+
+
+def _snmp_get():
+    # SNMPv1 GetRequest sysDescr.0, communauté « public »
+    oid = _ber(0x06, b"\x2b\x06\x01\x02\x01\x01\x01\x00")
+    varbinds = _ber(0x30, _ber(0x30, oid + b"\x05\x00"))
+    pdu = _ber(0xA0, _ber(0x02, b"\x43\x53\x44\x42") + _ber(0x02, b"\x00") + _ber(0x02, b"\x00") + varbinds)
+    return _ber(0x30, _ber(0x02, b"\x00") + _ber(0x04, b"public") + pdu)
+
+
+def _netbios_status():
+    # NBSTAT sur le nom générique « * »
+    name = b"\x20" + b"CK" + b"A" * 30 + b"\x00"
+    return struct.pack("!HHHHHH", 0x4353, 0x0000, 1, 0, 0, 0) + name + struct.pack("!HH", 0x21, 1)
+
+
+# Charges utiles protocolaires : un service muet face à un datagramme vide répond à une vraie requête
+UDP_PAYLOADS = {
+    53: ("dns", _dns_query()),
+    69: ("tftp", b"\x00\x01cybersec\x00octet\x00"),
+    123: ("ntp", b"\x1b" + bytes(47)),
+    137: ("netbios-ns", _netbios_status()),
+    161: ("snmp", _snmp_get()),
+    1900: ("ssdp", b"M-SEARCH * HTTP/1.1\r\nHOST: 239.255.255.250:1900\r\nMAN: \"ssdp:discover\"\r\nMX: 1\r\nST: ssdp:all\r\n\r\n"),
+    5353: ("mdns", _dns_query()),
+}
+
+
+async def probe_udp(address, port, timing, bucket, metrics=None, family=socket.AF_INET):
+    """Sonde un port UDP : (état, données reçues)
+
+    Le socket est connecté : un ICMP port injoignable remonte en
+    ConnectionRefusedError à la lecture. Seul le silence est retenté.
+    Une erreur locale donne l'état ERROR pour ce port, sans interrompre le scan.
+    """
+    attempts = [0]
+    error = None
+    try:
+        state, data, latency = await _probe_udp(address, port, timing, bucket, family, attempts)
+    except OSError as e:
+        state, data, latency, error = ERROR, None, None, str(e)
+    if metrics is not None:
+        metrics.record(METRIC_OUTCOMES[state], latency, attempts[0], error=error)
+    return state, data
+
+
+async def _probe_udp(address, port, timing, bucket, family, attempts):
+    loop = asyncio.get_running_loop()
+    payload = UDP_PAYLOADS.get(port, (None, b""))[1]
+    sock = socket.socket(family, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    try:
+        sock.connect((address, port))
+        fd = sock.fileno()
+        for attempt in range(timing.max_retries + 1):
+            if attempt:
+                timing.record_retry()
+            attempts[0] += 1
+            # Débit global borné : au-delà, les ICMP du noyau cible sont limités et les ports fermés semblent muets
+            await asyncio.sleep(bucket.reserve())
+            started = time.perf_counter()
+            try:
+                sock.send(payload)
+            except OSError as e:
+                return (CLOSED if e.errno == errno.ECONNREFUSED else FILTERED), None, None
+            waiter = loop.create_future()
+            loop.add_reader(fd, lambda: waiter.done() or waiter.set_result(True))
+            timer = loop.call_later(timing.timeout(), lambda: waiter.done() or waiter.set_result(False))
+            try:
+                answered = await waiter
+            finally:
+                loop.remove_reader(fd)
+                timer.cancel()
+            if not answered:
+                continue
+            try:
+                data = sock.recv(4096)
+            except ConnectionRefusedError:
+                latency = time.perf_counter() - started
+                timing.record_rtt(latency)
+                return CLOSED, None, latency
+            except OSError as e:
+                return (FILTERED if e.errno in FILTERED_ERRORS else OPEN_FILTERED), None, None
+            latency = time.perf_counter() - started
+            timing.record_rtt(latency)
+            return OPEN, data, latency
+        return OPEN_FILTERED, None, None
+    finally:
+        sock.close()
+
+
+def udp_service(port, data):
+    """Service identifié par la réponse à la charge utile protocolaire (None pour un port sans charge connue)"""
+    known = UDP_PAYLOADS.get(port)
+    if known is None or not data:
+        return None
+    return {"service": known[0], "product": None, "version": None, "banner": None, "method": "udp"}
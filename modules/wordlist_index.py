@@ -0,0 +1,224 @@
+import glob
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+
+from modules.sorted_index import SortedRecordFile
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou entre processus
+    fcntl = None
+
+WORDLIST_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wordlists")
+INDEX_DIRNAME = ".cache"
+# Verrou de construction : un seul processus (re)construit l'index, les autres attendent puis l'ouvrent
+LOCK_FILENAME = "build.lock"
+
+# En-tête du filtre de Bloom : magic, nombre d'entrées, nombre de bits, nombre de hachages, signature des sources
+BLOOM_HEADER = struct.Struct(">8sQQI32s")
+BLOOM_MAGIC = b"CSBLOOM1"
+FINGERPRINT = struct.Struct(">Q")
+FALSE_POSITIVE_RATE = 0.01
+# Empreintes triées en mémoire par tranches avant fusion (tri externe, mémoire bornée)
+SORT_RUN_SIZE = 1_000_000
+
+
+def normalize(word):
+    """Forme indexée d'un mot : minuscules, octets UTF-8 (les octets invalides sont conservés tels quels)"""
+    return word.lower().encode("utf-8", "surrogateescape")
+
+
+def fingerprint(data):
+    """Empreinte 64 bits d'un mot normalisé (collision négligeable à l'échelle de rockyou)"""
+    return FINGERPRINT.unpack(hashlib.blake2b(data, digest_size=8).digest())[0]
+
+
+def bloom_positions(fp, bits, hashes):
+    # Double hachage (Kirsch-Mitzenmacher) dérivé de l'empreinte : pas de second hash à calculer
+    step = (fp >> 32) | 1
+    return [(fp + i * step) % bits for i in range(hashes)]
+
+
+def sources_signature(paths):
+    """Signature des fichiers sources (nom, taille, date) pour détecter un index périmé"""
+    h = hashlib.sha256()
+    for path in paths:
+        stat = os.stat(path)
+        h.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return h.digest()
+
+
+def _sorted_runs(paths, workdir):
+    """Empreintes de tous les mots, triées par tranches dans des fichiers temporaires"""
+    runs = []
+    chunk = array("Q")
+
+    def flush():
+        run_path = os.path.join(workdir, f"run{len(runs)}.bin")
+        values = array("Q", sorted(chunk))
+        if sys.byteorder == "little":
+            values.byteswap()
+        with open(run_path, "wb") as f:
+            values.tofile(f)
+        runs.append(run_path)
+        del chunk[:]
+
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="surrogateescape") as f:
+            for line in f:
+                word = line.rstrip("\r\n")
+                if word:
+                    chunk.append(fingerprint(normalize(word)))
+                    if len(chunk) >= SORT_RUN_SIZE:
+                        flush()
+    if chunk:
+        flush()
+    return runs
+
+
+def _read_run(path):
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(FINGERPRINT.size * 8192)
+            if not block:
+                return
+            for (value,) in FINGERPRINT.iter_unpack(block):
+                yield value
+
+
+def build_index(paths, index_dir):
+    """Construit le filtre de Bloom et le fichier d'empreintes triées ; retourne le nombre de mots distincts"""
+    os.makedirs(index_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=index_dir) as workdir:
+        runs = _sorted_runs(paths, workdir)
+        total = sum(os.path.getsize(run) for run in runs) // FINGERPRINT.size
+
+        bits = max(64, math.ceil(-total * math.log(FALSE_POSITIVE_RATE) / math.log(2) ** 2))
+        bits = (bits + 7) // 8 * 8
+        hashes = max(1, round(bits / max(total, 1) * math.log(2)))
+        bloom = bytearray(bits // 8)
+
+        count = 0
+        previous = None
+        fp_tmp = os.path.join(workdir, "fingerprints.bin")
+        with open(fp_tmp, "wb") as out:
+            # Fusion des tranches : sortie triée et dédoublonnée
+            for value in heapq.merge(*(_read_run(run) for run in runs)):
+                if value == previous:
+                    continue
+                previous = value
+                out.write(FINGERPRINT.pack(value))
+                for position in bloom_positions(value, bits, hashes):
+                    bloom[position >> 3] |= 1 << (position & 7)
+                count += 1
+
+        bloom_tmp = os.path.join(workdir, "bloom.bin")
+        with open(bloom_tmp, "wb") as out:
+            out.write(BLOOM_HEADER.pack(BLOOM_MAGIC, count, bits, hashes, sources_signature(paths)))
+            out.write(bloom)
+        # Remplacement atomique : un lecteur concurrent voit l'ancien ou le nouvel index, jamais un mélange
+        os.replace(fp_tmp, os.path.join(index_dir, "fingerprints.bin"))
+        os.replace(bloom_tmp, os.path.join(index_dir, "bloom.bin"))
+    return count
+
+
+class WordlistIndex:
+    """Dictionnaire de mots de passe courants interrogé via un index compact sur disque
+
+    Un filtre de Bloom (~1,2 octet par mot, 1 % de faux positifs) écarte
+    la plupart des mots absents sans toucher au reste ; les réponses positives
+    sont confirmées par dichotomie dans le fichier d'empreintes triées. Les
+    deux fichiers sont projetés en mémoire et ouverts à la première
+    recherche : créer un PasswordChecker ne coûte rien, et seules les pages
+    consultées occupent de la mémoire. L'index est (re)construit automatiquement
+    lorsque les fichiers de wordlists/ changent.
+    """
+
+    def __init__(self, directory=WORDLIST_DIR, extra_words=()):
+        self.directory = directory
+        self.index_dir = os.path.join(directory, INDEX_DIRNAME)
+        self.extra_words = frozenset(w.lower() for w in extra_words)
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.count = 0
+        self.bloom = None
+        self.fingerprints = None
+
+    def source_files(self):
+        return sorted(glob.glob(os.path.join(self.directory, "*.txt")))
+
+    def _open(self):
+        sources = self.source_files()
+        if not sources:
+            return
+        bloom_path = os.path.join(self.index_dir, "bloom.bin")
+        if not self._is_current(bloom_path, sources):
+            self._build(bloom_path, sources)
+        with open(bloom_path, "rb") as f:
+            self.bloom = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _, self.count, self.bits, self.hashes, _ = BLOOM_HEADER.unpack_from(self.bloom)
+        self.fingerprints = SortedRecordFile(os.path.join(self.index_dir, "fingerprints.bin"), FINGERPRINT.size)
+
+    def _build(self, bloom_path, sources):
+        os.makedirs(self.index_dir, exist_ok=True)
+        with open(os.path.join(self.index_dir, LOCK_FILENAME), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                # Un autre processus a pu terminer la construction pendant l'attente du verrou
+                if self._is_current(bloom_path, sources):
+                    return
+                print(f"📚 Construction de l'index des mots de passe courants ({len(sources)} fichier(s))...")
+                build_index(sources, self.index_dir)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _is_current(self, bloom_path, sources):
+        try:
+            with open(bloom_path, "rb") as f:
+                magic, _, _, _, signature = BLOOM_HEADER.unpack(f.read(BLOOM_HEADER.size))
+        except (OSError, struct.error):
+            return False
+        return magic == BLOOM_MAGIC and signature == sources_signature(sources) and \
+            os.path.exists(os.path.join(self.index_dir, "fingerprints.bin"))
+
+    def load(self):
+        """Ouvre (ou construit) l'index ; appelé automatiquement à la première recherche"""
+        with self.lock:
+            if not self.loaded:
+                self._open()
+                self.loaded = True
+        return self
+
+    def __contains__(self, word):
+        if word.lower() in self.extra_words:
+            return True
+        if not self.loaded:
+            self.load()
+        if self.bloom is None:
+            return False
+        fp = fingerprint(normalize(word))
+        bloom = self.bloom
+        offset = BLOOM_HEADER.size
+        for position in bloom_positions(fp, self.bits, self.hashes):
+            if not bloom[offset + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return self.fingerprints.find(FINGERPRINT.pack(fp)) is not None
+
+
+# Construction explicite de l'index (sinon faite à la première utilisation) :
+#   python -m modules.wordlist_index [dossier]
+if __name__ == "__main__":
+    index = WordlistIndex(sys.argv[1] if len(sys.argv) > 1 else WORDLIST_DIR)
+    sources = index.source_files()
+    count = build_index(sources, index.index_dir)
+    print(f"📦 Index généré dans {index.index_dir}: {count} mots distincts ({len(sources)} fichier(s))")